@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:01
+
+import accounts.models
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", accounts.models.SearchableUserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(django.db.models.functions.text.Lower("username"), name="user_username_lower_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(django.db.models.functions.text.Lower("first_name"), name="user_first_name_lower_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(django.db.models.functions.text.Lower("last_name"), name="user_last_name_lower_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(django.db.models.functions.text.Lower("email"), name="user_email_lower_idx"),
+        ),
+    ]
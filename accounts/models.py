@@ -1,5 +1,28 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models.functions import Lower
+
+SEARCH_FIELDS = ["username", "first_name", "last_name", "email"]
+
+# Sorts after every other character, so [prefix, prefix + PREFIX_UPPER_BOUND) covers all strings with that prefix
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+
+class UserQuerySet(models.QuerySet):
+    def search_prefix(self, query):
+        """Users whose username, first name, last name or email starts with query (case-insensitive).
+
+        Compares lower-cased columns with a range instead of LIKE so the expression indexes can be used.
+        """
+        prefix = query.strip().lower()
+        condition = models.Q()
+        for field in SEARCH_FIELDS:
+            condition |= models.Q(**{f"{field}_lower__gte": prefix, f"{field}_lower__lt": prefix + PREFIX_UPPER_BOUND})
+        return self.alias(**{f"{field}_lower": Lower(field) for field in SEARCH_FIELDS}).filter(condition)
+
+
+class SearchableUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
 
 
 class User(AbstractUser):
@@ -11,5 +34,10 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default="planner")
     phone_number = models.CharField(max_length=20, blank=True)
 
+    objects = SearchableUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [models.Index(Lower(field), name=f"user_{field}_lower_idx") for field in SEARCH_FIELDS]
+
     def __str__(self):
         return self.username
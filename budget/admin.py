@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import BudgetItem
+from .models import BudgetItem, BudgetSummary
 
 
 @admin.register(BudgetItem)
@@ -15,3 +15,9 @@ class BudgetItemAdmin(admin.ModelAdmin):
     ]
     list_filter = ["category", "status"]
     search_fields = ["name", "event__title"]
+
+
+@admin.register(BudgetSummary)
+class BudgetSummaryAdmin(admin.ModelAdmin):
+    list_display = ["event", "item_count", "estimated_total", "actual_total", "paid_total", "outstanding_total"]
+    search_fields = ["event__title"]
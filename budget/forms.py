@@ -1,8 +1,21 @@
+import csv
+import io
+import re
+
 from django import forms
+from django.db import transaction
 
+from events.cache import invalidate_event_caches
+from events.models import Event
 from vendors.models import EventVendor
 
-from .models import BudgetItem
+from .models import BudgetCashFlowDay, BudgetItem, BudgetSummary
+from .reports import invalidate_budget_rollup
+
+IMPORT_COLUMNS = ["category", "name", "vendor", "estimated_cost", "actual_cost", "status", "payment_date"]
+IMPORT_REQUIRED_COLUMNS = ["category", "name", "estimated_cost"]
+# Commas are only accepted as thousands separators; "12,5" is a decimal comma, not 125
+THOUSANDS_AMOUNT = re.compile(r"^\d{1,3}(,\d{3})+(\.\d+)?$")
 
 
 class BudgetItemForm(forms.ModelForm):
@@ -33,3 +46,142 @@ class BudgetItemForm(forms.ModelForm):
             )
             # Add widget attributes for JavaScript filtering
             self.fields["vendor"].widget.attrs.update({"class": "form-select vendor-select"})
+
+
+class BudgetRollupForm(forms.Form):
+    year = forms.TypedChoiceField(coerce=int, required=False, empty_value=None)
+    category = forms.ChoiceField(choices=[("", "All categories")] + BudgetItem.CATEGORY_CHOICES, required=False)
+    event_type = forms.ChoiceField(choices=[("", "All event types")] + Event.EVENT_TYPE_CHOICES, required=False)
+
+    def __init__(self, *args, years=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["year"].choices = [("", "All years")] + [(year, year) for year in years]
+
+
+class BudgetItemImportForm(forms.Form):
+    """Form for importing budget items from a CSV or TSV file"""
+
+    file = forms.FileField(
+        label="CSV or TSV file",
+        help_text=(
+            "Header row with category, name and estimated_cost columns, plus optional vendor, actual_cost, "
+            "status and payment_date. Amounts use a dot for decimals. Vendors are matched by name to the "
+            "vendors assigned to this event."
+        ),
+    )
+
+
+def _import_rows(file):
+    """Yield (line number, row dict) from an uploaded CSV/TSV file, reading it as a stream"""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    header = text.readline()
+    delimiter = "\t" if "\t" in header else ","
+    reader = csv.DictReader(text, fieldnames=next(csv.reader([header], delimiter=delimiter), []), delimiter=delimiter)
+    reader.fieldnames = [name.strip().lower().replace(" ", "_") for name in reader.fieldnames]
+    missing = [column for column in IMPORT_REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}.")
+    for row in reader:
+        if any((value or "").strip() for value in row.values() if isinstance(value, str)):
+            # line_num does not count the header line read above
+            yield reader.line_num + 1, row
+
+
+def _choice_keys(choices):
+    """Accept choices by key or display label, in any case"""
+    keys = {key.lower(): key for key, _ in choices}
+    keys.update((label.lower(), key) for key, label in choices)
+    return keys
+
+
+def _clean_import_amounts(data):
+    """Strip currency signs and thousands separators from the cost columns in place; returns their errors"""
+    errors = {}
+    for column in ["estimated_cost", "actual_cost"]:
+        value = data[column]
+        data[column] = value.replace("$", "")
+        if "," not in data[column]:
+            continue
+        if THOUSANDS_AMOUNT.match(data[column]):
+            data[column] = data[column].replace(",", "")
+        else:
+            errors[column] = [
+                f"{value} is not a valid amount. Use a dot for decimals and commas only between thousands."
+            ]
+    return errors
+
+
+def _import_vendor(vendors, name, event):
+    """Resolve a vendor name to one of the event's assignments; returns (assignment, error message or None)"""
+    if not name:
+        return None, None
+    matches = vendors.get(name.lower(), [])
+    if not matches:
+        return None, f"{name} is not a vendor of {event.title}."
+    if len(matches) > 1:
+        return None, f"{name} is ambiguous: {event.title} has {len(matches)} vendors with that name."
+    return matches[0], None
+
+
+def import_budget_items(event, file, batch_size=500):
+    """Validate every row of a CSV/TSV upload with the BudgetItemForm rules and create the items.
+
+    Vendor names resolve to the event's EventVendor rows through one lookup; a name shared by two
+    of its vendors is reported rather than guessed. Amounts may carry a $ and thousands separators
+    but not a decimal comma. Rows are written with bulk_create in batches inside one transaction,
+    which is rolled back if any row is invalid, so an import either creates every item or none. Returns (created count, errors), errors mapping
+    line numbers to {field: [messages]}.
+    """
+    vendors = {}
+    for assignment in EventVendor.objects.filter(event=event).select_related("vendor"):
+        vendors.setdefault(assignment.vendor.name.strip().lower(), []).append(assignment)
+    categories = _choice_keys(BudgetItem.CATEGORY_CHOICES)
+    statuses = _choice_keys(BudgetItem.STATUS_CHOICES)
+    status_default = BudgetItem._meta.get_field("status").default
+
+    created, errors, batch = 0, {}, []
+    with transaction.atomic():
+        try:
+            for line, row in _import_rows(file):
+                data = {column: (row.get(column) or "").strip() for column in IMPORT_COLUMNS}
+                data["category"] = categories.get(data["category"].lower(), data["category"])
+                data["status"] = statuses.get(data["status"].lower(), data["status"]) or status_default
+                amount_errors = _clean_import_amounts(data)
+
+                form = BudgetItemForm(data=data)
+                # Vendors are matched by name below instead of by primary key
+                del form.fields["vendor"]
+                row_errors = (
+                    {} if form.is_valid() else {field: list(messages) for field, messages in form.errors.items()}
+                )
+                row_errors.update(amount_errors)
+                vendor, error = _import_vendor(vendors, data["vendor"], event)
+                if error:
+                    row_errors["vendor"] = [error]
+                if row_errors:
+                    errors[str(line)] = row_errors
+                    continue
+                if errors:
+                    # Nothing will be saved, keep reading only to report every bad row
+                    continue
+
+                item = form.save(commit=False)
+                item.event, item.vendor = event, vendor
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    created += len(BudgetItem.objects.bulk_create(batch))
+                    batch = []
+        except (UnicodeDecodeError, csv.Error, ValueError) as error:
+            reason = "The file is not UTF-8 text." if isinstance(error, UnicodeDecodeError) else str(error)
+            errors["__all__"] = {"file": [f"Could not read the file: {reason}"]}
+
+        if errors:
+            transaction.set_rollback(True)
+            return 0, errors
+        created += len(BudgetItem.objects.bulk_create(batch))
+        # bulk_create skips the post_save signals that normally refresh these
+        BudgetSummary.rebuild([event.pk])
+        BudgetCashFlowDay.rebuild([event.pk])
+        invalidate_event_caches(event.pk)
+        invalidate_budget_rollup(event.created_by_id)
+    return created, errors
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from budget.models import BudgetCashFlowDay, BudgetSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-event budget summaries and cash-flow days from the budget item table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of summaries written per statement")
+        parser.add_argument("--event", type=int, action="append", dest="event_ids", help="Only rebuild these events")
+
+    def handle(self, *args, **options):
+        written = BudgetSummary.rebuild(options["event_ids"], batch_size=options["batch_size"])
+        days = BudgetCashFlowDay.rebuild(options["event_ids"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} budget summaries and {days} cash-flow days."))
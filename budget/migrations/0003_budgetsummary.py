@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:00
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0002_budgetitem_vendor"),
+        ("events", "0007_event_deletion_requested_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetSummary",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="budget_summary",
+                        serialize=False,
+                        to="events.event",
+                    ),
+                ),
+                ("item_count", models.IntegerField(default=0)),
+                ("estimated_total", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("actual_total", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("paid_total", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("outstanding_total", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("breakdown", models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                "verbose_name_plural": "budget summaries",
+            },
+        ),
+    ]
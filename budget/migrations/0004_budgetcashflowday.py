@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0003_budgetsummary"),
+        ("events", "0007_event_deletion_requested_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetCashFlowDay",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("paid", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("scheduled", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="cash_flow_days", to="events.event"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="budgetcashflowday",
+            constraint=models.UniqueConstraint(fields=("event", "day"), name="cash_flow_event_day_unique"),
+        ),
+    ]
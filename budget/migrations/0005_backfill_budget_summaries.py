@@ -0,0 +1,78 @@
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+TOTALS = ["count", "estimated", "actual", "cost"]
+VALUE_FIELDS = ["item_count", "estimated_total", "actual_total", "paid_total", "outstanding_total", "breakdown"]
+
+
+def summary_values(rows):
+    """Totals and per-category/per-status breakdown of one event's (category, status) grouped rows"""
+    values = dict.fromkeys(VALUE_FIELDS[:-1], Decimal("0"))
+    breakdown = {"category": {}, "status": {}}
+    for row in rows:
+        for dimension in ["category", "status"]:
+            totals = breakdown[dimension].setdefault(row[dimension], dict.fromkeys(TOTALS, Decimal("0")))
+            for name in TOTALS:
+                totals[name] += row[name]
+        values["item_count"] += row["count"]
+        values["estimated_total"] += row["estimated"]
+        values["actual_total"] += row["actual"]
+        values["paid_total" if row["status"] == "paid" else "outstanding_total"] += row["cost"]
+    for totals in [*breakdown["category"].values(), *breakdown["status"].values()]:
+        totals["count"] = int(totals["count"])
+    values["item_count"] = int(values["item_count"])
+    values["breakdown"] = breakdown
+    return values
+
+
+def backfill_budget_summaries(apps, schema_editor):
+    # Summaries were only written by item saves, so events that already had budget items
+    # showed no totals until rebuild_budget_summaries was run by hand
+    BudgetItem = apps.get_model("budget", "BudgetItem")
+    BudgetSummary = apps.get_model("budget", "BudgetSummary")
+
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    rows = (
+        BudgetItem.objects.values("event_id", "category", "status")
+        .annotate(
+            count=Count("pk"),
+            estimated=Sum("estimated_cost", output_field=money),
+            actual=Coalesce(Sum("actual_cost"), Decimal("0"), output_field=money),
+            cost=Sum(Coalesce("actual_cost", "estimated_cost"), output_field=money),
+        )
+        .order_by("event_id")
+    )
+
+    def save(batch):
+        BudgetSummary.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=["event"], update_fields=VALUE_FIELDS
+        )
+
+    batch = []
+    for event_id, group in groupby(rows.iterator(), key=itemgetter("event_id")):
+        batch.append(BudgetSummary(event_id=event_id, **summary_values(group)))
+        if len(batch) >= BATCH_SIZE:
+            save(batch)
+            batch = []
+    save(batch)
+
+    # Summaries left over from events whose items were all deleted go back to zero
+    empty = BudgetSummary.objects.filter(~Exists(BudgetItem.objects.filter(event=OuterRef("event"))))
+    empty.exclude(item_count=0).update(**summary_values([]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0004_budgetcashflowday"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_budget_summaries, migrations.RunPython.noop),
+    ]
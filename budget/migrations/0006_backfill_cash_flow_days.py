@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill_cash_flow_days(apps, schema_editor):
+    # The buckets are only written by item saves, so existing payment dates would otherwise
+    # leave the cash-flow timeline empty until rebuild_budget_summaries was run by hand
+    BudgetItem = apps.get_model("budget", "BudgetItem")
+    BudgetCashFlowDay = apps.get_model("budget", "BudgetCashFlowDay")
+
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    cost = Coalesce("actual_cost", "estimated_cost", output_field=money)
+    rows = (
+        BudgetItem.objects.filter(payment_date__isnull=False)
+        .values("event_id", "payment_date")
+        .annotate(
+            paid=Coalesce(Sum(cost, filter=Q(status="paid")), Decimal("0"), output_field=money),
+            scheduled=Coalesce(Sum(cost, filter=~Q(status="paid")), Decimal("0"), output_field=money),
+        )
+        .order_by()
+    )
+
+    BudgetCashFlowDay.objects.all().delete()
+    batch = []
+    for row in rows.iterator():
+        batch.append(
+            BudgetCashFlowDay(
+                event_id=row["event_id"], day=row["payment_date"], paid=row["paid"], scheduled=row["scheduled"]
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            BudgetCashFlowDay.objects.bulk_create(batch)
+            batch = []
+    BudgetCashFlowDay.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budget", "0005_backfill_budget_summaries"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_cash_flow_days, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,11 @@
-from django.db import models
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
 
 from events.models import Event
 from vendors.models import EventVendor
@@ -36,3 +43,202 @@ class BudgetItem(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.event.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored payment date so moving a payment refreshes both days of the cash-flow timeline
+        instance._loaded_payment_date = instance.__dict__.get("payment_date")
+        return instance
+
+
+class BudgetSummary(models.Model):
+    """Denormalized budget totals per event, kept in sync by the budget signals.
+
+    An item's cost is its actual cost once known, else its estimate; paid_total and
+    outstanding_total split those costs by whether the item is paid. breakdown holds the same
+    numbers per category and per status, e.g. breakdown["category"]["venue"]["estimated"].
+    """
+
+    TOTALS = ["count", "estimated", "actual", "cost"]
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name="budget_summary")
+    item_count = models.IntegerField(default=0)
+    estimated_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    actual_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    breakdown = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    class Meta:
+        verbose_name_plural = "budget summaries"
+
+    def __str__(self):
+        return f"{self.event} (${self.estimated_total} estimated)"
+
+    @property
+    def variance(self):
+        return self.actual_total - self.estimated_total
+
+    def _rows(self, dimension, choices):
+        """Breakdown rows of one dimension in choice order, with Decimal amounts and display labels"""
+        totals = self.breakdown.get(dimension, {})
+        return [
+            {
+                "key": key,
+                "label": label,
+                "count": totals[key]["count"],
+                **{name: Decimal(totals[key][name]) for name in ["estimated", "actual", "cost"]},
+            }
+            for key, label in choices
+            if key in totals
+        ]
+
+    @property
+    def by_category(self):
+        return self._rows("category", BudgetItem.CATEGORY_CHOICES)
+
+    @property
+    def by_status(self):
+        return self._rows("status", BudgetItem.STATUS_CHOICES)
+
+    @classmethod
+    def for_event(cls, event):
+        """Return the summary for an event, building it on first access"""
+        summary = cls.objects.filter(event=event).first()
+        if summary is None:
+            cls.rebuild([event.pk])
+            summary = cls.objects.get(event=event)
+        return summary
+
+    @classmethod
+    def from_rows(cls, event_id, rows):
+        """Build the summary of one event from its (category, status) grouped rows"""
+        summary = cls(event_id=event_id, breakdown={"category": {}, "status": {}})
+        for row in rows:
+            for dimension in ["category", "status"]:
+                totals = summary.breakdown[dimension].setdefault(
+                    row[dimension], dict.fromkeys(cls.TOTALS, Decimal("0"))
+                )
+                for name in cls.TOTALS:
+                    totals[name] += row[name]
+            summary.item_count += row["count"]
+            summary.estimated_total += row["estimated"]
+            summary.actual_total += row["actual"]
+            if row["status"] == "paid":
+                summary.paid_total += row["cost"]
+            else:
+                summary.outstanding_total += row["cost"]
+        for totals in [*summary.breakdown["category"].values(), *summary.breakdown["status"].values()]:
+            totals["count"] = int(totals["count"])
+        return summary
+
+    @classmethod
+    def rebuild(cls, event_ids=None, batch_size=1000):
+        """Recompute the summaries of the given events (all events when None) in one grouped query.
+
+        Returns the number of summaries written.
+        """
+        items = BudgetItem.objects.all() if event_ids is None else BudgetItem.objects.filter(event_id__in=event_ids)
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        rows = (
+            items.values("event_id", "category", "status")
+            .annotate(
+                count=Count("pk"),
+                estimated=Sum("estimated_cost", output_field=money),
+                actual=Coalesce(Sum("actual_cost"), Decimal("0"), output_field=money),
+                cost=Sum(Coalesce("actual_cost", "estimated_cost"), output_field=money),
+            )
+            .order_by("event_id")
+        )
+
+        written, batch, built = 0, [], set()
+        for event_id, group in groupby(rows.iterator(), key=itemgetter("event_id")):
+            batch.append(cls.from_rows(event_id, group))
+            built.add(event_id)
+            if len(batch) >= batch_size:
+                written += cls._save_all(batch)
+                batch = []
+
+        # Events that have no items (any more) get an all-zero summary
+        if event_ids is None:
+            empty = cls.objects.filter(~Exists(BudgetItem.objects.filter(event=OuterRef("event"))))
+            written += empty.exclude(item_count=0).update(**cls._empty_values())
+        else:
+            batch += [cls.from_rows(event_id, []) for event_id in set(event_ids) - built]
+        return written + cls._save_all(batch)
+
+    @classmethod
+    def _empty_values(cls):
+        empty = cls.from_rows(None, [])
+        return {field: getattr(empty, field) for field in cls._value_fields()}
+
+    @classmethod
+    def _value_fields(cls):
+        return [field.name for field in cls._meta.concrete_fields if not field.primary_key]
+
+    @classmethod
+    def _save_all(cls, summaries):
+        cls.objects.bulk_create(
+            summaries, update_conflicts=True, unique_fields=["event"], update_fields=cls._value_fields()
+        )
+        return len(summaries)
+
+
+class BudgetCashFlowDay(models.Model):
+    """Money leaving the account per event and day, kept in sync by the budget signals.
+
+    paid is the cost of the items paid on that day and scheduled the cost of unpaid items due
+    on it, an item costing its actual cost once known, else its estimate. Items without a
+    payment date are not on the timeline.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="cash_flow_days")
+    day = models.DateField()
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    scheduled = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["event", "day"], name="cash_flow_event_day_unique")]
+
+    def __str__(self):
+        return f"{self.event} {self.day} (${self.paid} paid, ${self.scheduled} scheduled)"
+
+    @classmethod
+    def rebuild(cls, event_ids=None, days=None, batch_size=1000):
+        """Recompute the buckets of the given events and days (everything when None) in one grouped query.
+
+        Signals pass the one or two days an item write touched, so keeping the timeline current
+        never reads more than those days' items. Returns the number of buckets written.
+        """
+        items = BudgetItem.objects.filter(payment_date__isnull=False)
+        buckets = cls.objects.all()
+        if event_ids is not None:
+            items, buckets = items.filter(event_id__in=event_ids), buckets.filter(event_id__in=event_ids)
+        if days is not None:
+            items, buckets = items.filter(payment_date__in=days), buckets.filter(day__in=days)
+
+        money = models.DecimalField(max_digits=12, decimal_places=2)
+        cost = Coalesce("actual_cost", "estimated_cost", output_field=money)
+        rows = (
+            items.values("event_id", "payment_date")
+            .annotate(
+                paid=Coalesce(Sum(cost, filter=Q(status="paid")), Decimal("0"), output_field=money),
+                scheduled=Coalesce(Sum(cost, filter=~Q(status="paid")), Decimal("0"), output_field=money),
+            )
+            .order_by()
+        )
+
+        written = 0
+        with transaction.atomic():
+            buckets.delete()
+            batch = []
+            for row in rows.iterator():
+                batch.append(
+                    cls(event_id=row["event_id"], day=row["payment_date"], paid=row["paid"], scheduled=row["scheduled"])
+                )
+                if len(batch) >= batch_size:
+                    written += len(cls.objects.bulk_create(batch))
+                    batch = []
+            written += len(cls.objects.bulk_create(batch))
+        return written
@@ -0,0 +1,167 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DateField, DateTimeField, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .models import BudgetCashFlowDay, BudgetItem, BudgetSummary
+
+ROLLUP_TIMEOUT = 60 * 30
+ROLLUP_COLUMNS = ["month", "category", "event_type", "items", "estimated", "actual"]
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+CENTS = Decimal("0.01")
+CASH_FLOW_PERIODS = [("day", "Daily"), ("week", "Weekly"), ("month", "Monthly")]
+
+
+class MonthStart(TruncMonth):
+    """TruncMonth to a date, computed natively on SQLite.
+
+    Django evaluates TruncMonth on SQLite with a Python callback per row, which made up most of
+    the rollup's time. SQLite stores datetimes in UTC, so strftime gives the same month whenever
+    the truncation happens in UTC; other time zones keep the stock implementation.
+    """
+
+    output_field = DateField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        if isinstance(self.lhs.output_field, DateTimeField) and self.get_tzname() != "UTC":
+            return self.as_sql(compiler, connection, **extra_context)
+        sql, params = compiler.compile(self.lhs)
+        return f"strftime('%%Y-%%m-01', {sql})", params
+
+
+def rollup_key(user_id):
+    return f"budget:rollup:{user_id}"
+
+
+def build_budget_rollup(user_id):
+    """Budget totals of all a planner's events by month x category x event type, in one grouped query.
+
+    An item falls in the month it was paid, or in its event's month while it has no payment date.
+    """
+    month = Coalesce(MonthStart("payment_date"), MonthStart("event__start_date"))
+    rows = list(
+        BudgetItem.objects.filter(event__created_by_id=user_id, event__deletion_requested_at__isnull=True)
+        .annotate(month=month)
+        .values("month", "category", event_type=F("event__event_type"))
+        .annotate(
+            items=Count("pk"),
+            estimated=Sum("estimated_cost", output_field=MONEY),
+            actual=Coalesce(Sum("actual_cost"), Decimal("0"), output_field=MONEY),
+        )
+        .order_by("month", "category", "event_type")
+    )
+    # SQLite hands back aggregated decimals unquantized; keep exports at cents like the columns
+    for row in rows:
+        row["estimated"] = row["estimated"].quantize(CENTS)
+        row["actual"] = row["actual"].quantize(CENTS)
+    return rows
+
+
+def get_budget_rollup(user_id):
+    """A planner's budget rollup rows, served from the cache and rebuilt only on a miss"""
+    key = rollup_key(user_id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = build_budget_rollup(user_id)
+        cache.set(key, rows, ROLLUP_TIMEOUT)
+    return rows
+
+
+def invalidate_budget_rollup(*user_ids):
+    keys = [rollup_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # Drop the keys again after commit in case a concurrent request re-cached the old rollup meanwhile
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def filter_rollup(rows, year=None, category=None, event_type=None):
+    return [
+        row
+        for row in rows
+        if (year is None or row["month"].year == year)
+        and (not category or row["category"] == category)
+        and (not event_type or row["event_type"] == event_type)
+    ]
+
+
+def pivot_rollup(rows):
+    """Pivot rollup rows into one line per month with a cell per category, plus a totals line.
+
+    Lines are {"month", "cells": [{"estimated", "actual"}, ...], "estimated", "actual"}, cells in
+    BudgetItem.CATEGORY_CHOICES order.
+    """
+    categories = [key for key, _ in BudgetItem.CATEGORY_CHOICES]
+
+    def line(month):
+        return {
+            "month": month,
+            "cells": [{"estimated": Decimal("0"), "actual": Decimal("0")} for _ in categories],
+            "estimated": Decimal("0"),
+            "actual": Decimal("0"),
+        }
+
+    months, total = {}, line(None)
+    for row in rows:
+        month = months.setdefault(row["month"], line(row["month"]))
+        index = categories.index(row["category"])
+        for target in [month, total]:
+            for name in ["estimated", "actual"]:
+                target["cells"][index][name] += row[name]
+                target[name] += row[name]
+    return list(months.values()), total
+
+
+def period_start(day, period):
+    """First day of the day/week (Monday)/month that day falls in"""
+    if period == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def cash_flow_timeline(events, period="month"):
+    """Paid and scheduled outflow of the given events per period, with the cumulative burn.
+
+    Reads the maintained BudgetCashFlowDay buckets (summed per day across the events in one
+    grouped query) instead of the budget items, plus the events' estimated total from their
+    budget summaries. Each period has paid, scheduled, cumulative_paid, cumulative_total (paid
+    and scheduled so far) and remaining (estimated total minus cumulative_total).
+    """
+    days = (
+        BudgetCashFlowDay.objects.filter(event__in=events)
+        .values("day")
+        .annotate(paid=Sum("paid", output_field=MONEY), scheduled=Sum("scheduled", output_field=MONEY))
+        .order_by("day")
+    )
+    estimated = (
+        BudgetSummary.objects.filter(event__in=events)
+        .aggregate(total=Coalesce(Sum("estimated_total"), Decimal("0"), output_field=MONEY))["total"]
+        .quantize(CENTS)
+    )
+
+    periods = []
+    for row in days:
+        start = period_start(row["day"], period)
+        if not periods or periods[-1]["start"] != start:
+            periods.append({"start": start, "paid": Decimal("0"), "scheduled": Decimal("0")})
+        periods[-1]["paid"] += row["paid"].quantize(CENTS)
+        periods[-1]["scheduled"] += row["scheduled"].quantize(CENTS)
+
+    cumulative_paid = cumulative_total = Decimal("0")
+    for entry in periods:
+        cumulative_paid += entry["paid"]
+        cumulative_total += entry["paid"] + entry["scheduled"]
+        entry["cumulative_paid"] = cumulative_paid
+        entry["cumulative_total"] = cumulative_total
+        entry["remaining"] = estimated - cumulative_total
+        entry["burn"] = cumulative_paid / estimated * 100 if estimated else None
+    return {
+        "periods": periods,
+        "estimated_total": estimated,
+        "paid_total": cumulative_paid,
+        "scheduled_total": cumulative_total - cumulative_paid,
+    }
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from events.models import Event
+
+from .models import BudgetCashFlowDay, BudgetItem, BudgetSummary
+from .reports import invalidate_budget_rollup
+
+
+def _invalidate_owner_rollup(event_id):
+    owner_ids = Event.all_objects.filter(pk=event_id).values_list("created_by_id", flat=True)
+    invalidate_budget_rollup(*owner_ids)
+
+
+@receiver(post_save, sender=BudgetItem)
+def budget_item_saved(sender, instance, raw=False, **kwargs):
+    """Recompute the event's budget summary and the cash-flow days the item is on, and drop the cached rollup"""
+    if raw:
+        return
+
+    BudgetSummary.rebuild([instance.event_id])
+    days = {instance.payment_date, getattr(instance, "_loaded_payment_date", None)} - {None}
+    if days:
+        BudgetCashFlowDay.rebuild([instance.event_id], days=days)
+    instance._loaded_payment_date = instance.payment_date
+    _invalidate_owner_rollup(instance.event_id)
+
+
+@receiver(post_delete, sender=BudgetItem)
+def budget_item_deleted(sender, instance, **kwargs):
+    # Only refresh a summary that still exists, so an event being deleted does not get one rebuilt
+    if BudgetSummary.objects.filter(event_id=instance.event_id).exists():
+        BudgetSummary.rebuild([instance.event_id])
+    if instance.payment_date:
+        BudgetCashFlowDay.rebuild([instance.event_id], days=[instance.payment_date])
+    _invalidate_owner_rollup(instance.event_id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed_rollup(sender, instance, **kwargs):
+    """The rollup buckets items by their event's type and start date, and leaves out deleted events"""
+    invalidate_budget_rollup(instance.created_by_id)
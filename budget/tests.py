@@ -1,3 +1,506 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import Event
+from vendors.models import EventVendor, Vendor
+
+from .forms import import_budget_items
+from .models import BudgetCashFlowDay, BudgetItem, BudgetSummary
+from .reports import build_budget_rollup, cash_flow_timeline, get_budget_rollup
+
+User = get_user_model()
+
+
+class BudgetSummaryTestCase(TestCase):
+    """Test cases for the materialized per-event budget summary"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        self.hall = BudgetItem.objects.create(
+            event=self.event,
+            category="venue",
+            name="Hall",
+            estimated_cost=Decimal("1000"),
+            actual_cost=Decimal("1200"),
+            status="paid",
+        )
+        self.dinner = BudgetItem.objects.create(
+            event=self.event, category="catering", name="Dinner", estimated_cost=Decimal("500")
+        )
+        self.cake = BudgetItem.objects.create(
+            event=self.event, category="catering", name="Cake", estimated_cost=Decimal("80"), status="pending"
+        )
+
+    def test_summary_follows_item_writes(self):
+        """Test totals, breakdowns and paid/outstanding are kept current on save and delete"""
+        summary = BudgetSummary.objects.get(event=self.event)
+        self.assertEqual(summary.item_count, 3)
+        self.assertEqual(summary.estimated_total, Decimal("1580"))
+        self.assertEqual(summary.actual_total, Decimal("1200"))
+        self.assertEqual(summary.paid_total, Decimal("1200"))
+        self.assertEqual(summary.outstanding_total, Decimal("580"))
+        catering = summary.by_category[1]
+        self.assertEqual((catering["key"], catering["count"], catering["estimated"]), ("catering", 2, Decimal("580")))
+        self.assertEqual([row["key"] for row in summary.by_status], ["planned", "paid", "pending"])
+
+        self.dinner.status = "paid"
+        self.dinner.actual_cost = Decimal("450")
+        self.dinner.save()
+        self.cake.delete()
+        summary.refresh_from_db()
+        self.assertEqual(summary.item_count, 2)
+        self.assertEqual(summary.paid_total, Decimal("1650"))
+        self.assertEqual(summary.outstanding_total, Decimal("0"))
+        self.assertEqual([row["key"] for row in summary.by_category], ["venue", "catering"])
+
+    def test_budget_page_reads_summary_with_event(self):
+        """Test the budget page gets the event and its totals in one query"""
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("budget:budget_list", args=[self.event.pk])
+        # Warm the navbar's cached invitation badge count
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        # session, user, event with summary, budget items
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(response.context["summary"].estimated_total, Decimal("1580"))
+        self.assertContains(response, "$580.00")
+
+    def test_migration_backfills_summaries(self):
+        """Test the backfill migration writes summaries for events that already had items"""
+        import importlib
+
+        from django.db.migrations.loader import MigrationLoader
+
+        name = "0005_backfill_budget_summaries"
+        migration = importlib.import_module(f"budget.migrations.{name}")
+        historical_apps = MigrationLoader(connection).project_state(("budget", name)).apps
+        BudgetSummary.rebuild()
+        expected = BudgetSummary.objects.values().get(event=self.event)
+        BudgetSummary.objects.all().delete()
+
+        migration.backfill_budget_summaries(historical_apps, None)
+        summary = BudgetSummary.objects.values().get(event=self.event)
+        self.assertEqual(summary["estimated_total"], Decimal("1580"))
+        self.assertEqual({**summary, "id": None}, {**expected, "id": None})
+
+    def test_rebuild_command(self):
+        """Test the rebuild command repairs drifted and missing summaries in one pass"""
+        empty_event = Event.objects.create(
+            title="Empty",
+            description="Test Description",
+            event_type="party",
+            start_date=self.event.start_date,
+            end_date=self.event.end_date,
+            venue="Elsewhere",
+            location="Test Location",
+            max_capacity=10,
+            created_by=self.organizer,
+        )
+        BudgetSummary.objects.filter(event=self.event).update(item_count=99, paid_total=0)
+        BudgetSummary.objects.create(event=empty_event, item_count=4, estimated_total=10)
+        # A bulk write that skips the signals
+        BudgetItem.objects.bulk_create(
+            [BudgetItem(event=self.event, category="other", name=f"Favor {i}", estimated_cost=1) for i in range(5)]
+        )
+
+        out = StringIO()
+        call_command("rebuild_budget_summaries", stdout=out)
+        self.assertIn("Rebuilt 2 budget summaries", out.getvalue())
+        summary = BudgetSummary.objects.get(event=self.event)
+        self.assertEqual((summary.item_count, summary.paid_total), (8, Decimal("1200")))
+        empty = BudgetSummary.objects.get(event=empty_event)
+        self.assertEqual((empty.item_count, empty.estimated_total, empty.by_category), (0, 0, []))
+
+
+class BudgetRollupTestCase(TestCase):
+    """Test cases for the cross-event budget rollup report"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.wedding = self.create_event("Wedding", "wedding", datetime.datetime(2026, 6, 20, 15, tzinfo=datetime.UTC))
+        self.party = self.create_event("Party", "party", datetime.datetime(2026, 4, 1, 2, tzinfo=datetime.UTC))
+        BudgetItem.objects.create(
+            event=self.wedding,
+            category="catering",
+            name="Deposit",
+            estimated_cost=Decimal("400"),
+            actual_cost=Decimal("400"),
+            status="paid",
+            payment_date=datetime.date(2026, 3, 14),
+        )
+        BudgetItem.objects.create(event=self.wedding, category="catering", name="Dinner", estimated_cost=Decimal("900"))
+        BudgetItem.objects.create(event=self.party, category="catering", name="Pizza", estimated_cost=Decimal("120"))
+        BudgetItem.objects.create(event=self.party, category="venue", name="Hall", estimated_cost=Decimal("300"))
+
+        other = User.objects.create_user(username="other", password="testpass123")
+        BudgetItem.objects.create(
+            event=self.create_event("Other", "party", self.party.start_date, created_by=other),
+            category="venue",
+            name="Not mine",
+            estimated_cost=Decimal("5000"),
+        )
+
+    def create_event(self, title, event_type, start_date, created_by=None):
+        return Event.objects.create(
+            title=title,
+            description="Test Description",
+            event_type=event_type,
+            start_date=start_date,
+            end_date=start_date + datetime.timedelta(hours=5),
+            venue=f"{title} Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=created_by or self.organizer,
+        )
+
+    def test_rollup_groups_by_payment_or_event_month(self):
+        """Test items land in their payment month, else their event's month, per category and event type"""
+        rows = [
+            (row["month"], row["category"], row["event_type"], row["items"], row["estimated"], row["actual"])
+            for row in build_budget_rollup(self.organizer.pk)
+        ]
+        self.assertEqual(
+            rows,
+            [
+                (datetime.date(2026, 3, 1), "catering", "wedding", 1, Decimal("400"), Decimal("400")),
+                (datetime.date(2026, 4, 1), "catering", "party", 1, Decimal("120"), Decimal("0")),
+                (datetime.date(2026, 4, 1), "venue", "party", 1, Decimal("300"), Decimal("0")),
+                (datetime.date(2026, 6, 1), "catering", "wedding", 1, Decimal("900"), Decimal("0")),
+            ],
+        )
+
+        # Event months follow the active time zone: 2am UTC on April 1st is still March in New York
+        with timezone.override("America/New_York"):
+            months = {row["month"] for row in build_budget_rollup(self.organizer.pk) if row["event_type"] == "party"}
+        self.assertEqual(months, {datetime.date(2026, 3, 1)})
+
+    def test_rollup_is_cached_until_budget_or_event_changes(self):
+        """Test the cached rollup is served without queries and dropped on budget and event writes"""
+        get_budget_rollup(self.organizer.pk)
+        with self.assertNumQueries(0):
+            get_budget_rollup(self.organizer.pk)
+
+        BudgetItem.objects.create(event=self.party, category="other", name="Balloons", estimated_cost=Decimal("30"))
+        self.assertEqual(sum(row["items"] for row in get_budget_rollup(self.organizer.pk)), 5)
+
+        self.party.request_deletion()
+        self.assertEqual(sum(row["items"] for row in get_budget_rollup(self.organizer.pk)), 2)
+
+    def test_report_filters_and_csv_export(self):
+        """Test the report page filters by category and exports the same rows as CSV"""
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("budget:budget_rollup")
+        response = self.client.get(url, {"year": "2026", "category": "catering"})
+        self.assertEqual([month["month"].month for month in response.context["months"]], [3, 4, 6])
+        self.assertEqual(response.context["total"]["estimated"], Decimal("1420"))
+
+        response = self.client.get(url, {"year": "2026", "event_type": "party", "format": "csv"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "month,category,event_type,items,estimated,actual")
+        self.assertEqual(lines[1:], ["2026-04,catering,party,1,120.00,0.00", "2026-04,venue,party,1,300.00,0.00"])
+
+
+class BudgetItemImportTestCase(TestCase):
+    """Test cases for importing budget items from CSV/TSV files"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        vendor = Vendor.objects.create(
+            name="Tasty Catering", category="catering", contact_person="Sam", email="sam@example.com", phone_number="1"
+        )
+        self.assignment = EventVendor.objects.create(
+            event=self.event, vendor=vendor, service_description="Dinner", contract_amount=Decimal("5000")
+        )
+
+    def upload(self, content, name="quote.csv"):
+        return SimpleUploadedFile(name, content.encode(), content_type="text/csv")
+
+    def test_import_creates_items_in_bounded_queries(self):
+        """Test a large quote is imported with vendor names resolved and a fixed number of queries"""
+        lines = ["Category,Name,Vendor,Estimated Cost,Actual Cost,Status,Payment Date"]
+        lines += [f'Catering,Dish {i},tasty catering,"$1,000.50",,,2026-05-01' for i in range(200)]
+        with CaptureQueriesContext(connection) as queries:
+            created, errors = import_budget_items(self.event, self.upload("\n".join(lines)), batch_size=50)
+
+        self.assertEqual((created, errors), (200, {}))
+        self.assertLess(len(queries), 20)
+        item = BudgetItem.objects.filter(event=self.event).first()
+        self.assertEqual((item.category, item.status, item.vendor), ("catering", "planned", self.assignment))
+        self.assertEqual(item.estimated_cost, Decimal("1000.50"))
+        self.assertEqual(BudgetSummary.objects.get(event=self.event).item_count, 200)
+
+    def test_tsv_import(self):
+        """Test tab separated files are accepted"""
+        content = "category\tname\testimated_cost\tstatus\nvenue\tHall\t300\tpaid\n"
+        created, errors = import_budget_items(self.event, self.upload(content, "quote.tsv"))
+        self.assertEqual((created, errors), (1, {}))
+        self.assertEqual(BudgetItem.objects.get().status, "paid")
+
+    def test_invalid_rows_write_nothing(self):
+        """Test any bad row rolls back the whole import and every problem is reported by line"""
+        content = "\n".join(
+            [
+                "category,name,vendor,estimated_cost",
+                "venue,Hall,,300",
+                "flowers,Roses,,20",
+                "catering,Dinner,Unknown Co,abc",
+            ]
+            + [f"other,Item {i},,1" for i in range(600)]
+        )
+        created, errors = import_budget_items(self.event, self.upload(content), batch_size=100)
+        self.assertEqual(created, 0)
+        self.assertEqual(list(errors), ["3", "4"])
+        self.assertIn("category", errors["3"])
+        self.assertEqual(set(errors["4"]), {"estimated_cost", "vendor"})
+        self.assertFalse(BudgetItem.objects.exists())
+
+        created, errors = import_budget_items(self.event, self.upload("name,cost\nHall,3\n"))
+        self.assertIn("category, estimated_cost", errors["__all__"]["file"][0])
+
+    def test_amounts_only_accept_thousands_separators(self):
+        """Test commas are stripped only between groups of three digits and any other comma is a row error"""
+        content = 'category,name,estimated_cost,actual_cost\nvenue,Hall,"12,345.60","$1,000"\nvenue,Tent,"12,5",\n'
+        created, errors = import_budget_items(self.event, self.upload(content))
+        self.assertEqual(created, 0)
+        self.assertEqual(list(errors), ["3"])
+        self.assertEqual(list(errors["3"]), ["estimated_cost"])
+        self.assertIn("12,5 is not a valid amount", errors["3"]["estimated_cost"][0])
+
+        content = 'category,name,estimated_cost,actual_cost\nvenue,Hall,"12,345.60","$1,000"\n'
+        self.assertEqual(import_budget_items(self.event, self.upload(content)), (1, {}))
+        item = BudgetItem.objects.get()
+        self.assertEqual((item.estimated_cost, item.actual_cost), (Decimal("12345.60"), Decimal("1000")))
+
+    def test_ambiguous_vendor_name_is_a_row_error(self):
+        """Test a name shared by two of the event's vendors is reported instead of picking one"""
+        namesake = Vendor.objects.create(
+            name="Tasty Catering",
+            category="catering",
+            contact_person="Alex",
+            email="alex@example.com",
+            phone_number="2",
+        )
+        EventVendor.objects.create(
+            event=self.event, vendor=namesake, service_description="Dessert", contract_amount=Decimal("100")
+        )
+        content = "category,name,vendor,estimated_cost\ncatering,Dinner,Tasty Catering,100\n"
+        created, errors = import_budget_items(self.event, self.upload(content))
+        self.assertEqual(created, 0)
+        self.assertIn("ambiguous", errors["2"]["vendor"][0])
+
+    def test_import_view(self):
+        """Test the import page reports errors, imports valid files and is scoped to the organizer"""
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("budget:budgetitem_import", args=[self.event.pk])
+        response = self.client.post(url, {"file": self.upload("category,name,estimated_cost\nvenue,,10\n")})
+        self.assertContains(response, "Nothing was imported.")
+        self.assertEqual(response.context["import_errors"], [("2", "name", "This field is required.")])
+
+        response = self.client.post(url, {"file": self.upload("category,name,estimated_cost\nvenue,Hall,10\n")})
+        self.assertRedirects(response, reverse("budget:budget_list", args=[self.event.pk]))
+        self.assertEqual(BudgetItem.objects.get().name, "Hall")
+
+        User.objects.create_user(username="other", password="testpass123")
+        self.client.login(username="other", password="testpass123")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        create_url = reverse("budget:budgetitem_create", args=[self.event.pk])
+        self.assertEqual(self.client.get(create_url).status_code, 404)
+
+
+class BudgetCashFlowTestCase(TestCase):
+    """Test cases for the per-day cash-flow buckets and the timeline built from them"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        # 2026-03-02 is a Monday
+        self.hall = BudgetItem.objects.create(
+            event=self.event,
+            category="venue",
+            name="Hall",
+            estimated_cost=Decimal("1000"),
+            actual_cost=Decimal("1200"),
+            status="paid",
+            payment_date=datetime.date(2026, 3, 2),
+        )
+        self.dinner = BudgetItem.objects.create(
+            event=self.event,
+            category="catering",
+            name="Dinner",
+            estimated_cost=Decimal("500"),
+            status="pending",
+            payment_date=datetime.date(2026, 3, 4),
+        )
+        self.cake = BudgetItem.objects.create(
+            event=self.event,
+            category="catering",
+            name="Cake",
+            estimated_cost=Decimal("80"),
+            status="pending",
+            payment_date=datetime.date(2026, 4, 10),
+        )
+        BudgetItem.objects.create(event=self.event, category="other", name="Favors", estimated_cost=Decimal("20"))
+
+    def buckets(self):
+        return {
+            day: (paid, scheduled)
+            for day, paid, scheduled in BudgetCashFlowDay.objects.filter(event=self.event).values_list(
+                "day", "paid", "scheduled"
+            )
+        }
+
+    def test_buckets_follow_item_writes(self):
+        """Test the days an item moves from and to are both refreshed on save, and on delete"""
+        self.assertEqual(
+            self.buckets(),
+            {
+                datetime.date(2026, 3, 2): (Decimal("1200"), Decimal("0")),
+                datetime.date(2026, 3, 4): (Decimal("0"), Decimal("500")),
+                datetime.date(2026, 4, 10): (Decimal("0"), Decimal("80")),
+            },
+        )
+
+        self.dinner.payment_date = datetime.date(2026, 3, 2)
+        self.dinner.status = "paid"
+        self.dinner.actual_cost = Decimal("450")
+        self.dinner.save()
+        self.cake.delete()
+        self.assertEqual(self.buckets(), {datetime.date(2026, 3, 2): (Decimal("1650"), Decimal("0"))})
+
+    def test_timeline_folds_days_into_periods(self):
+        """Test weekly and monthly folding, cumulative totals and remaining against the estimate"""
+        events = Event.objects.filter(pk=self.event.pk)
+        weekly = cash_flow_timeline(events, "week")
+        self.assertEqual(
+            [(entry["start"], entry["paid"], entry["scheduled"]) for entry in weekly["periods"]],
+            [
+                (datetime.date(2026, 3, 2), Decimal("1200"), Decimal("500")),
+                (datetime.date(2026, 4, 6), Decimal("0"), Decimal("80")),
+            ],
+        )
+
+        monthly = cash_flow_timeline(events, "month")
+        self.assertEqual(monthly["estimated_total"], Decimal("1600"))
+        self.assertEqual((monthly["paid_total"], monthly["scheduled_total"]), (Decimal("1200"), Decimal("580")))
+        march, april = monthly["periods"]
+        self.assertEqual(march["start"], datetime.date(2026, 3, 1))
+        self.assertEqual((march["cumulative_total"], march["remaining"]), (Decimal("1700"), Decimal("-100")))
+        self.assertEqual((april["cumulative_paid"], april["burn"]), (Decimal("1200"), Decimal("75")))
+
+    def test_migration_backfills_buckets(self):
+        """Test the backfill migration fills the timeline for items that already had payment dates"""
+        import importlib
+
+        from django.db.migrations.loader import MigrationLoader
+
+        name = "0006_backfill_cash_flow_days"
+        migration = importlib.import_module(f"budget.migrations.{name}")
+        historical_apps = MigrationLoader(connection).project_state(("budget", name)).apps
+        expected = self.buckets()
+        BudgetCashFlowDay.objects.all().delete()
+
+        migration.backfill_cash_flow_days(historical_apps, None)
+        self.assertEqual(len(self.buckets()), 3)
+        self.assertEqual(self.buckets(), expected)
+
+    def test_rebuild_command_repairs_buckets(self):
+        """Test the rebuild command recomputes buckets that drifted or were never written"""
+        BudgetCashFlowDay.objects.filter(event=self.event).update(paid=0, scheduled=0)
+        BudgetItem.objects.bulk_create(
+            [
+                BudgetItem(
+                    event=self.event,
+                    category="other",
+                    name="Deposit",
+                    estimated_cost=Decimal("40"),
+                    payment_date=datetime.date(2026, 5, 1),
+                )
+            ]
+        )
+        call_command("rebuild_budget_summaries", stdout=StringIO())
+        buckets = self.buckets()
+        self.assertEqual(buckets[datetime.date(2026, 3, 2)], (Decimal("1200"), Decimal("0")))
+        self.assertEqual(buckets[datetime.date(2026, 5, 1)], (Decimal("0"), Decimal("40")))
+
+    def test_cash_flow_views(self):
+        """Test the planner and event pages render the timeline and are scoped to the organizer"""
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("budget:cash_flow"), {"period": "week"})
+        self.assertEqual(response.context["period"], "week")
+        self.assertEqual(len(response.context["periods"]), 2)
+        self.assertContains(response, "$1700.00")
+
+        url = reverse("budget:event_cash_flow", args=[self.event.pk])
+        response = self.client.get(url, {"period": "fortnight"})
+        self.assertEqual(response.context["period"], "month")
+        self.assertEqual(response.context["event"], self.event)
+
+        User.objects.create_user(username="other", password="testpass123")
+        self.client.login(username="other", password="testpass123")
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(reverse("budget:cash_flow")).context["periods"], [])
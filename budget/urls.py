@@ -3,19 +3,26 @@ from django.urls import path
 from .views import (
     BudgetItemCreateView,
     BudgetItemDeleteView,
+    BudgetItemImportView,
     BudgetItemUpdateView,
     BudgetListView,
+    BudgetRollupView,
+    CashFlowView,
 )
 
 app_name = "budget"
 
 urlpatterns = [
+    path("budget/rollup/", BudgetRollupView.as_view(), name="budget_rollup"),
+    path("budget/cash-flow/", CashFlowView.as_view(), name="cash_flow"),
+    path("event/<int:event_pk>/budget/cash-flow/", CashFlowView.as_view(), name="event_cash_flow"),
     path("event/<int:event_pk>/budget/", BudgetListView.as_view(), name="budget_list"),
     path(
         "event/<int:event_pk>/budget/create/",
         BudgetItemCreateView.as_view(),
         name="budgetitem_create",
     ),
+    path("event/<int:event_pk>/budget/import/", BudgetItemImportView.as_view(), name="budgetitem_import"),
     path("budget/<int:pk>/edit/", BudgetItemUpdateView.as_view(), name="budgetitem_edit"),
     path(
         "budget/<int:pk>/delete/",
@@ -1,14 +1,25 @@
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum
-from django.shortcuts import get_object_or_404
+from django.http import HttpResponseBadRequest
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.utils import timezone
+from django.views.generic import CreateView, DeleteView, FormView, ListView, TemplateView, UpdateView
 
+from core.export import EXPORT_FORMATS, streaming_export
 from events.models import Event
 from vendors.models import EventVendor
 
-from .forms import BudgetItemForm
-from .models import BudgetItem
+from .forms import BudgetItemForm, BudgetItemImportForm, BudgetRollupForm, import_budget_items
+from .models import BudgetItem, BudgetSummary
+from .reports import (
+    CASH_FLOW_PERIODS,
+    ROLLUP_COLUMNS,
+    cash_flow_timeline,
+    filter_rollup,
+    get_budget_rollup,
+    pivot_rollup,
+)
 
 
 class BudgetListView(LoginRequiredMixin, ListView):
@@ -17,14 +28,16 @@ class BudgetListView(LoginRequiredMixin, ListView):
     context_object_name = "budget_items"
 
     def get_queryset(self):
-        self.event = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
+        # The summary rides along with the event lookup, so the totals cost no extra query
+        self.event = get_object_or_404(
+            Event.objects.select_related("budget_summary"), pk=self.kwargs["event_pk"], created_by=self.request.user
+        )
         return BudgetItem.objects.filter(event=self.event).select_related("vendor__vendor")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["event"] = self.event
-        context["total_estimated"] = self.get_queryset().aggregate(Sum("estimated_cost"))["estimated_cost__sum"] or 0
-        context["total_actual"] = self.get_queryset().aggregate(Sum("actual_cost"))["actual_cost__sum"] or 0
+        context["summary"] = getattr(self.event, "budget_summary", None) or BudgetSummary.for_event(self.event)
         return context
 
 
@@ -33,33 +46,72 @@ class BudgetItemCreateView(LoginRequiredMixin, CreateView):
     form_class = BudgetItemForm
     template_name = "budget/budgetitem_form.html"
 
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.event = get_object_or_404(Event, pk=kwargs["event_pk"], created_by=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs["event"] = get_object_or_404(Event, pk=self.kwargs["event_pk"])
+        kwargs["event"] = self.event
         return kwargs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        event = get_object_or_404(Event, pk=self.kwargs["event_pk"])
-        context["event"] = event
-        context["event_vendors"] = EventVendor.objects.filter(event=event).select_related("vendor")
+        context["event"] = self.event
+        context["event_vendors"] = EventVendor.objects.filter(event=self.event).select_related("vendor")
         return context
 
     def form_valid(self, form):
-        form.instance.event = get_object_or_404(Event, pk=self.kwargs["event_pk"])
+        form.instance.event = self.event
         return super().form_valid(form)
 
     def get_success_url(self):
         return reverse_lazy("budget:budget_list", kwargs={"event_pk": self.kwargs["event_pk"]})
 
 
+class BudgetItemImportView(LoginRequiredMixin, FormView):
+    """View to add many budget items at once from a CSV or TSV file"""
+
+    form_class = BudgetItemImportForm
+    template_name = "budget/budgetitem_import.html"
+    error_limit = 50
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.event = get_object_or_404(Event, pk=kwargs["event_pk"], created_by=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["event"] = self.event
+        return context
+
+    def form_valid(self, form):
+        created, errors = import_budget_items(self.event, form.cleaned_data["file"].file)
+        if errors:
+            rows = [
+                (line, field, message)
+                for line, row_errors in errors.items()
+                for field, messages in row_errors.items()
+                for message in messages
+            ]
+            return self.render_to_response(
+                self.get_context_data(
+                    form=form, import_errors=rows[: self.error_limit], error_count=len(rows), bad_rows=len(errors)
+                )
+            )
+        messages.success(self.request, f"Imported {created} budget item(s).")
+        return redirect("budget:budget_list", event_pk=self.event.pk)
+
+
 class BudgetItemUpdateView(LoginRequiredMixin, UpdateView):
     model = BudgetItem
     form_class = BudgetItemForm
     template_name = "budget/budgetitem_form.html"
 
     def get_queryset(self):
-        return BudgetItem.objects.filter(event__created_by=self.request.user)
+        return BudgetItem.objects.filter(event__in=Event.objects.filter(created_by=self.request.user))
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
@@ -81,7 +133,65 @@ class BudgetItemDeleteView(LoginRequiredMixin, DeleteView):
     template_name = "budget/budgetitem_confirm_delete.html"
 
     def get_queryset(self):
-        return BudgetItem.objects.filter(event__created_by=self.request.user)
+        return BudgetItem.objects.filter(event__in=Event.objects.filter(created_by=self.request.user))
 
     def get_success_url(self):
         return reverse_lazy("budget:budget_list", kwargs={"event_pk": self.object.event.pk})
+
+
+class BudgetRollupView(LoginRequiredMixin, TemplateView):
+    """Budget of all the planner's events by month and category, filterable and exportable"""
+
+    template_name = "budget/budget_rollup.html"
+
+    def get(self, request, *args, **kwargs):
+        rows = get_budget_rollup(request.user.pk)
+        years = sorted({row["month"].year for row in rows}, reverse=True)
+        # Default to this year once there is something in it
+        this_year = timezone.localdate().year
+        data = request.GET.copy()
+        data.setdefault("year", str(this_year) if this_year in years else "")
+        form = BudgetRollupForm(data, years=years)
+        filters = form.cleaned_data if form.is_valid() else {}
+        rows = filter_rollup(rows, **{name: filters.get(name) for name in ["year", "category", "event_type"]})
+
+        export_format = request.GET.get("format")
+        if export_format:
+            if export_format not in EXPORT_FORMATS:
+                return HttpResponseBadRequest(f"Unsupported export format: {export_format}")
+            lines = ({**row, "month": row["month"].strftime("%Y-%m")} for row in rows)
+            return streaming_export(
+                lines, ROLLUP_COLUMNS, export_format, f"budget-rollup-{filters.get('year') or 'all'}"
+            )
+
+        months, total = pivot_rollup(rows)
+        context = self.get_context_data(
+            form=form, rows=rows, months=months, total=total, categories=BudgetItem.CATEGORY_CHOICES
+        )
+        return self.render_to_response(context)
+
+
+class CashFlowView(LoginRequiredMixin, TemplateView):
+    """Paid and scheduled spend per day, week or month with the cumulative burn.
+
+    Covers all the planner's events, or one event under event/<event_pk>/.
+    """
+
+    template_name = "budget/cash_flow.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        event = None
+        events = Event.objects.filter(created_by=self.request.user)
+        if "event_pk" in self.kwargs:
+            event = get_object_or_404(events, pk=self.kwargs["event_pk"])
+            events = events.filter(pk=event.pk)
+        period = self.request.GET.get("period")
+        if period not in dict(CASH_FLOW_PERIODS):
+            period = "month"
+
+        context.update(cash_flow_timeline(events, period))
+        context["event"] = event
+        context["period"] = period
+        context["period_choices"] = CASH_FLOW_PERIODS
+        return context
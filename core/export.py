@@ -0,0 +1,49 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+# Leading characters that make spreadsheet applications evaluate a cell (CSV/formula injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class Echo:
+    """File-like object that hands back whatever is written, so csv.writer output can be streamed"""
+
+    def write(self, value):
+        return value
+
+
+def csv_cell(value):
+    """A CSV cell value; text a spreadsheet would run as a formula is prefixed with a quote"""
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_cell(row[column]) for column in columns])
+
+
+def ndjson_lines(rows, columns):
+    for row in rows:
+        yield json.dumps({column: row[column] for column in columns}, cls=DjangoJSONEncoder) + "\n"
+
+
+def streaming_export(rows, columns, export_format, filename):
+    """Stream dict rows (e.g. from values().iterator()) as a CSV or NDJSON download"""
+    content_type, extension = EXPORT_FORMATS[export_format]
+    lines = csv_lines(rows, columns) if export_format == "csv" else ndjson_lines(rows, columns)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -0,0 +1,140 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps full microsecond precision, which DjangoJSONEncoder truncates, so seek comparisons stay exact"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Cursor (seek) pagination over a fixed ordering.
+
+    Instead of OFFSET, each page filters on the ordering values of the last row seen, so
+    deep pages cost the same as the first one. The last ordering field must be unique
+    (usually "pk") and ordering fields must not be nullable. Works with model instances
+    and with values() dicts.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        values, backwards = self.decode_cursor(cursor)
+        ordering = [self._flip(field) for field in self.ordering] if backwards else self.ordering
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, values))
+        items = list(queryset[: self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[: self.per_page]
+        if backwards:
+            items.reverse()
+
+        if not items:
+            return KeysetPage(items)
+        has_next = True if backwards else has_more
+        has_previous = has_more if backwards else values is not None
+        return KeysetPage(
+            items,
+            next_cursor=self.encode_cursor(items[-1], backwards=False) if has_next else None,
+            previous_cursor=self.encode_cursor(items[0], backwards=True) if has_previous else None,
+        )
+
+    def encode_cursor(self, item, backwards):
+        values = [self._value(item, field.lstrip("-")) for field in self.ordering]
+        payload = json.dumps({"v": values, "b": backwards}, cls=CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """Return (ordering values, backwards) for a cursor; invalid cursors start from the first page"""
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values, backwards = payload["v"], bool(payload["b"])
+            if not isinstance(values, list) or len(values) != len(self.ordering) or None in values:
+                return None, False
+            # Values of the wrong type would otherwise only fail once the seek filter is evaluated
+            values = [self._field(field.lstrip("-")).to_python(value) for field, value in zip(self.ordering, values)]
+        except (binascii.Error, ValidationError, ValueError, TypeError, KeyError):
+            return None, False
+        return values, backwards
+
+    def _field(self, name):
+        """The model field an ordering name like "pk" or "guest__user__last_name" points to"""
+        opts = self.queryset.model._meta
+        for part in name.split("__"):
+            field = opts.pk if part == "pk" else opts.get_field(part)
+            if field.is_relation:
+                opts = field.related_model._meta
+        return field
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _seek_filter(ordering, values):
+        """(a > x) OR (a = x AND b > y) OR ... following each field's direction
+
+        The redundant a >= x bound in front lets the database turn the seek into an index range
+        scan instead of walking (and discarding) every row before the cursor.
+        """
+        first = ordering[0]
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{name}__{lookup}": values[i]})
+            for previous, value in zip(ordering[:i], values[:i]):
+                step &= Q(**{previous.lstrip("-"): value})
+            condition |= step
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": values[0]}) & condition
+
+    @staticmethod
+    def _value(item, field):
+        if isinstance(item, dict):
+            return item[field]
+        for part in field.split("__"):
+            item = getattr(item, part)
+        return item
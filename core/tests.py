@@ -1,3 +1,78 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+
+from events.models import Event
+
+from .export import csv_lines, ndjson_lines
+from .pagination import KeysetPaginator
+
+User = get_user_model()
+
+
+class KeysetPaginatorTestCase(TestCase):
+    """Test cases for cursor pagination"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.organizer = User.objects.create_user(username="organizer", password="testpass123")
+        start = timezone.now()
+        # Two events share each start date to exercise the pk tie-breaker
+        for i in range(6):
+            Event.objects.create(
+                title=f"Event {i}",
+                description="Test",
+                event_type="party",
+                start_date=start + timezone.timedelta(days=i // 2),
+                end_date=start + timezone.timedelta(days=i // 2, hours=3),
+                venue="Venue",
+                location="Location",
+                max_capacity=10,
+                created_by=self.organizer,
+            )
+        self.paginator = KeysetPaginator(Event.objects.all(), ["-start_date", "-pk"], per_page=4)
+
+    def test_pages_forward_and_backward(self):
+        """Test walking forward and back returns consistent pages"""
+        first = self.paginator.page()
+        self.assertEqual([e.title for e in first], ["Event 5", "Event 4", "Event 3", "Event 2"])
+        self.assertTrue(first.has_next)
+        self.assertFalse(first.has_previous)
+
+        second = self.paginator.page(first.next_cursor)
+        self.assertEqual([e.title for e in second], ["Event 1", "Event 0"])
+        self.assertFalse(second.has_next)
+
+        back = self.paginator.page(second.previous_cursor)
+        self.assertEqual([e.title for e in back], ["Event 5", "Event 4", "Event 3", "Event 2"])
+        self.assertFalse(back.has_previous)
+
+    def test_values_rows_and_invalid_cursor(self):
+        """Test dict rows are supported and a garbage cursor falls back to the first page"""
+        paginator = KeysetPaginator(Event.objects.values("pk", "title", "start_date"), ["start_date", "pk"], 5)
+        page = paginator.page("not-a-cursor")
+        self.assertEqual(page.object_list[0]["title"], "Event 0")
+        self.assertEqual([row["title"] for row in paginator.page(page.next_cursor)], ["Event 5"])
+
+    def test_cursor_with_wrong_value_types_starts_over(self):
+        """Test a well-formed cursor holding values of the wrong type falls back to the first page"""
+        for values in [["garbage", 1], [timezone.now().isoformat(), "x"], [None, 1], [[1], {}]]:
+            payload = json.dumps({"v": values, "b": False}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            page = self.paginator.page(cursor)
+            self.assertEqual([e.title for e in page], ["Event 5", "Event 4", "Event 3", "Event 2"])
+
+
+class ExportTestCase(TestCase):
+    """Test cases for the streaming CSV/NDJSON export helpers"""
 
-# Create your tests here.
+    def test_csv_neutralizes_formulas(self):
+        """Test text cells a spreadsheet would evaluate are quoted in CSV but left raw in NDJSON"""
+        rows = [{"name": '=HYPERLINK("http://x")', "notes": "@SUM(A1)", "plus_ones": -1, "email": "a@example.com"}]
+        columns = ["name", "notes", "plus_ones", "email"]
+        lines = list(csv_lines(rows, columns))
+        self.assertEqual(lines[1], '"\'=HYPERLINK(""http://x"")",\'@SUM(A1),-1,a@example.com\r\n')
+        self.assertIn('"name": "=HYPERLINK', next(ndjson_lines(rows, columns)))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Event
+from .models import ArchivedEvent, Event
 
 
 @admin.register(Event)
@@ -9,3 +9,11 @@ class EventAdmin(admin.ModelAdmin):
     list_filter = ["event_type", "status", "start_date"]
     search_fields = ["title", "description", "venue"]
     date_hierarchy = "start_date"
+
+
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(admin.ModelAdmin):
+    list_display = ["title", "event_type", "status", "start_date", "created_by", "archived_at"]
+    list_filter = ["event_type", "status"]
+    search_fields = ["title", "venue"]
+    readonly_fields = ["payload"]
@@ -0,0 +1,230 @@
+import datetime
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags, quote_etag
+
+from vendors.models import EventVendor
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+class ApiError(Exception):
+    """Bad query parameters, reported to the client as a 400 with the message"""
+
+    status = 400
+
+
+class ApiNotFound(ApiError):
+    """The event is missing or not the planner's; a JSON 404 rather than the HTML error page"""
+
+    status = 404
+
+
+class ApiField:
+    """One selectable field of an API resource.
+
+    source is a dotted attribute path or a callable taking the object. only, select and prefetch
+    list the columns and relations the field reads, so a request loads nothing it does not return.
+    """
+
+    def __init__(self, source, only=None, select=(), prefetch=()):
+        self.source = source
+        self.only = [source.replace(".", "__")] if only is None and isinstance(source, str) else list(only or [])
+        self.select = list(select)
+        self.prefetch = list(prefetch)
+
+    def value(self, obj):
+        if callable(self.source):
+            return self.source(obj)
+        for part in self.source.split("."):
+            obj = getattr(obj, part)
+            if obj is None:
+                return None
+        return obj
+
+
+def _invitation_counts(event):
+    counter = getattr(event, "invitation_counter", None)
+    return {status: getattr(counter, status, 0) for status in ["pending", "accepted", "declined"]}
+
+
+def _event_vendors(event):
+    return [
+        {"id": assignment.pk, "name": assignment.vendor.name, "status": assignment.status}
+        for assignment in event.event_vendors.all()
+    ]
+
+
+def _rsvp(guest):
+    rsvp = getattr(guest, "rsvp", None)
+    return {"status": rsvp.status, "number_of_guests": rsvp.number_of_guests} if rsvp else None
+
+
+EVENT_FIELDS = {
+    "id": ApiField("pk", only=[]),
+    "title": ApiField("title"),
+    "description": ApiField("description"),
+    "event_type": ApiField("event_type"),
+    "status": ApiField("status"),
+    "start_date": ApiField("start_date"),
+    "end_date": ApiField("end_date"),
+    "venue": ApiField("venue"),
+    "location": ApiField("location"),
+    "max_capacity": ApiField("max_capacity"),
+    "confirmed_headcount": ApiField("confirmed_headcount"),
+    "created_at": ApiField("created_at"),
+    "updated_at": ApiField("updated_at"),
+    "organizer": ApiField("created_by.username", select=["created_by"]),
+    "invitations": ApiField(
+        _invitation_counts,
+        only=["invitation_counter__pending", "invitation_counter__accepted", "invitation_counter__declined"],
+        select=["invitation_counter"],
+    ),
+    "vendors": ApiField(
+        _event_vendors,
+        prefetch=[
+            Prefetch(
+                "event_vendors",
+                EventVendor.objects.select_related("vendor").only("event", "status", "vendor__name").order_by("pk"),
+            )
+        ],
+    ),
+}
+EVENT_DEFAULT_FIELDS = ["id", "title", "event_type", "status", "start_date", "end_date", "venue"]
+
+GUEST_FIELDS = {
+    "id": ApiField("pk", only=[]),
+    "user_id": ApiField("user_id"),
+    "username": ApiField("user.username", select=["user"]),
+    "name": ApiField(
+        lambda guest: guest.user.get_full_name(), only=["user__first_name", "user__last_name"], select=["user"]
+    ),
+    "email": ApiField("user.email", select=["user"]),
+    "rsvp": ApiField(_rsvp, only=["rsvp__status", "rsvp__number_of_guests"], select=["rsvp"]),
+    "added_at": ApiField("added_at"),
+}
+GUEST_DEFAULT_FIELDS = ["id", "username", "name", "rsvp"]
+
+VENDOR_FIELDS = {
+    "id": ApiField("pk", only=[]),
+    "vendor_id": ApiField("vendor_id"),
+    "name": ApiField("vendor.name", select=["vendor"]),
+    "category": ApiField("vendor.category", select=["vendor"]),
+    "contact_person": ApiField("vendor.contact_person", select=["vendor"]),
+    "email": ApiField("vendor.email", select=["vendor"]),
+    "phone_number": ApiField("vendor.phone_number", select=["vendor"]),
+    "service_description": ApiField("service_description"),
+    "contract_amount": ApiField("contract_amount"),
+    "status": ApiField("status"),
+}
+VENDOR_DEFAULT_FIELDS = ["id", "name", "category", "contract_amount", "status"]
+
+BUDGET_ITEM_FIELDS = {
+    "id": ApiField("pk", only=[]),
+    "name": ApiField("name"),
+    "category": ApiField("category"),
+    "estimated_cost": ApiField("estimated_cost"),
+    "actual_cost": ApiField("actual_cost"),
+    "status": ApiField("status"),
+    "payment_date": ApiField("payment_date"),
+    "vendor_id": ApiField("vendor_id"),
+    "vendor": ApiField("vendor.vendor.name", select=["vendor__vendor"]),
+}
+BUDGET_ITEM_DEFAULT_FIELDS = ["id", "name", "category", "estimated_cost", "actual_cost", "status"]
+
+
+def parse_fields(value, available, default):
+    """Field names from a comma separated ?fields= value, or the resource's defaults when absent"""
+    if not value:
+        return list(default)
+    names = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}.")
+    return names
+
+
+def select_fields(queryset, available, names, ordering=()):
+    """Restrict queryset to the columns and relations the requested fields read.
+
+    Ordering fields are loaded too since the keyset cursor is built from them.
+    """
+    fields = [available[name] for name in names]
+    only = [column for field in fields for column in field.only]
+    only += [name.lstrip("-") for name in ordering if name.lstrip("-") != "pk"]
+    select = [path for field in fields for path in field.select]
+    prefetch = [path for field in fields for path in field.prefetch]
+    queryset = queryset.only(*dict.fromkeys(only)) if only else queryset.only("pk")
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+    return queryset
+
+
+def serialize(obj, available, names):
+    return {name: available[name].value(obj) for name in names}
+
+
+def parse_page_size(value):
+    if not value:
+        return DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except ValueError:
+        raise ApiError("limit must be a whole number.")
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ApiError(f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return page_size
+
+
+def parse_choice(value, choices, name):
+    if value and value not in dict(choices):
+        raise ApiError(f"Unknown {name}: {value}. Choose from {', '.join(dict(choices))}.")
+    return value
+
+
+def parse_moment(value, name):
+    """A date or datetime query parameter; a bare date means midnight at the start of that day"""
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ApiError(f"{name} must be an ISO 8601 date or datetime.")
+    if not isinstance(moment, datetime.datetime):
+        moment = datetime.datetime.combine(moment, datetime.time())
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def json_response(request, data):
+    """JSON response with a strong ETag over the exact body; a matching If-None-Match gets a 304.
+
+    The body is still built to hash it, but an unchanged collection costs the client nothing
+    to download or parse.
+    """
+    body = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    etag = quote_etag(hashlib.sha256(body).hexdigest())
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if etag in if_none_match or "*" in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    # Per-user data: shared caches must not store it and clients must revalidate before reuse
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def error_response(message, status=400):
+    return HttpResponse(json.dumps({"error": message}), status=status, content_type="application/json")
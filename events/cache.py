@@ -0,0 +1,164 @@
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+DASHBOARD_TIMEOUT = 60 * 10
+EVENT_SUMMARY_TIMEOUT = 60 * 60
+UPCOMING_EVENTS_LIMIT = 5
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def dashboard_key(user_id):
+    return f"events:dashboard:{user_id}"
+
+
+def event_version_key(event_id):
+    return f"events:version:{event_id}"
+
+
+def event_summary_key(event_id, version):
+    return f"events:summary:{event_id}:{version}"
+
+
+def build_dashboard_summary(user_id):
+    """Summarise a planner's events, guests and budget in three aggregate queries"""
+    from .models import Event
+
+    events = Event.objects.filter(created_by_id=user_id)
+    zero = Value(0, output_field=IntegerField())
+    money = Value(Decimal("0"), output_field=MONEY)
+
+    # invitation_counter is one-to-one with Event, so joining it here cannot inflate the event counts
+    summary = events.aggregate(
+        total_events=Count("pk"),
+        **{f"{status}_events": Count("pk", filter=Q(status=status)) for status, _ in Event.STATUS_CHOICES},
+        confirmed_headcount=Coalesce(Sum("confirmed_headcount"), zero),
+        pending_invitations=Coalesce(Sum("invitation_counter__pending"), zero),
+        accepted_invitations=Coalesce(Sum("invitation_counter__accepted"), zero),
+        declined_invitations=Coalesce(Sum("invitation_counter__declined"), zero),
+    )
+    summary.update(
+        events.aggregate(
+            budget_estimated=Coalesce(Sum("budget_items__estimated_cost"), money),
+            budget_actual=Coalesce(Sum("budget_items__actual_cost"), money),
+        )
+    )
+    summary["budget_variance"] = summary["budget_actual"] - summary["budget_estimated"]
+    summary["upcoming_events"] = list(
+        events.filter(status__in=["planning", "confirmed"], start_date__gte=timezone.now())
+        .order_by("start_date")
+        .values("pk", "title", "description", "start_date", "venue", "status")[:UPCOMING_EVENTS_LIMIT]
+    )
+    return summary
+
+
+def get_dashboard_summary(user_id):
+    """Dashboard summary for a planner, served from the cache and rebuilt only on a miss"""
+    key = dashboard_key(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_dashboard_summary(user_id)
+        cache.set(key, summary, DASHBOARD_TIMEOUT)
+    return summary
+
+
+def invalidate_dashboard(*user_ids):
+    keys = [dashboard_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # Drop the keys again after commit in case a concurrent request re-cached the old summary meanwhile
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def get_event_version(event_id):
+    """Current cache version of an event; every cached per-event value is keyed on it"""
+    key = event_version_key(event_id)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 1 so an evicted version can never revive stale entries
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_event_version(*event_ids):
+    """Orphan every cached value of the given events by moving them to a new version"""
+
+    def bump():
+        for event_id in event_ids:
+            try:
+                cache.incr(event_version_key(event_id))
+            except ValueError:
+                cache.set(event_version_key(event_id), time.time_ns(), None)
+
+    bump()
+    # Bump again after commit in case a concurrent request cached old values under the new version meanwhile
+    transaction.on_commit(bump)
+
+
+def invalidate_event_caches(*event_ids):
+    """Invalidate the summaries of the given events and the dashboards of whoever organises them"""
+    from .models import Event
+
+    bump_event_version(*event_ids)
+    owner_ids = Event.all_objects.filter(pk__in=event_ids).values_list("created_by_id", flat=True).distinct()
+    invalidate_dashboard(*owner_ids)
+
+
+def _related_total(queryset, expression, output_field):
+    """Correlated subquery aggregating queryset rows of the outer event, 0 when there are none"""
+    totals = queryset.filter(event=OuterRef("pk")).order_by().values("event").annotate(total=expression)
+    return Coalesce(Subquery(totals.values("total"), output_field=output_field), Value(0), output_field=output_field)
+
+
+def build_event_summary(event_id):
+    """Invitation, guest, budget and vendor totals of one event in a single annotated query"""
+    from budget.models import BudgetItem
+    from guests.models import Guest
+    from vendors.models import EventVendor
+
+    from .models import Event
+
+    # Same definition as the headcount and the guest list: every guest whose RSVP is not declined
+    confirmed = Guest.objects.filter(~Q(rsvp__status="declined"))
+    return (
+        Event.objects.filter(pk=event_id)
+        .annotate(
+            pending_invitations=Coalesce(F("invitation_counter__pending"), 0),
+            accepted_invitations=Coalesce(F("invitation_counter__accepted"), 0),
+            declined_invitations=Coalesce(F("invitation_counter__declined"), 0),
+            confirmed_guests=_related_total(confirmed, Count("pk"), IntegerField()),
+            plus_ones=_related_total(confirmed, Sum(F("rsvp__number_of_guests") - 1), IntegerField()),
+            budget_estimated=_related_total(BudgetItem.objects.all(), Sum("estimated_cost"), MONEY),
+            budget_actual=_related_total(BudgetItem.objects.all(), Sum("actual_cost"), MONEY),
+            vendor_count=_related_total(EventVendor.objects.all(), Count("pk"), IntegerField()),
+            contract_total=_related_total(EventVendor.objects.all(), Sum("contract_amount"), MONEY),
+        )
+        .values(
+            "pending_invitations",
+            "accepted_invitations",
+            "declined_invitations",
+            "confirmed_guests",
+            "plus_ones",
+            "budget_estimated",
+            "budget_actual",
+            "vendor_count",
+            "contract_total",
+        )
+        .first()
+    )
+
+
+def get_event_summary(event_id):
+    """Summary panel numbers of an event, cached under the event's current version"""
+    key = event_summary_key(event_id, get_event_version(event_id))
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_event_summary(event_id)
+        cache.set(key, summary, EVENT_SUMMARY_TIMEOUT)
+    return summary
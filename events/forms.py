@@ -1,5 +1,13 @@
 from django import forms
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import formats, timezone
 
+from budget.models import BudgetItem, BudgetSummary
+from guests.models import Invitation, OutgoingEmail
+from vendors.models import EventVendor
+
+from .cache import invalidate_event_caches
 from .models import Event
 
 
@@ -23,3 +31,134 @@ class EventForm(forms.ModelForm):
             "description": forms.Textarea(attrs={"rows": 4}),
             "location": forms.Textarea(attrs={"rows": 3}),
         }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("start_date"), cleaned_data.get("end_date")
+        if start and end and end <= start:
+            self.add_error("end_date", "The event must end after it starts.")
+        elif cleaned_data.get("status") != "cancelled":
+            error = venue_conflict_error(cleaned_data.get("venue"), start, end, exclude_pk=self.instance.pk)
+            if error:
+                self.add_error("venue", error)
+        return cleaned_data
+
+
+def venue_conflict_error(venue, start, end, exclude_pk=None):
+    """Validation message if another non-cancelled event holds venue during [start, end), else None"""
+    if not (venue and start and end):
+        return None
+    conflict = Event.objects.overlapping(venue, start, end).exclude(pk=exclude_pk).only("start_date", "end_date")
+    conflict = conflict.first()
+    if conflict is None:
+        return None
+    window = " to ".join(
+        formats.date_format(timezone.localtime(value), "DATETIME_FORMAT")
+        for value in (conflict.start_date, conflict.end_date)
+    )
+    return f"{venue} is already booked from {window}."
+
+
+class EventCloneForm(forms.Form):
+    title = forms.CharField(max_length=200)
+    start_date = forms.DateTimeField(
+        widget=forms.DateTimeInput(attrs={"type": "datetime-local"}),
+        help_text="The end date moves by the same amount",
+    )
+    reinvite_guests = forms.BooleanField(
+        required=False, initial=True, help_text="Send new invitations to everyone on the guest list"
+    )
+    copy_vendors = forms.BooleanField(required=False, initial=True, help_text="Assign the same vendors (as pending)")
+    copy_budget = forms.BooleanField(required=False, initial=True, help_text="Copy budget items (as planned, unpaid)")
+
+    def __init__(self, *args, event, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.event = event
+
+    def clean_start_date(self):
+        start = self.cleaned_data["start_date"]
+        end = self.event.end_date + (start - self.event.start_date)
+        error = venue_conflict_error(self.event.venue, start, end)
+        if error:
+            raise forms.ValidationError(error)
+        return start
+
+
+class VenueAvailabilityForm(forms.Form):
+    venue = forms.CharField(max_length=200)
+    start = forms.DateTimeField(widget=forms.DateTimeInput(attrs={"type": "datetime-local"}))
+    end = forms.DateTimeField(widget=forms.DateTimeInput(attrs={"type": "datetime-local"}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("start") and cleaned_data.get("end") and cleaned_data["end"] <= cleaned_data["start"]:
+            self.add_error("end", "The end must be after the start.")
+        return cleaned_data
+
+
+def clone_event(event, title, start_date, reinvite_guests=True, copy_vendors=True, copy_budget=True, batch_size=1000):
+    """Copy an event with its guest list, vendor assignments and budget in one transaction.
+
+    Every related table is written with a single bulk_create (per batch), and the copied budget
+    items point at the copied EventVendor rows. Guests are re-invited rather than copied, so they
+    have to accept again. Returns the new event.
+    """
+    User = get_user_model()
+    shift = start_date - event.start_date
+    with transaction.atomic():
+        clone = Event.objects.create(
+            title=title,
+            description=event.description,
+            event_type=event.event_type,
+            status="planning",
+            start_date=start_date,
+            end_date=event.end_date + shift,
+            venue=event.venue,
+            location=event.location,
+            max_capacity=event.max_capacity,
+            created_by=event.created_by,
+        )
+
+        if reinvite_guests:
+            invitees = User.objects.filter(guest_events__event=event).only(
+                "username", "email", "first_name", "last_name"
+            )
+            created, _ = Invitation.objects.bulk_invite(clone, invitees, batch_size=batch_size)
+            OutgoingEmail.queue_invitations(created, batch_size=batch_size, render=False)
+
+        vendor_map = {}
+        if copy_vendors:
+            sources = list(EventVendor.objects.filter(event=event).order_by("pk"))
+            copies = EventVendor.objects.bulk_create(
+                [
+                    EventVendor(
+                        event=clone,
+                        vendor_id=source.vendor_id,
+                        service_description=source.service_description,
+                        contract_amount=source.contract_amount,
+                    )
+                    for source in sources
+                ],
+                batch_size=batch_size,
+            )
+            vendor_map = {source.pk: copy.pk for source, copy in zip(sources, copies)}
+
+        if copy_budget:
+            BudgetItem.objects.bulk_create(
+                [
+                    BudgetItem(
+                        event=clone,
+                        vendor_id=vendor_map.get(item.vendor_id),
+                        category=item.category,
+                        name=item.name,
+                        estimated_cost=item.estimated_cost,
+                    )
+                    for item in BudgetItem.objects.filter(event=event).order_by("pk")
+                ],
+                batch_size=batch_size,
+            )
+            BudgetSummary.rebuild([clone.pk])
+
+        # bulk_create skips the post_save signals that normally refresh these
+        invalidate_event_caches(clone.pk)
+    return clone
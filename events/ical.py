@@ -0,0 +1,122 @@
+import datetime
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Max, Sum
+from django.urls import reverse
+
+FEED_KINDS = ["planner", "invitee"]
+LINE_LIMIT = 75
+STATUS_MAP = {"planning": "TENTATIVE", "confirmed": "CONFIRMED", "completed": "CONFIRMED", "cancelled": "CANCELLED"}
+FEED_FIELDS = ["title", "description", "status", "start_date", "end_date", "venue", "location", "updated_at"]
+
+
+def feed_token(user_id, kind):
+    """Unguessable token identifying a user's feed, since calendar clients cannot log in"""
+    return signing.Signer(salt=f"events.calendar.{kind}").sign(str(user_id))
+
+
+def feed_user_id(token, kind):
+    """User id a feed token was issued for, or None if it was tampered with"""
+    try:
+        return int(signing.Signer(salt=f"events.calendar.{kind}").unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def feed_url(user_id, kind):
+    return settings.SITE_URL.rstrip("/") + reverse(
+        "events:calendar_feed", kwargs={"kind": kind, "token": feed_token(user_id, kind)}
+    )
+
+
+def feed_events(user_id, kind):
+    """Events on a user's feed: the ones they organise, or the ones they are a (non-declined) guest of"""
+    from guests.models import Guest
+
+    from .models import Event
+
+    if kind == "planner":
+        return Event.objects.filter(created_by_id=user_id)
+    guest_events = Guest.objects.filter(user_id=user_id).exclude(rsvp__status="declined").values("event_id")
+    return Event.objects.filter(pk__in=guest_events)
+
+
+def feed_stamp(user_id, kind):
+    """ETag of a feed from one aggregate query.
+
+    The newest updated_at catches edits; the count and id sum catch events that join or leave the feed.
+    No Last-Modified is derived from it: an event leaving the feed (a declined RSVP, a removed guest,
+    a deleted or archived event) does not move any updated_at forward, so If-Modified-Since alone
+    would keep answering 304 with the old feed.
+    """
+    stamp = feed_events(user_id, kind).aggregate(count=Count("pk"), ids=Sum("pk"), last_modified=Max("updated_at"))
+    modified = stamp["last_modified"].timestamp() if stamp["last_modified"] else 0
+    return f"{kind}-{stamp['count']}-{stamp['ids'] or 0}-{modified}"
+
+
+def escape_text(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def format_datetime(value):
+    return value.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def fold(line):
+    """Fold a content line to 75 octets per RFC 5545, continuation lines starting with a space"""
+    encoded = line.encode()
+    if len(encoded) <= LINE_LIMIT:
+        return line + "\r\n"
+    parts, start, limit = [], 0, LINE_LIMIT
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multi-byte UTF-8 character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, LINE_LIMIT - 1
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def event_lines(event, domain, with_url):
+    yield "BEGIN:VEVENT"
+    yield f"UID:event-{event.pk}@{domain}"
+    yield f"DTSTAMP:{format_datetime(event.updated_at)}"
+    yield f"LAST-MODIFIED:{format_datetime(event.updated_at)}"
+    yield f"DTSTART:{format_datetime(event.start_date)}"
+    yield f"DTEND:{format_datetime(event.end_date)}"
+    yield f"SUMMARY:{escape_text(event.title)}"
+    yield f"DESCRIPTION:{escape_text(event.description)}"
+    yield f"LOCATION:{escape_text(', '.join(part for part in [event.venue, event.location] if part))}"
+    yield f"STATUS:{STATUS_MAP.get(event.status, 'CONFIRMED')}"
+    if with_url:
+        yield f"URL:{settings.SITE_URL.rstrip('/')}{reverse('events:event_detail', args=[event.pk])}"
+    yield "END:VEVENT"
+
+
+def calendar_lines(events, name, with_urls=False, chunk_size=500):
+    """Yield the folded lines of a VCALENDAR, reading events from the database in chunks"""
+    domain = urlsplit(settings.SITE_URL).hostname or "localhost"
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Event Planner//Calendar Feed//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    for line in header:
+        yield fold(line)
+    for event in events.only(*FEED_FIELDS).order_by("start_date", "pk").iterator(chunk_size=chunk_size):
+        for line in event_lines(event, domain, with_urls):
+            yield fold(line)
+    yield fold("END:VCALENDAR")
@@ -0,0 +1,65 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils import timezone
+
+from events.models import ArchivedEvent, Event
+
+ARCHIVABLE_STATUSES = ["completed", "cancelled"]
+
+
+class Command(BaseCommand):
+    help = "Move completed and cancelled events that ended before a cutoff, with their dependent rows, to the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=365, help="Archive events that ended more than this many days ago"
+        )
+        parser.add_argument(
+            "--before", type=datetime.date.fromisoformat, help="Cutoff date (YYYY-MM-DD) instead of --days"
+        )
+        parser.add_argument("--chunk-size", type=int, default=100, help="Number of events archived per transaction")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many events would be archived")
+        parser.add_argument(
+            "--restore", type=int, action="append", dest="restore_ids", metavar="EVENT_ID", help="Restore these events"
+        )
+
+    def handle(self, *args, **options):
+        if options["restore_ids"]:
+            return self.restore(options["restore_ids"])
+
+        if options["before"]:
+            cutoff = timezone.make_aware(datetime.datetime.combine(options["before"], datetime.time.min))
+        else:
+            cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+        events = Event.objects.filter(status__in=ARCHIVABLE_STATUSES, end_date__lt=cutoff).order_by("pk")
+
+        if options["dry_run"]:
+            self.stdout.write(f"{events.count()} events ended before {cutoff:%Y-%m-%d %H:%M} would be archived.")
+            return
+
+        archived = 0
+        last_pk = 0
+        while True:
+            chunk = list(events.filter(pk__gt=last_pk).values_list("pk", flat=True)[: options["chunk_size"]])
+            if not chunk:
+                break
+            archived += len(ArchivedEvent.archive(chunk))
+            last_pk = chunk[-1]
+            self.stdout.write(f"Archived {archived} events...")
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} events that ended before {cutoff:%Y-%m-%d %H:%M}."))
+
+    def restore(self, event_ids):
+        archives = {archive.event_id: archive for archive in ArchivedEvent.objects.filter(event_id__in=event_ids)}
+        missing = sorted(set(event_ids) - set(archives))
+        if missing:
+            raise CommandError(f"No archived events with ids {', '.join(map(str, missing))}.")
+        for event_id in event_ids:
+            try:
+                event = archives[event_id].restore()
+            except IntegrityError as exc:
+                raise CommandError(f"Could not restore event {event_id}: {exc}") from exc
+            self.stdout.write(f"Restored {event.title} (#{event.pk}).")
+        self.stdout.write(self.style.SUCCESS(f"Restored {len(event_ids)} events."))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.cache import invalidate_event_caches
+from events.models import Event, purge_event_rows
+
+
+class Command(BaseCommand):
+    help = "Delete events queued for deletion, removing their dependent rows in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows deleted per transaction")
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to sleep between batches")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new deletions instead of exiting")
+        parser.add_argument("--interval", type=int, default=30, help="Seconds to wait between polls with --loop")
+
+    def handle(self, *args, **options):
+        purged = 0
+        while True:
+            queued = list(
+                Event.all_objects.filter(deletion_requested_at__isnull=False).order_by("deletion_requested_at")
+            )
+            for event in queued:
+                self.purge(event, options["batch_size"], options["pause"])
+                purged += 1
+            if not options["loop"]:
+                break
+            if not queued:
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} events."))
+
+    def purge(self, event, batch_size, pause):
+        """Delete an event's rows table by table in batches of short transactions.
+
+        Each batch commits on its own, so an interrupted purge simply continues where it stopped
+        on the next run. The event itself goes last, when nothing is left for the ORM to cascade.
+        """
+        for model, deleted in purge_event_rows([event.pk], batch_size):
+            self.stdout.write(f"{event.title} (#{event.pk}): deleted {deleted} {model._meta.verbose_name_plural}")
+            if pause:
+                time.sleep(pause)
+
+        with transaction.atomic():
+            invalidate_event_caches(event.pk)
+            Event.all_objects.filter(pk=event.pk).delete()
+        self.stdout.write(f"{event.title} (#{event.pk}): deleted")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from events.models import Event
+from events.search import fts_enabled, index_events, optimize_index, prune_index, search_fields_only
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text event search index from the event table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Number of events reindexed per transaction")
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError("The full-text search index is only used on SQLite.")
+
+        chunk_size = options["chunk_size"]
+        # Rows are replaced in place, so search keeps working while the rebuild runs
+        pruned = prune_index()
+        events = search_fields_only(Event.objects.order_by("pk"))
+
+        indexed = 0
+        last_pk = 0
+        while True:
+            chunk = list(events.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic():
+                index_events(chunk)
+            indexed += len(chunk)
+            last_pk = chunk[-1].pk
+            self.stdout.write(f"Indexed {indexed} events...")
+
+        optimize_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} events, removed {pruned} stale entries."))
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:12
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def compute_confirmed_headcount(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    RSVP = apps.get_model("guests", "RSVP")
+    totals = (
+        RSVP.objects.exclude(status="declined")
+        .values("guest__event_id")
+        .annotate(total=Sum("number_of_guests"))
+        .order_by()
+    )
+    for row in totals:
+        Event.objects.filter(pk=row["guest__event_id"]).update(confirmed_headcount=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+        ("guests", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="confirmed_headcount",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Seats held by guests whose RSVP is not declined"
+            ),
+        ),
+        migrations.RunPython(compute_confirmed_headcount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_confirmed_headcount"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["created_by", "start_date", "id"], name="event_owner_start_idx"),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other databases use the icontains fallback in events.search
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE events_event_fts "
+        "USING fts5(owner, title, description, venue, location, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    )
+    schema_editor.execute(
+        "INSERT INTO events_event_fts (rowid, owner, title, description, venue, location) "
+        "SELECT id, 'u' || created_by_id, title, description, venue, location FROM events_event"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE events_event_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_owner_start_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
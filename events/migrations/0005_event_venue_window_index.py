@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_event_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(fields=["venue", "end_date", "start_date"], name="event_venue_window_idx"),
+        ),
+    ]
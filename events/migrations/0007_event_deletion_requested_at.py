@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0006_archivedevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="deletion_requested_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, help_text="Set when the event is queued for purge_deleted_events", null=True
+            ),
+        ),
+    ]
@@ -1,5 +1,36 @@
+from collections import defaultdict
+
+from django.apps import apps
 from django.conf import settings
-from django.db import models
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from guests.cache import invalidate_pending_invitation_count
+
+
+class EventFullError(Exception):
+    """Raised when a booking would take an event past its max_capacity"""
+
+
+class EventQuerySet(models.QuerySet):
+    def overlapping(self, venue, start, end):
+        """Non-cancelled events at venue whose [start_date, end_date) window overlaps [start, end).
+
+        Served by event_venue_window_idx: end_date leads the range so a new booking only reads
+        the venue's bookings that finish after it starts, however long the venue's history is.
+        """
+        return self.filter(venue=venue, end_date__gt=start, start_date__lt=end).exclude(status="cancelled")
+
+
+class EventManager(models.Manager.from_queryset(EventQuerySet)):
+    """Hides events queued for deletion; use Event.all_objects to see them too"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deletion_requested_at__isnull=True)
 
 
 class Event(models.Model):
@@ -26,12 +57,206 @@ class Event(models.Model):
     venue = models.CharField(max_length=200)
     location = models.TextField()
     max_capacity = models.PositiveIntegerField()
+    confirmed_headcount = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Seats held by guests whose RSVP is not declined"
+    )
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="events")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deletion_requested_at = models.DateTimeField(
+        null=True, blank=True, editable=False, help_text="Set when the event is queued for purge_deleted_events"
+    )
+
+    objects = EventManager()
+    all_objects = EventQuerySet.as_manager()
 
     class Meta:
         ordering = ["-start_date"]
+        indexes = [
+            models.Index(fields=["created_by", "start_date", "id"], name="event_owner_start_idx"),
+            models.Index(fields=["venue", "end_date", "start_date"], name="event_venue_window_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+    def request_deletion(self):
+        """Hide the event everywhere right away; purge_deleted_events removes it and its rows in batches"""
+        self.deletion_requested_at = timezone.now()
+        self.save(update_fields=["deletion_requested_at", "updated_at"])
+
+    def adjust_seats(self, delta):
+        """Reserve (positive delta) or release (negative delta) seats.
+
+        Reservations are a single conditional UPDATE, so concurrent bookings can never push the
+        headcount past max_capacity. Returns False if there was not enough room.
+        """
+        events = Event.all_objects.filter(pk=self.pk)
+        if delta > 0:
+            events = events.filter(confirmed_headcount__lte=F("max_capacity") - delta)
+            return events.update(confirmed_headcount=F("confirmed_headcount") + delta) == 1
+        if delta < 0:
+            events.update(confirmed_headcount=Greatest(F("confirmed_headcount") + delta, 0))
+        return True
+
+
+# Dependent tables in deletion order (children before the rows they point at), with the lookup to the event
+PURGE_ORDER = [
+    ("guests.RSVP", "guest__event"),
+    ("guests.Guest", "event"),
+    ("guests.Invitation", "event"),
+    ("budget.BudgetItem", "event"),
+    ("budget.BudgetSummary", "event"),
+    ("budget.BudgetCashFlowDay", "event"),
+    ("vendors.EventVendor", "event"),
+    ("guests.InvitationCounter", "event"),
+]
+
+
+def purge_event_rows(event_ids, batch_size=500):
+    """Delete the dependent rows of the given events table by table, in batches of raw deletes.
+
+    Each batch runs in its own transaction (a savepoint when called inside one). A raw delete
+    skips the per-row signals: the counters and caches they would maintain belong to these
+    events, so callers refresh them once at the end. Yields (model, rows deleted so far) after
+    every batch; the events themselves are left for the caller to delete.
+    """
+    OutgoingEmail = apps.get_model("guests", "OutgoingEmail")
+    for label, lookup in PURGE_ORDER:
+        model = apps.get_model(label)
+        rows = model.objects.filter(**{f"{lookup}__in": event_ids}).order_by().values_list("pk", flat=True)
+        deleted = 0
+        while True:
+            batch = list(rows[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                if label == "guests.Invitation":
+                    OutgoingEmail.objects.filter(invitation__in=batch).update(invitation=None)
+                model.objects.filter(pk__in=batch)._raw_delete(model.objects.db)
+            deleted += len(batch)
+            yield model, deleted
+
+
+class ArchivedEvent(models.Model):
+    """A completed or cancelled event moved out of the live tables by the archive_events command.
+
+    payload holds the serialized event and its dependent rows (see ARCHIVED_MODELS) so that
+    restore() can put them back with their original primary keys.
+    """
+
+    # Dependent models in restore order, with the lookup from each one to its event
+    ARCHIVED_MODELS = [
+        ("guests.Invitation", "event"),
+        ("guests.Guest", "event"),
+        ("guests.RSVP", "guest__event"),
+        ("vendors.EventVendor", "event"),
+        ("budget.BudgetItem", "event"),
+    ]
+
+    event_id = models.PositiveBigIntegerField(unique=True, help_text="Primary key the event had (and gets back)")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_events")
+    title = models.CharField(max_length=200)
+    event_type = models.CharField(max_length=20, choices=Event.EVENT_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=Event.STATUS_CHOICES)
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    venue = models.CharField(max_length=200)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-start_date"]
+        indexes = [
+            models.Index(fields=["created_by", "start_date", "id"], name="archived_owner_start_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+    @classmethod
+    def archive(cls, event_ids, batch_size=500):
+        """Serialize the given events with their dependent rows into archive rows, then delete them.
+
+        Runs in one transaction. The rows go in batched raw deletes like purge_deleted_events,
+        so archiving a large event costs a few queries per batch instead of several per row.
+        Returns the created ArchivedEvent rows.
+        """
+        with transaction.atomic():
+            events = list(Event.objects.filter(pk__in=event_ids).order_by("pk"))
+            event_ids = [event.pk for event in events]
+            rows = defaultdict(lambda: defaultdict(list))
+            for label, lookup in cls.ARCHIVED_MODELS:
+                model = apps.get_model(label)
+                queryset = model.objects.filter(**{f"{lookup}__in": event_ids}).order_by("pk")
+                for obj in queryset.annotate(archived_event_id=F(f"{lookup}_id")):
+                    rows[obj.archived_event_id][label].append(obj)
+
+            archived = cls.objects.bulk_create(
+                [
+                    cls(
+                        event_id=event.pk,
+                        created_by_id=event.created_by_id,
+                        title=event.title,
+                        event_type=event.event_type,
+                        status=event.status,
+                        start_date=event.start_date,
+                        end_date=event.end_date,
+                        venue=event.venue,
+                        payload=serializers.serialize(
+                            "python",
+                            [event] + [obj for label, _ in cls.ARCHIVED_MODELS for obj in rows[event.pk][label]],
+                        ),
+                    )
+                    for event in events
+                ]
+            )
+            for _ in purge_event_rows(event_ids, batch_size):
+                pass
+            # The raw deletes skip the invitation signals, which would drop these from the badge counts
+            invalidate_pending_invitation_count(
+                *(
+                    invitation.invitee_id
+                    for event_rows in rows.values()
+                    for invitation in event_rows["guests.Invitation"]
+                    if invitation.status == "pending"
+                )
+            )
+            Event.objects.filter(pk__in=event_ids).delete()
+        return archived
+
+    def row_counts(self):
+        """Number of archived dependent rows per model, keyed by verbose name, for display"""
+        counts = defaultdict(int)
+        for row in self.payload[1:]:
+            counts[apps.get_model(row["model"])._meta.verbose_name_plural] += 1
+        return dict(counts)
+
+    def restore(self):
+        """Recreate the archived event and its dependent rows, then drop the archive row.
+
+        Raises IntegrityError (and restores nothing) if something the rows point at, such as an
+        invitee or a vendor, has been deleted since.
+        """
+        InvitationCounter = apps.get_model("guests", "InvitationCounter")
+        BudgetSummary = apps.get_model("budget", "BudgetSummary")
+        BudgetCashFlowDay = apps.get_model("budget", "BudgetCashFlowDay")
+        tables = [Event._meta.db_table] + [apps.get_model(label)._meta.db_table for label, _ in self.ARCHIVED_MODELS]
+        with transaction.atomic():
+            for obj in serializers.deserialize("python", self.payload):
+                obj.save()
+            # Like loaddata: raise now for dangling foreign keys instead of at (deferred) commit time
+            connection.check_constraints(table_names=tables)
+            InvitationCounter.rebuild([self.event_id])
+            BudgetSummary.rebuild([self.event_id])
+            BudgetCashFlowDay.rebuild([self.event_id])
+            # Raw saves skip the invitation signals, so the pending invitations are counted again here
+            invalidate_pending_invitation_count(
+                *(
+                    row["fields"]["invitee"]
+                    for row in self.payload
+                    if row["model"] == "guests.invitation" and row["fields"]["status"] == "pending"
+                )
+            )
+            self.delete()
+        return Event.objects.get(pk=self.event_id)
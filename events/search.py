@@ -0,0 +1,119 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = "events_event_fts"
+SEARCH_FIELDS = ["title", "description", "venue", "location"]
+# bm25() weights, in FTS column order (owner, then SEARCH_FIELDS); a title hit counts most
+RANK_WEIGHTS = [0.0, 10.0, 1.0, 4.0, 2.0]
+MAX_TERMS = 8
+
+
+def fts_enabled():
+    """The FTS5 table (see migration 0004_event_search_index) only exists on SQLite"""
+    return connection.vendor == "sqlite"
+
+
+def owner_token(user_id):
+    return f"u{user_id}"
+
+
+def match_expression(user_id, query):
+    """Turn free text into an FTS5 query: every word as a prefix match, scoped to the owner's events.
+
+    Words are quoted so FTS5 operators typed by the user are searched for literally.
+    Returns None when the query has no searchable words.
+    """
+    terms = re.findall(r"\w+", query)[:MAX_TERMS]
+    if not terms:
+        return None
+    words = " ".join(f'"{term}"*' for term in terms)
+    return f'owner : "{owner_token(user_id)}" AND {{{" ".join(SEARCH_FIELDS)}}} : ({words})'
+
+
+def search_fields_only(queryset):
+    """Load just the columns index_events() needs"""
+    return queryset.only("created_by", *SEARCH_FIELDS)
+
+
+def index_events(events):
+    """Insert or refresh the FTS rows of the given events"""
+    if not fts_enabled():
+        return
+    rows = [
+        [event.pk, owner_token(event.created_by_id)] + [getattr(event, field) for field in SEARCH_FIELDS]
+        for event in events
+    ]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[row[0]] for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, owner, {', '.join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def unindex_events(event_ids):
+    if not fts_enabled() or not event_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[event_id] for event_id in event_ids])
+
+
+def prune_index():
+    """Drop FTS rows whose event no longer exists; returns how many were removed"""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid NOT IN (SELECT id FROM events_event)")
+        return cursor.rowcount
+
+
+def optimize_index():
+    """Merge the FTS5 b-tree segments, worth doing after a large rebuild"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+
+def ranked_event_ids(user_id, query, limit):
+    """Ids of the user's events matching query, best match first"""
+    expression = match_expression(user_id, query)
+    if expression is None:
+        return []
+    weights = ", ".join(str(weight) for weight in RANK_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+            [expression, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_events(user, query, limit=50):
+    """The user's events matching query, ranked by relevance.
+
+    Uses the FTS5 index on SQLite; other databases fall back to icontains over SEARCH_FIELDS
+    (every word must match some field), newest first.
+    """
+    from .models import Event
+
+    events = Event.objects.filter(created_by=user)
+    if fts_enabled():
+        ids = ranked_event_ids(user.pk, query, limit)
+        found = events.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+    terms = re.findall(r"\w+", query)[:MAX_TERMS]
+    if not terms:
+        return []
+    for term in terms:
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": term})
+        events = events.filter(condition)
+    return list(events.order_by("-start_date")[:limit])
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_event_version, invalidate_dashboard, invalidate_event_caches
+from .models import Event
+from .search import index_events, unindex_events
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    bump_event_version(instance.pk)
+    invalidate_dashboard(instance.created_by_id)
+
+
+@receiver(post_save, sender=Event)
+def event_saved_search(sender, instance, **kwargs):
+    """Keep the full-text search row of the event current"""
+    index_events([instance])
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted_search(sender, instance, **kwargs):
+    unindex_events([instance.pk])
+
+
+@receiver(post_save, sender="guests.Invitation")
+@receiver(post_delete, sender="guests.Invitation")
+@receiver(post_save, sender="guests.Guest")
+@receiver(post_delete, sender="guests.Guest")
+@receiver(post_save, sender="budget.BudgetItem")
+@receiver(post_delete, sender="budget.BudgetItem")
+@receiver(post_save, sender="vendors.EventVendor")
+@receiver(post_delete, sender="vendors.EventVendor")
+def event_row_changed(sender, instance, raw=False, **kwargs):
+    """Drop the cached event summary and organizer dashboard when something they summarise changes"""
+    if not raw:
+        invalidate_event_caches(instance.event_id)
+
+
+@receiver(post_save, sender="guests.RSVP")
+@receiver(post_delete, sender="guests.RSVP")
+def rsvp_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_event_caches(instance.guest.event_id)
@@ -1,3 +1,984 @@
-from django.test import TestCase
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from budget.models import BudgetItem
+from guests.cache import get_pending_invitation_count
+from guests.models import RSVP, Guest, Invitation, InvitationCounter, OutgoingEmail
+from vendors.models import EventVendor, Vendor
+
+from .cache import (
+    build_dashboard_summary,
+    build_event_summary,
+    get_dashboard_summary,
+    get_event_summary,
+    get_event_version,
+)
+from .forms import EventForm, clone_event
+from .ical import feed_token
+from .models import ArchivedEvent, Event
+from .search import search_events
+
+User = get_user_model()
+
+
+class DashboardTestCase(TestCase):
+    """Test cases for the cached planner dashboard"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.invitee = User.objects.create_user(username="invitee", email="invitee@example.com", password="testpass123")
+
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        Event.objects.create(
+            title="Past Event",
+            description="Test Description",
+            event_type="party",
+            status="completed",
+            start_date=timezone.now() - timezone.timedelta(days=30),
+            end_date=timezone.now() - timezone.timedelta(days=30, hours=-5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=50,
+            created_by=self.organizer,
+        )
+        self.invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        BudgetItem.objects.create(
+            event=self.event, category="venue", name="Hall", estimated_cost=1000, actual_cost=1200, status="paid"
+        )
+
+    def test_summary_is_built_in_bounded_queries(self):
+        """Test the summary aggregates everything in three queries"""
+        with self.assertNumQueries(3):
+            summary = build_dashboard_summary(self.organizer.pk)
+
+        self.assertEqual(summary["total_events"], 2)
+        self.assertEqual(summary["planning_events"], 1)
+        self.assertEqual(summary["completed_events"], 1)
+        self.assertEqual(summary["pending_invitations"], 1)
+        self.assertEqual(summary["budget_estimated"], Decimal("1000"))
+        self.assertEqual(summary["budget_actual"], Decimal("1200"))
+        self.assertEqual(summary["budget_variance"], Decimal("200"))
+        self.assertEqual([event["pk"] for event in summary["upcoming_events"]], [self.event.pk])
+
+    def test_summary_is_cached(self):
+        """Test a second read is served without touching the database"""
+        get_dashboard_summary(self.organizer.pk)
+        with self.assertNumQueries(0):
+            get_dashboard_summary(self.organizer.pk)
+
+    def test_summary_invalidated_on_changes(self):
+        """Test budget, invitation and RSVP changes refresh the cached summary"""
+        get_dashboard_summary(self.organizer.pk)
+
+        BudgetItem.objects.create(event=self.event, category="catering", name="Dinner", estimated_cost=500)
+        self.assertEqual(get_dashboard_summary(self.organizer.pk)["budget_estimated"], Decimal("1500"))
+
+        self.invitation.respond("accepted")
+        summary = get_dashboard_summary(self.organizer.pk)
+        self.assertEqual(summary["pending_invitations"], 0)
+        self.assertEqual(summary["accepted_invitations"], 1)
+        self.assertEqual(summary["confirmed_headcount"], 1)
+
+        self.event.delete()
+        self.assertEqual(get_dashboard_summary(self.organizer.pk)["total_events"], 1)
+
+    def test_dashboard_view(self):
+        """Test the dashboard renders the summary"""
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("events:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_events"], 2)
+        self.assertContains(response, "Test Event")
+        self.assertNotContains(response, "Past Event")
+
+
+class EventListPaginationTestCase(TestCase):
+    """Test cases for keyset pagination of the event list"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        start = timezone.now()
+        for i in range(25):
+            Event.objects.create(
+                title=f"Event {i:02d}",
+                description="Test Description",
+                event_type="party",
+                status="planning",
+                # Pairs of events share a start date so the pk tiebreaker is exercised
+                start_date=start + timezone.timedelta(days=i // 2),
+                end_date=start + timezone.timedelta(days=i // 2, hours=5),
+                venue="Test Venue",
+                location="Test Location",
+                max_capacity=50,
+                created_by=self.organizer,
+            )
+        self.client.login(username="organizer", password="testpass123")
+
+    def test_pages_cover_every_event_once(self):
+        """Test following next cursors visits every event newest first and back again"""
+        url = reverse("events:event_list")
+        response = self.client.get(url)
+        self.assertIsNone(response.context["page"].previous_cursor)
+        self.assertNotIn("total_events", response.context)
+
+        seen, pages = [], []
+        while True:
+            seen.extend(event.pk for event in response.context["events"])
+            pages.append(response.context["page"])
+            if not pages[-1].has_next:
+                break
+            response = self.client.get(url, {"cursor": pages[-1].next_cursor})
+
+        expected = list(Event.objects.order_by("-start_date", "-pk").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        response = self.client.get(url, {"cursor": pages[-1].previous_cursor})
+        self.assertEqual([event.pk for event in response.context["events"]], expected[10:20])
+
+    def test_count_is_optional(self):
+        """Test the total is only computed when asked for"""
+        response = self.client.get(reverse("events:event_list"), {"count": "1"})
+        self.assertEqual(response.context["total_events"], 25)
+        self.assertContains(response, "&count=1")
+
+
+class EventSummaryTestCase(TestCase):
+    """Test cases for the cached event detail summary"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        for i in range(3):
+            invitee = User.objects.create_user(username=f"invitee{i}", password="testpass123")
+            Invitation.objects.create(event=self.event, invitee=invitee)
+        self.invitation = Invitation.objects.first()
+
+        vendor = Vendor.objects.create(
+            name="Caterer", category="catering", contact_person="Sam", email="sam@example.com", phone_number="123"
+        )
+        self.event_vendor = EventVendor.objects.create(
+            event=self.event, vendor=vendor, service_description="Dinner", contract_amount=2000
+        )
+        BudgetItem.objects.create(
+            event=self.event, vendor=self.event_vendor, category="catering", name="Dinner", estimated_cost=2000
+        )
+
+    def test_summary_in_one_query(self):
+        """Test every panel number comes from a single annotated query"""
+        self.invitation.respond("accepted")
+        rsvp = self.invitation.guest.rsvp
+        rsvp.number_of_guests = 3
+        rsvp.save()
+
+        with self.assertNumQueries(1):
+            summary = build_event_summary(self.event.pk)
+
+        self.assertEqual(summary["pending_invitations"], 2)
+        self.assertEqual(summary["accepted_invitations"], 1)
+        self.assertEqual(summary["confirmed_guests"], 1)
+        self.assertEqual(summary["plus_ones"], 2)
+        self.assertEqual(summary["budget_estimated"], Decimal("2000"))
+        self.assertEqual(summary["budget_actual"], Decimal("0"))
+        self.assertEqual(summary["vendor_count"], 1)
+        self.assertEqual(summary["contract_total"], Decimal("2000"))
+
+        rsvp.status = "declined"
+        rsvp.save()
+        summary = build_event_summary(self.event.pk)
+        self.assertEqual((summary["confirmed_guests"], summary["plus_ones"]), (0, 0))
+
+    def test_related_writes_bump_the_version(self):
+        """Test the cached summary is replaced after a related write"""
+        version = get_event_version(self.event.pk)
+        get_event_summary(self.event.pk)
+        with self.assertNumQueries(0):
+            get_event_summary(self.event.pk)
+
+        self.event_vendor.contract_amount = 2500
+        self.event_vendor.save()
+        self.assertNotEqual(get_event_version(self.event.pk), version)
+        self.assertEqual(get_event_summary(self.event.pk)["contract_total"], Decimal("2500"))
+
+    def test_summary_only_shown_to_organizer(self):
+        """Test the panel is rendered for the organizer and hidden from other users"""
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("events:event_detail", args=[self.event.pk]))
+        self.assertEqual(response.context["summary"]["vendor_count"], 1)
+        self.assertContains(response, "Confirmed Guests")
+
+        self.client.login(username="invitee0", password="testpass123")
+        response = self.client.get(reverse("events:event_detail", args=[self.event.pk]))
+        self.assertNotIn("summary", response.context)
+
+
+class EventSearchTestCase(TestCase):
+    """Test cases for full-text event search"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        self.gala = self.create_event("Winter Gala", "Black tie dinner", "Grand Ballroom", self.organizer)
+        self.picnic = self.create_event("Company Picnic", "Games and a gala raffle", "Riverside Park", self.organizer)
+        self.other_gala = self.create_event("Gala Night", "Private party", "Grand Ballroom", self.other)
+
+    def create_event(self, title, description, venue, user):
+        return Event.objects.create(
+            title=title,
+            description=description,
+            event_type="party",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue=venue,
+            location="Springfield",
+            max_capacity=50,
+            created_by=user,
+        )
+
+    def test_ranked_prefix_search_scoped_to_owner(self):
+        """Test prefix terms match, title hits rank first and other planners' events are excluded"""
+        self.assertEqual(search_events(self.organizer, "gal"), [self.gala, self.picnic])
+        self.assertEqual(search_events(self.organizer, "ballroom spring"), [self.gala])
+        self.assertEqual(search_events(self.other, "gala"), [self.other_gala])
+        self.assertEqual(search_events(self.organizer, '" OR *'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test edits and deletions are reflected in search results"""
+        self.picnic.title = "Summer Fair"
+        self.picnic.save()
+        self.assertEqual(search_events(self.organizer, "summer"), [self.picnic])
+
+        self.gala.delete()
+        self.assertEqual(search_events(self.organizer, "gala"), [self.picnic])
+
+    def test_rebuild_command(self):
+        """Test the rebuild command restores a wiped index"""
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM events_event_fts")
+            cursor.execute("INSERT INTO events_event_fts (rowid, owner, title) VALUES (999999, 'u1', 'stale')")
+        self.assertEqual(search_events(self.organizer, "gala"), [])
+
+        call_command("rebuild_event_search_index", stdout=StringIO())
+        self.assertEqual(search_events(self.organizer, "gala"), [self.gala, self.picnic])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM events_event_fts")
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+    def test_search_view(self):
+        """Test the search page lists matching events"""
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("events:event_search"), {"q": "riverside"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["events"], [self.picnic])
+        self.assertContains(response, "Company Picnic")
+
+
+class CalendarFeedTestCase(TestCase):
+    """Test cases for the iCalendar feeds"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.invitee = User.objects.create_user(username="invitee", email="invitee@example.com", password="testpass123")
+        self.event = Event.objects.create(
+            title="Launch Party, Part 1",
+            description="Drinks; snacks\\nand a very long description " + "x" * 100,
+            event_type="party",
+            status="confirmed",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Rooftop",
+            location="Main Street 1",
+            max_capacity=50,
+            created_by=self.organizer,
+        )
+        self.planner_url = reverse(
+            "events:calendar_feed", kwargs={"kind": "planner", "token": feed_token(self.organizer.pk, "planner")}
+        )
+        self.invitee_url = reverse(
+            "events:calendar_feed", kwargs={"kind": "invitee", "token": feed_token(self.invitee.pk, "invitee")}
+        )
+
+    def get_feed(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        body = b"".join(response.streaming_content).decode() if response.status_code == 200 else ""
+        return response, body
+
+    def test_planner_feed(self):
+        """Test the planner feed lists their events as folded, escaped VEVENTs"""
+        response, body = self.get_feed(self.planner_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn(f"UID:event-{self.event.pk}@localhost\r\n", body)
+        self.assertIn("SUMMARY:Launch Party\\, Part 1\r\n", body)
+        self.assertIn("STATUS:CONFIRMED\r\n", body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split("\r\n")))
+
+    def test_invitee_feed_follows_guest_rows(self):
+        """Test an invitee only sees events they accepted and have not declined"""
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        self.assertNotIn("BEGIN:VEVENT", self.get_feed(self.invitee_url)[1])
+
+        invitation.respond("accepted")
+        self.assertIn("BEGIN:VEVENT", self.get_feed(self.invitee_url)[1])
+
+        rsvp = invitation.guest.rsvp
+        rsvp.status = "declined"
+        rsvp.save()
+        # The event leaving the feed changes no updated_at, so only the ETag can tell
+        response, body = self.get_feed(self.invitee_url, **{"if-modified-since": http_date(time.time() + 60)})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("BEGIN:VEVENT", body)
+
+    def test_conditional_get(self):
+        """Test unchanged feeds return 304 and edits produce a new ETag"""
+        response, _ = self.get_feed(self.planner_url)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.planner_url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.event.title = "Renamed"
+        self.event.save()
+        response, body = self.get_feed(self.planner_url, **{"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("SUMMARY:Renamed", body)
+
+    def test_bad_token(self):
+        """Test tampered tokens and tokens of the other feed kind are rejected"""
+        bad_url = reverse("events:calendar_feed", kwargs={"kind": "planner", "token": f"{self.organizer.pk}:forged"})
+        self.assertEqual(self.client.get(bad_url).status_code, 404)
+        swapped = reverse(
+            "events:calendar_feed", kwargs={"kind": "invitee", "token": feed_token(self.organizer.pk, "planner")}
+        )
+        self.assertEqual(self.client.get(swapped).status_code, 404)
+
+
+class EventCloneTestCase(TestCase):
+    """Test cases for cloning an event"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Annual Gala",
+            description="Test Description",
+            event_type="corporate",
+            status="completed",
+            start_date=timezone.now() - timezone.timedelta(days=300),
+            end_date=timezone.now() - timezone.timedelta(days=300, hours=-6),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        for i in range(5):
+            invitee = User.objects.create(username=f"guest{i}", email=f"guest{i}@example.com")
+            Invitation.objects.create(event=self.event, invitee=invitee).respond("accepted")
+
+        vendor = Vendor.objects.create(
+            name="Caterer", category="catering", contact_person="Sam", email="sam@example.com", phone_number="123"
+        )
+        self.event_vendor = EventVendor.objects.create(
+            event=self.event, vendor=vendor, service_description="Dinner", contract_amount=2000, status="completed"
+        )
+        BudgetItem.objects.create(
+            event=self.event,
+            vendor=self.event_vendor,
+            category="catering",
+            name="Dinner",
+            estimated_cost=2000,
+            actual_cost=2100,
+            status="paid",
+        )
+        BudgetItem.objects.create(event=self.event, category="venue", name="Hall", estimated_cost=500)
+
+    def test_clone_copies_related_rows(self):
+        """Test guests are re-invited and vendors and budget are copied with the vendor remapped"""
+        start = timezone.now() + timezone.timedelta(days=65)
+        clone = clone_event(self.event, "Annual Gala 2", start)
+
+        self.assertEqual(clone.status, "planning")
+        self.assertEqual(clone.end_date - clone.start_date, self.event.end_date - self.event.start_date)
+        self.assertEqual(clone.confirmed_headcount, 0)
+        self.assertEqual(clone.invitations.filter(status="pending").count(), 5)
+        self.assertEqual(clone.invitation_counter.pending, 5)
+        self.assertEqual(OutgoingEmail.objects.filter(invitation__event=clone).count(), 5)
+        self.assertFalse(clone.guests.exists())
+
+        copied_vendor = clone.event_vendors.get()
+        self.assertEqual((copied_vendor.vendor_id, copied_vendor.status), (self.event_vendor.vendor_id, "pending"))
+        dinner = clone.budget_items.get(name="Dinner")
+        self.assertEqual(dinner.vendor, copied_vendor)
+        self.assertEqual((dinner.status, dinner.actual_cost), ("planned", None))
+        self.assertIsNone(clone.budget_items.get(name="Hall").vendor)
+        self.assertEqual(get_event_summary(clone.pk)["budget_estimated"], Decimal("2500"))
+
+    def test_query_count_does_not_grow_with_guests(self):
+        """Test cloning issues a fixed number of queries however many guests there are"""
+        start = timezone.now() + timezone.timedelta(days=65)
+        with CaptureQueriesContext(connection) as few:
+            clone_event(self.event, "Small", start)
+        for i in range(5, 30):
+            invitee = User.objects.create(username=f"guest{i}", email=f"guest{i}@example.com")
+            Invitation.objects.create(event=self.event, invitee=invitee).respond("accepted")
+        with CaptureQueriesContext(connection) as many:
+            clone_event(self.event, "Large", start)
+        self.assertEqual(len(few), len(many))
+
+    def test_clone_without_extras(self):
+        """Test the related copies can be switched off"""
+        clone = clone_event(
+            self.event, "Bare", self.event.start_date, reinvite_guests=False, copy_vendors=False, copy_budget=True
+        )
+        self.assertFalse(clone.invitations.exists())
+        self.assertFalse(clone.event_vendors.exists())
+        self.assertIsNone(clone.budget_items.get(name="Dinner").vendor)
+
+    def test_clone_view(self):
+        """Test the clone view is limited to the organizer and redirects to the copy"""
+        url = reverse("events:event_clone", args=[self.event.pk])
+        User.objects.create_user(username="other", password="testpass123")
+        self.client.login(username="other", password="testpass123")
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(url)
+        self.assertEqual(response.context["form"].initial["title"], "Annual Gala (copy)")
+        response = self.client.post(
+            url, {"title": "Gala Again", "start_date": "2031-05-01T18:00", "reinvite_guests": "on", "copy_budget": "on"}
+        )
+        clone = Event.objects.get(title="Gala Again")
+        self.assertRedirects(response, reverse("events:event_detail", args=[clone.pk]))
+        self.assertEqual(clone.budget_items.count(), 2)
+        self.assertFalse(clone.event_vendors.exists())
+
+    def test_clone_view_initial_start_is_free(self):
+        """Test submitting the pre-filled form does not clash with the source event's venue booking"""
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("events:event_clone", args=[self.event.pk])
+        form = self.client.get(url).context["form"]
+        self.assertEqual(form.initial["start_date"], self.event.start_date + timezone.timedelta(days=7))
+
+        data = {"title": form.initial["title"], "start_date": form["start_date"].value(), "copy_budget": "on"}
+        response = self.client.post(url, data)
+        clone = Event.objects.get(title="Annual Gala (copy)")
+        self.assertRedirects(response, reverse("events:event_detail", args=[clone.pk]))
+        self.assertEqual(clone.venue, self.event.venue)
+
+
+class VenueBookingTestCase(TestCase):
+    """Test cases for venue double-booking detection"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        self.start = timezone.now().replace(microsecond=0) + timezone.timedelta(days=30)
+        self.booking = Event.objects.create(
+            title="Private Dinner",
+            description="Test Description",
+            event_type="party",
+            status="confirmed",
+            start_date=self.start,
+            end_date=self.start + timezone.timedelta(hours=4),
+            venue="Grand Hall",
+            location="Test Location",
+            max_capacity=50,
+            created_by=self.other,
+        )
+
+    def form_data(self, **overrides):
+        data = {
+            "title": "Wedding",
+            "description": "Test Description",
+            "event_type": "wedding",
+            "status": "planning",
+            "start_date": self.start + timezone.timedelta(hours=3),
+            "end_date": self.start + timezone.timedelta(hours=8),
+            "venue": "Grand Hall",
+            "location": "Test Location",
+            "max_capacity": 100,
+        }
+        data.update(overrides)
+        return data
+
+    def test_overlapping_booking_rejected(self):
+        """Test an overlapping window at the same venue is a venue error"""
+        form = EventForm(data=self.form_data())
+        self.assertFalse(form.is_valid())
+        self.assertIn("already booked", form.errors["venue"][0])
+
+    def test_adjacent_other_venue_and_cancelled_allowed(self):
+        """Test back-to-back bookings, other venues and cancelled events do not conflict"""
+        self.assertTrue(EventForm(data=self.form_data(start_date=self.start + timezone.timedelta(hours=4))).is_valid())
+        self.assertTrue(EventForm(data=self.form_data(venue="Small Hall")).is_valid())
+        self.assertTrue(EventForm(data=self.form_data(status="cancelled")).is_valid())
+
+        self.booking.status = "cancelled"
+        self.booking.save()
+        self.assertTrue(EventForm(data=self.form_data()).is_valid())
+
+    def test_update_does_not_conflict_with_itself(self):
+        """Test editing a booking does not report the booking itself"""
+        data = self.form_data(start_date=self.start, end_date=self.start + timezone.timedelta(hours=5))
+        self.assertTrue(EventForm(data=data, instance=self.booking).is_valid())
+        self.assertFalse(EventForm(data=self.form_data(end_date=self.start)).is_valid())
+
+    def test_overlap_query_uses_window_index(self):
+        """Test the overlap check is an index range seek"""
+        queryset = Event.objects.overlapping("Grand Hall", self.start, self.start + timezone.timedelta(hours=1))
+        self.assertIn("event_venue_window_idx", queryset.explain())
+
+    def test_availability_view(self):
+        """Test the availability view shows busy windows without other planners' details"""
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("events:venue_availability")
+        params = {
+            "venue": "Grand Hall",
+            "start": (self.start - timezone.timedelta(days=1)).strftime("%Y-%m-%dT%H:%M"),
+            "end": (self.start + timezone.timedelta(days=1)).strftime("%Y-%m-%dT%H:%M"),
+        }
+        response = self.client.get(url, params)
+        self.assertEqual(response.context["bookings"], [self.booking])
+        self.assertContains(response, "Booked")
+        self.assertNotContains(response, "Private Dinner")
+
+        response = self.client.get(url, dict(params, venue="Small Hall"))
+        self.assertContains(response, "is free")
+
+
+class ArchiveEventsTestCase(TestCase):
+    """Test cases for archiving and restoring events"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.old = self.create_event("Old Gala", "completed", days_ago=400)
+        self.recent = self.create_event("Recent Party", "completed", days_ago=10)
+        self.old_planning = self.create_event("Stale Plan", "planning", days_ago=400)
+
+        self.invitees = [User.objects.create_user(username=f"guest{i}", password="testpass123") for i in range(3)]
+        for invitee in self.invitees:
+            Invitation.objects.create(event=self.old, invitee=invitee)
+        Invitation.objects.get(invitee=self.invitees[0]).respond("accepted")
+        Invitation.objects.get(invitee=self.invitees[1]).respond("declined")
+
+        vendor = Vendor.objects.create(
+            name="Caterer", category="catering", contact_person="Sam", email="sam@example.com", phone_number="123"
+        )
+        event_vendor = EventVendor.objects.create(
+            event=self.old, vendor=vendor, service_description="Dinner", contract_amount=Decimal("1999.99")
+        )
+        BudgetItem.objects.create(
+            event=self.old, vendor=event_vendor, category="catering", name="Dinner", estimated_cost=Decimal("1999.99")
+        )
+
+    def create_event(self, title, status, days_ago):
+        start = timezone.now() - timezone.timedelta(days=days_ago)
+        return Event.objects.create(
+            title=title,
+            description="Test Description",
+            event_type="party",
+            status=status,
+            start_date=start,
+            end_date=start + timezone.timedelta(hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=50,
+            created_by=self.organizer,
+        )
+
+    def archive(self, *args):
+        call_command("archive_events", *args, stdout=StringIO())
+
+    def test_archive_moves_only_old_finished_events(self):
+        """Test old completed events leave the live tables with all their dependent rows"""
+        self.archive("--chunk-size", "1")
+
+        self.assertEqual(set(Event.objects.values_list("title", flat=True)), {"Recent Party", "Stale Plan"})
+        self.assertFalse(Invitation.objects.exists())
+        self.assertFalse(EventVendor.objects.exists())
+        self.assertFalse(BudgetItem.objects.exists())
+
+        archived = ArchivedEvent.objects.get()
+        self.assertEqual((archived.event_id, archived.title), (self.old.pk, "Old Gala"))
+        self.assertEqual(
+            archived.row_counts(), {"invitations": 3, "guests": 1, "rsvps": 1, "event vendors": 1, "budget items": 1}
+        )
+
+    def test_restore_puts_rows_back(self):
+        """Test a restored event gets its original ids, rows and counters back"""
+        self.archive()
+        event = ArchivedEvent.objects.get().restore()
+
+        self.assertEqual(event.pk, self.old.pk)
+        self.assertEqual(event.confirmed_headcount, 1)
+        self.assertEqual(event.invitations.count(), 3)
+        self.assertEqual(event.invitation_counter.declined, 1)
+        self.assertEqual(event.guests.get().rsvp.status, "pending")
+        self.assertEqual(event.budget_items.get().vendor, event.event_vendors.get())
+        self.assertEqual(event.budget_items.get().estimated_cost, Decimal("1999.99"))
+        self.assertFalse(ArchivedEvent.objects.exists())
+        self.assertEqual(search_events(self.organizer, "gala"), [event])
+
+    def test_archive_deletes_rows_in_batches(self):
+        """Test archiving skips the per-row signals and keeps the invitees' badge counts current"""
+        for i in range(50):
+            Invitation.objects.create(event=self.old, invitee=User.objects.create_user(username=f"extra{i}"))
+        self.assertEqual(get_pending_invitation_count(self.invitees[2].pk), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            ArchivedEvent.archive([self.old.pk])
+        # A fixed number per table and batch, not several per invitation
+        self.assertLess(len(queries), 70)
+        self.assertEqual(get_pending_invitation_count(self.invitees[2].pk), 0)
+
+        ArchivedEvent.objects.get().restore()
+        self.assertEqual(get_pending_invitation_count(self.invitees[2].pk), 1)
+
+    def test_restore_is_all_or_nothing(self):
+        """Test a restore fails cleanly when a referenced user was deleted meanwhile"""
+        self.archive()
+        self.invitees[2].delete()
+        with self.assertRaises(CommandError):
+            self.archive("--restore", str(self.old.pk))
+        self.assertFalse(Event.objects.filter(pk=self.old.pk).exists())
+        self.assertTrue(ArchivedEvent.objects.exists())
+
+    def test_archive_views(self):
+        """Test the archive can be browsed and restored by its owner only"""
+        self.archive()
+        archived = ArchivedEvent.objects.get()
+
+        self.client.login(username="guest0", password="testpass123")
+        self.assertEqual(self.client.get(reverse("events:archived_event_detail", args=[archived.pk])).status_code, 404)
+
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("events:archived_event_list"))
+        self.assertEqual(list(response.context["archived_events"]), [archived])
+        response = self.client.get(reverse("events:archived_event_detail", args=[archived.pk]))
+        self.assertContains(response, "3 invitations")
+
+        response = self.client.post(reverse("events:archived_event_restore", args=[archived.pk]))
+        self.assertRedirects(response, reverse("events:event_detail", args=[self.old.pk]))
+
+
+class EventDeletionTestCase(TestCase):
+    """Test cases for queued event deletion"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Big Event",
+            description="Test Description",
+            event_type="party",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=50,
+            created_by=self.organizer,
+        )
+        self.invitees = [
+            User.objects.create_user(username=f"guest{i}", email=f"guest{i}@example.com", password="testpass123")
+            for i in range(5)
+        ]
+        invitations = Invitation.objects.bulk_invite(self.event, self.invitees)[0]
+        OutgoingEmail.queue_invitations(invitations)
+        for invitation in invitations[:3]:
+            invitation.respond("accepted")
+        BudgetItem.objects.create(event=self.event, category="venue", name="Hall", estimated_cost=500)
+
+    def purge(self, *args):
+        out = StringIO()
+        call_command("purge_deleted_events", *args, stdout=out)
+        return out.getvalue()
+
+    def test_delete_view_hides_event_immediately(self):
+        """Test deleting only queues the event and hides it from planner and invitee views"""
+        self.client.login(username="organizer", password="testpass123")
+        self.client.post(reverse("events:event_delete", args=[self.event.pk]))
+
+        self.assertFalse(Event.objects.filter(pk=self.event.pk).exists())
+        self.assertTrue(Event.all_objects.filter(pk=self.event.pk).exists())
+        self.assertEqual(Invitation.objects.filter(event_id=self.event.pk).count(), 5)
+        self.assertEqual(self.client.get(reverse("events:event_detail", args=[self.event.pk])).status_code, 404)
+        self.assertEqual(get_dashboard_summary(self.organizer.pk)["total_events"], 0)
+
+        self.client.login(username="guest4", password="testpass123")
+        response = self.client.get(reverse("guests:my_invitations"))
+        self.assertFalse(response.context["pending_invitations"])
+        self.assertEqual(get_pending_invitation_count(self.invitees[4].pk), 0)
+
+    def test_only_the_organizer_can_queue_deletion(self):
+        """Test another user gets a 404 and the event stays live"""
+        User.objects.create_user(username="other", password="testpass123")
+        self.client.login(username="other", password="testpass123")
+        for method in (self.client.get, self.client.post):
+            self.assertEqual(method(reverse("events:event_delete", args=[self.event.pk])).status_code, 404)
+            self.assertEqual(method(reverse("events:event_edit", args=[self.event.pk])).status_code, 404)
+        self.event.refresh_from_db()
+        self.assertIsNone(self.event.deletion_requested_at)
+
+    def test_child_views_404_once_event_is_queued(self):
+        """Test rows of an event queued for deletion can no longer be edited or removed"""
+        vendor = Vendor.objects.create(
+            name="Caterer", category="catering", contact_person="Sam", email="sam@example.com", phone_number="123"
+        )
+        event_vendor = EventVendor.objects.create(event=self.event, vendor=vendor, contract_amount=100)
+        guest = Guest.objects.filter(event=self.event).select_related("rsvp").first()
+        urls = [
+            reverse("guests:invitation_delete", args=[self.event.invitations.first().pk]),
+            reverse("guests:guest_delete", args=[guest.pk]),
+            reverse("guests:rsvp_edit", args=[guest.rsvp.pk]),
+            reverse("budget:budgetitem_edit", args=[self.event.budget_items.get().pk]),
+            reverse("budget:budgetitem_delete", args=[self.event.budget_items.get().pk]),
+            reverse("vendors:eventvendor_edit", args=[event_vendor.pk]),
+            reverse("vendors:eventvendor_delete", args=[event_vendor.pk]),
+        ]
+        self.client.login(username="organizer", password="testpass123")
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+        self.event.request_deletion()
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+            self.assertEqual(self.client.post(url).status_code, 404, url)
+        self.assertEqual(self.event.budget_items.count(), 1)
+        self.assertTrue(EventVendor.objects.filter(pk=event_vendor.pk).exists())
+
+    def test_purge_removes_rows_in_batches(self):
+        """Test the purge job deletes every dependent row in bounded batches and reports progress"""
+        self.event.request_deletion()
+        output = self.purge("--batch-size", "2")
+
+        self.assertIn("deleted 2 invitations", output)
+        self.assertIn("deleted 5 invitations", output)
+        self.assertFalse(Event.all_objects.filter(pk=self.event.pk).exists())
+        self.assertFalse(Invitation.objects.exists())
+        self.assertFalse(Guest.objects.exists())
+        self.assertFalse(RSVP.objects.exists())
+        self.assertFalse(BudgetItem.objects.exists())
+        self.assertFalse(InvitationCounter.objects.exists())
+        self.assertEqual(set(OutgoingEmail.objects.values_list("invitation", flat=True)), {None})
+
+    def test_purge_resumes_after_interruption(self):
+        """Test an interrupted purge keeps its committed batches and finishes on the next run"""
+        self.event.request_deletion()
+        raw_delete = QuerySet._raw_delete
+        calls = []
+
+        def interrupt_second_batch(queryset, using):
+            calls.append(queryset.model)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return raw_delete(queryset, using)
+
+        with mock.patch.object(QuerySet, "_raw_delete", interrupt_second_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                self.purge("--batch-size", "2")
+        self.assertEqual(RSVP.objects.count(), 1)
+
+        self.purge("--batch-size", "2")
+        self.assertFalse(Event.all_objects.filter(pk=self.event.pk).exists())
+        self.assertFalse(RSVP.objects.exists())
+
+
+class EventApiTestCase(TestCase):
+    """Test cases for the read-only JSON API"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(username="other", password="testpass123")
+        start = timezone.now() + timezone.timedelta(days=30)
+        self.events = [
+            Event.objects.create(
+                title=f"Event {i}",
+                description="Test Description",
+                event_type="wedding" if i % 2 else "party",
+                status="planning",
+                start_date=start + timezone.timedelta(days=i),
+                end_date=start + timezone.timedelta(days=i, hours=5),
+                venue=f"Venue {i}",
+                location="Test Location",
+                max_capacity=50,
+                created_by=self.organizer,
+            )
+            for i in range(5)
+        ]
+        self.event = self.events[0]
+        vendor = Vendor.objects.create(
+            name="Caterer", category="catering", contact_person="Sam", email="sam@example.com", phone_number="1"
+        )
+        EventVendor.objects.create(
+            event=self.event, vendor=vendor, service_description="Dinner", contract_amount=Decimal("900")
+        )
+        guest_user = User.objects.create_user(username="guest", first_name="Gia", last_name="Lee", password="x")
+        Invitation.objects.bulk_invite(self.event, [guest_user])[0][0].respond("accepted")
+        BudgetItem.objects.create(event=self.event, category="venue", name="Hall", estimated_cost=Decimal("500"))
+        self.client.login(username="organizer", password="testpass123")
+
+    def get(self, name, *args, **params):
+        return self.client.get(reverse(f"events:{name}", args=args), params)
+
+    def test_sparse_fields_and_related_data_in_bounded_queries(self):
+        """Test ?fields= returns only the requested keys and related data costs a fixed number of queries"""
+        response = self.get("api_event_list", fields="id,title")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(set(response.json()["results"][0]), {"id", "title"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get("api_event_list", fields="id,organizer,invitations,vendors")
+        # session, user, events (organizer and counters joined), vendor assignments (vendor joined)
+        self.assertEqual(len(queries), 4)
+        first = response.json()["results"][-1]
+        self.assertEqual(first["organizer"], "organizer")
+        self.assertEqual(first["invitations"], {"pending": 0, "accepted": 1, "declined": 0})
+        self.assertEqual(first["vendors"][0]["name"], "Caterer")
+
+        response = self.get("api_event_list", fields="id,secret")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("secret", response.json()["error"])
+
+    def test_filters_and_cursor_pages(self):
+        """Test filtering by type and date range and walking the cursor pages"""
+        results = self.get("api_event_list", event_type="wedding").json()["results"]
+        self.assertEqual([event["title"] for event in results], ["Event 3", "Event 1"])
+
+        start_after = self.events[2].start_date.isoformat()
+        results = self.get("api_event_list", start_after=start_after).json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.get("api_event_list", status="lost").status_code, 400)
+        self.assertEqual(self.get("api_event_list", start_before="soon").status_code, 400)
+
+        titles, cursor = [], ""
+        while True:
+            data = self.get("api_event_list", fields="title", limit=2, cursor=cursor).json()
+            titles += [event["title"] for event in data["results"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(titles, [f"Event {i}" for i in reversed(range(5))])
+
+    def test_event_rows(self):
+        """Test the guests, vendors and budget items of an event"""
+        guests = self.get("api_event_guests", self.event.pk).json()["results"]
+        self.assertEqual(guests[0]["name"], "Gia Lee")
+        self.assertEqual(guests[0]["rsvp"]["status"], "pending")
+        vendors = self.get("api_event_vendors", self.event.pk, fields="name,contract_amount").json()["results"]
+        self.assertEqual(vendors, [{"name": "Caterer", "contract_amount": "900.00"}])
+        items = self.get("api_event_budget_items", self.event.pk, fields="name,vendor").json()["results"]
+        self.assertEqual(items, [{"name": "Hall", "vendor": None}])
+
+    def test_etag_revalidation(self):
+        """Test an unchanged collection answers 304 and a change produces a new strong ETag"""
+        response = self.get("api_event_list")
+        etag = response["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        self.assertIn("private", response["Cache-Control"])
+
+        response = self.client.get(reverse("events:api_event_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        self.event.title = "Renamed"
+        self.event.save()
+        response = self.client.get(reverse("events:api_event_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_scoped_to_organizer(self):
+        """Test other users cannot read the planner's events and anonymous requests are refused"""
+        self.client.login(username="other", password="testpass123")
+        self.assertEqual(self.get("api_event_list").json()["results"], [])
+        for name in ("api_event_detail", "api_event_guests", "api_event_budget_items"):
+            response = self.get(name, self.event.pk)
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertEqual(response.json(), {"error": "Not found."})
+
+        self.client.logout()
+        self.assertEqual(self.get("api_event_list").status_code, 403)
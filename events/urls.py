@@ -1,12 +1,24 @@
 from django.urls import path
 
 from .views import (
+    ArchivedEventDetailView,
+    ArchivedEventListView,
+    ArchivedEventRestoreView,
+    CalendarFeedView,
     DashboardView,
+    EventApiDetailView,
+    EventApiListView,
+    EventBudgetItemApiView,
+    EventCloneView,
     EventCreateView,
     EventDeleteView,
     EventDetailView,
+    EventGuestApiView,
     EventListView,
+    EventSearchView,
     EventUpdateView,
+    EventVendorApiView,
+    VenueAvailabilityView,
 )
 
 app_name = "events"
@@ -14,8 +26,20 @@ app_name = "events"
 urlpatterns = [
     path("", DashboardView.as_view(), name="dashboard"),
     path("events/", EventListView.as_view(), name="event_list"),
+    path("events/search/", EventSearchView.as_view(), name="event_search"),
     path("events/create/", EventCreateView.as_view(), name="event_create"),
     path("events/<int:pk>/", EventDetailView.as_view(), name="event_detail"),
     path("events/<int:pk>/edit/", EventUpdateView.as_view(), name="event_edit"),
     path("events/<int:pk>/delete/", EventDeleteView.as_view(), name="event_delete"),
+    path("events/<int:pk>/clone/", EventCloneView.as_view(), name="event_clone"),
+    path("events/archive/", ArchivedEventListView.as_view(), name="archived_event_list"),
+    path("events/archive/<int:pk>/", ArchivedEventDetailView.as_view(), name="archived_event_detail"),
+    path("events/archive/<int:pk>/restore/", ArchivedEventRestoreView.as_view(), name="archived_event_restore"),
+    path("venues/availability/", VenueAvailabilityView.as_view(), name="venue_availability"),
+    path("api/events/", EventApiListView.as_view(), name="api_event_list"),
+    path("api/events/<int:pk>/", EventApiDetailView.as_view(), name="api_event_detail"),
+    path("api/events/<int:pk>/guests/", EventGuestApiView.as_view(), name="api_event_guests"),
+    path("api/events/<int:pk>/vendors/", EventVendorApiView.as_view(), name="api_event_vendors"),
+    path("api/events/<int:pk>/budget-items/", EventBudgetItemApiView.as_view(), name="api_event_budget_items"),
+    path("calendar/<str:kind>/<str:token>.ics", CalendarFeedView.as_view(), name="calendar_feed"),
 ]
@@ -1,16 +1,34 @@
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
+    FormView,
     ListView,
     TemplateView,
     UpdateView,
 )
 
-from .forms import EventForm
-from .models import Event
+from budget.models import BudgetItem
+from core.pagination import KeysetPaginator
+from guests.models import Guest
+from vendors.models import EventVendor
+
+from . import api
+from .cache import get_dashboard_summary, get_event_summary
+from .forms import EventCloneForm, EventForm, VenueAvailabilityForm, clone_event
+from .ical import FEED_KINDS, calendar_lines, feed_events, feed_stamp, feed_url, feed_user_id
+from .models import ArchivedEvent, Event
+from .search import search_events
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -18,28 +36,60 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["total_events"] = Event.objects.filter(created_by=self.request.user).count()
-        context["upcoming_events"] = Event.objects.filter(
-            created_by=self.request.user, status__in=["planning", "confirmed"]
-        ).order_by("start_date")[:5]
+        context.update(get_dashboard_summary(self.request.user.pk))
+        context["calendar_feed_url"] = feed_url(self.request.user.pk, "planner")
         return context
 
 
 class EventListView(LoginRequiredMixin, ListView):
+    """View to list the planner's events, newest first, one keyset page at a time"""
+
     model = Event
     template_name = "events/event_list.html"
     context_object_name = "events"
-    paginate_by = 10
+
+    page_size = 10
+    ordering = ["-start_date", "-pk"]
 
     def get_queryset(self):
         return Event.objects.filter(created_by=self.request.user)
 
+    def get_context_data(self, **kwargs):
+        page = KeysetPaginator(self.object_list, self.ordering, self.page_size).page(self.request.GET.get("cursor"))
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context["page"] = page
+        # Counting every event is the expensive part for large histories, so only do it on request
+        context["show_count"] = self.request.GET.get("count") == "1"
+        if context["show_count"]:
+            context["total_events"] = self.object_list.count()
+        return context
+
+
+class EventSearchView(LoginRequiredMixin, TemplateView):
+    """View to full-text search the planner's events, best match first"""
+
+    template_name = "events/event_search.html"
+    result_limit = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        context["query"] = query
+        context["events"] = search_events(self.request.user, query, self.result_limit) if query else []
+        return context
+
 
 class EventDetailView(LoginRequiredMixin, DetailView):
     model = Event
     template_name = "events/event_detail.html"
     context_object_name = "event"
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.object.created_by_id == self.request.user.pk:
+            context["summary"] = get_event_summary(self.object.pk)
+        return context
+
 
 class EventCreateView(LoginRequiredMixin, CreateView):
     model = Event
@@ -58,8 +108,264 @@ class EventUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "events/event_form.html"
     success_url = reverse_lazy("events:event_list")
 
+    def get_queryset(self):
+        # The default manager already hides events queued for deletion
+        return Event.objects.filter(created_by=self.request.user)
+
 
 class EventDeleteView(LoginRequiredMixin, DeleteView):
     model = Event
     template_name = "events/event_confirm_delete.html"
     success_url = reverse_lazy("events:event_list")
+
+    def get_queryset(self):
+        return Event.objects.filter(created_by=self.request.user)
+
+    def form_valid(self, form):
+        # Cascading through a large guest list in one request would hold the write lock throughout,
+        # so the event is only hidden here and purge_deleted_events removes it in batches
+        self.object.request_deletion()
+        messages.success(self.request, f"Deleted {self.object.title}.")
+        return redirect(self.get_success_url())
+
+
+class EventCloneView(LoginRequiredMixin, FormView):
+    """View to copy an event with its guest list, vendors and budget"""
+
+    form_class = EventCloneForm
+    template_name = "events/event_clone_form.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.event = get_object_or_404(Event, pk=kwargs["pk"], created_by=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_initial(self):
+        # Default a week later; the original date would always clash with the source event's own venue booking
+        start_date = self.event.start_date + timezone.timedelta(days=7)
+        return {"title": f"{self.event.title} (copy)", "start_date": timezone.localtime(start_date)}
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["event"] = self.event
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["event"] = self.event
+        return context
+
+    def form_valid(self, form):
+        clone = clone_event(self.event, **form.cleaned_data)
+        messages.success(self.request, f"Created {clone.title} from {self.event.title}.")
+        return redirect("events:event_detail", pk=clone.pk)
+
+
+class VenueAvailabilityView(LoginRequiredMixin, TemplateView):
+    """View to list a venue's bookings in a date range, across all planners"""
+
+    template_name = "events/venue_availability.html"
+    booking_limit = 100
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = VenueAvailabilityForm(self.request.GET or None)
+        context["form"] = form
+        context["bookings"] = None
+        if form.is_valid():
+            venue, start, end = (form.cleaned_data[field] for field in ("venue", "start", "end"))
+            # Other planners' bookings are shown as busy windows only, without their details
+            context["bookings"] = list(
+                Event.objects.overlapping(venue, start, end)
+                .order_by("start_date")
+                .only("title", "start_date", "end_date", "created_by")[: self.booking_limit]
+            )
+        return context
+
+
+class ArchivedEventListView(LoginRequiredMixin, ListView):
+    """View to browse the planner's archived events, newest first"""
+
+    model = ArchivedEvent
+    template_name = "events/archivedevent_list.html"
+    context_object_name = "archived_events"
+
+    page_size = 20
+    ordering = ["-start_date", "-pk"]
+
+    def get_queryset(self):
+        return ArchivedEvent.objects.filter(created_by=self.request.user).defer("payload")
+
+    def get_context_data(self, **kwargs):
+        page = KeysetPaginator(self.object_list, self.ordering, self.page_size).page(self.request.GET.get("cursor"))
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context["page"] = page
+        return context
+
+
+class ArchivedEventDetailView(LoginRequiredMixin, DetailView):
+    """Read-only view of an archived event and what was archived with it"""
+
+    model = ArchivedEvent
+    template_name = "events/archivedevent_detail.html"
+    context_object_name = "archived_event"
+
+    def get_queryset(self):
+        return ArchivedEvent.objects.filter(created_by=self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        event_row = self.object.payload[0]["fields"]
+        context["description"] = event_row["description"]
+        context["location"] = event_row["location"]
+        context["row_counts"] = self.object.row_counts()
+        return context
+
+
+class ArchivedEventRestoreView(LoginRequiredMixin, View):
+    """View to move an archived event back into the live tables"""
+
+    def post(self, request, pk):
+        archived_event = get_object_or_404(ArchivedEvent, pk=pk, created_by=request.user)
+        try:
+            event = archived_event.restore()
+        except IntegrityError:
+            messages.error(
+                request, f"{archived_event.title} could not be restored: some of its guests or vendors no longer exist."
+            )
+            return redirect("events:archived_event_detail", pk=pk)
+        messages.success(request, f"Restored {event.title}.")
+        return redirect("events:event_detail", pk=event.pk)
+
+
+def _feed_stamp(request, kind, token):
+    """Resolve the feed owner and change stamp once per request, for the condition() callback and the view"""
+    if not hasattr(request, "_feed_stamp"):
+        user_id = feed_user_id(token, kind) if kind in FEED_KINDS else None
+        if user_id is None:
+            raise Http404("Unknown calendar feed")
+        request._feed_stamp = (user_id, feed_stamp(user_id, kind))
+    return request._feed_stamp
+
+
+def _feed_etag(request, kind, token):
+    return _feed_stamp(request, kind, token)[1]
+
+
+@method_decorator(condition(etag_func=_feed_etag), name="get")
+class CalendarFeedView(View):
+    """iCalendar feed of a planner's events or an invitee's events, authenticated by a signed token.
+
+    Calendar clients poll these, so unchanged feeds are answered with 304 from a single aggregate query.
+    """
+
+    def get(self, request, kind, token):
+        user_id = _feed_stamp(request, kind, token)[0]
+        name = "My Events" if kind == "planner" else "Events I'm Attending"
+        lines = calendar_lines(feed_events(user_id, kind), name, with_urls=kind == "planner")
+        response = StreamingHttpResponse(lines, content_type="text/calendar; charset=utf-8")
+        response["Content-Disposition"] = f'inline; filename="{kind}.ics"'
+        return response
+
+
+class ApiView(LoginRequiredMixin, View):
+    """Base of the read-only JSON API: ?fields= selection, keyset pages and strong ETags.
+
+    Subclasses set the resource's fields and ordering and return its rows from get_queryset().
+    """
+
+    raise_exception = True
+    fields = {}
+    default_fields = []
+    ordering = ["pk"]
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_field_names(self):
+        return api.parse_fields(self.request.GET.get("fields"), self.fields, self.default_fields)
+
+    def get_data(self):
+        names = self.get_field_names()
+        page_size = api.parse_page_size(self.request.GET.get("limit"))
+        queryset = api.select_fields(self.get_queryset(), self.fields, names, self.ordering)
+        page = KeysetPaginator(queryset, self.ordering, page_size).page(self.request.GET.get("cursor"))
+        return {
+            "results": [api.serialize(obj, self.fields, names) for obj in page],
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        }
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return api.json_response(request, self.get_data())
+        except api.ApiError as error:
+            return api.error_response(str(error), status=error.status)
+
+
+class EventApiListView(ApiView):
+    """The planner's events, filterable by status, event_type and a start_date range"""
+
+    fields = api.EVENT_FIELDS
+    default_fields = api.EVENT_DEFAULT_FIELDS
+    ordering = ["-start_date", "-pk"]
+
+    def get_queryset(self):
+        params = self.request.GET
+        events = Event.objects.filter(created_by=self.request.user)
+        status = api.parse_choice(params.get("status"), Event.STATUS_CHOICES, "status")
+        event_type = api.parse_choice(params.get("event_type"), Event.EVENT_TYPE_CHOICES, "event_type")
+        start_after = api.parse_moment(params.get("start_after"), "start_after")
+        start_before = api.parse_moment(params.get("start_before"), "start_before")
+        if status:
+            events = events.filter(status=status)
+        if event_type:
+            events = events.filter(event_type=event_type)
+        if start_after:
+            events = events.filter(start_date__gte=start_after)
+        if start_before:
+            events = events.filter(start_date__lt=start_before)
+        return events
+
+
+class EventApiDetailView(ApiView):
+    fields = api.EVENT_FIELDS
+    default_fields = api.EVENT_DEFAULT_FIELDS
+
+    def get_data(self):
+        names = self.get_field_names()
+        events = api.select_fields(Event.objects.filter(created_by=self.request.user), self.fields, names)
+        event = events.filter(pk=self.kwargs["pk"]).first()
+        if event is None:
+            raise api.ApiNotFound("Not found.")
+        return api.serialize(event, self.fields, names)
+
+
+class EventChildApiView(ApiView):
+    """Rows of one of the planner's events, e.g. its guests"""
+
+    model = None
+
+    def get_queryset(self):
+        event = Event.objects.filter(pk=self.kwargs["pk"], created_by=self.request.user).first()
+        if event is None:
+            raise api.ApiNotFound("Not found.")
+        return self.model.objects.filter(event=event)
+
+
+class EventGuestApiView(EventChildApiView):
+    model = Guest
+    fields = api.GUEST_FIELDS
+    default_fields = api.GUEST_DEFAULT_FIELDS
+
+
+class EventVendorApiView(EventChildApiView):
+    model = EventVendor
+    fields = api.VENDOR_FIELDS
+    default_fields = api.VENDOR_DEFAULT_FIELDS
+
+
+class EventBudgetItemApiView(EventChildApiView):
+    model = BudgetItem
+    fields = api.BUDGET_ITEM_FIELDS
+    default_fields = api.BUDGET_ITEM_DEFAULT_FIELDS
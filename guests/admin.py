@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import RSVP, Guest, Invitation
+from .models import RSVP, Guest, Invitation, InvitationCounter, OutgoingEmail
 
 
 @admin.register(Invitation)
@@ -27,3 +27,17 @@ class RSVPAdmin(admin.ModelAdmin):
     list_filter = ["status", "response_date"]
     search_fields = ["guest__user__username", "guest__user__first_name", "guest__user__last_name"]
     date_hierarchy = "response_date"
+
+
+@admin.register(InvitationCounter)
+class InvitationCounterAdmin(admin.ModelAdmin):
+    list_display = ["event", "pending", "accepted", "declined"]
+    search_fields = ["event__title"]
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ["to_email", "kind", "status", "attempts", "created_at", "sent_at"]
+    list_filter = ["kind", "status", "created_at"]
+    search_fields = ["to_email", "subject"]
+    readonly_fields = ["created_at", "sent_at", "last_error"]
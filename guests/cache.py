@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.db import transaction
+
+PENDING_COUNT_TIMEOUT = 60 * 60
+
+
+def pending_count_key(user_id):
+    return f"guests:pending_invitations:{user_id}"
+
+
+def get_pending_invitation_count(user_id):
+    """Pending invitation count for a user, served from the cache and computed only on a miss"""
+    from .models import Invitation
+
+    key = pending_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Invitation.objects.live().filter(invitee_id=user_id, status="pending").count()
+        cache.set(key, count, PENDING_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_pending_invitation_count(*user_ids):
+    keys = [pending_count_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # Drop the keys again after commit in case a concurrent request re-cached the old count meanwhile
+    transaction.on_commit(lambda: cache.delete_many(keys))
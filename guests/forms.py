@@ -1,18 +1,52 @@
+import csv
+import io
+import re
+
 from django import forms
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.forms import modelformset_factory
+from django.urls import reverse
+from django.utils import timezone
+
+from events.cache import invalidate_event_caches
 
 from .models import RSVP, Invitation
 
 User = get_user_model()
 
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def invitable_users(event):
+    """Users that can still be invited to the event (not the organizer, not already invited)"""
+    already_invited = Invitation.objects.filter(event=event).values("invitee_id")
+    return User.objects.exclude(pk__in=already_invited).exclude(pk=event.created_by_id)
+
+
+class InviteeSearchWidget(forms.Select):
+    """Select that only renders the chosen user; other options are fetched from the search endpoint"""
+
+    def optgroups(self, name, value, attrs=None):
+        all_choices = self.choices
+        selected = [v for v in value if str(v).isdigit()]
+        users = all_choices.queryset.filter(pk__in=selected) if selected else []
+        self.choices = [("", "---------")] + [(user.pk, all_choices.field.label_from_instance(user)) for user in users]
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
 
 class InvitationForm(forms.ModelForm):
     """Form for sending invitations to users"""
 
     invitee = forms.ModelChoiceField(
         queryset=User.objects.all(),
-        widget=forms.Select(attrs={"class": "form-select"}),
-        help_text="Select a user to invite to this event",
+        widget=InviteeSearchWidget(attrs={"class": "form-select invitee-search"}),
+        help_text="Search for a user by username, name or email",
     )
 
     class Meta:
@@ -28,8 +62,74 @@ class InvitationForm(forms.ModelForm):
 
         if event:
             # Exclude users already invited or the event organizer
-            already_invited = Invitation.objects.filter(event=event).values_list("invitee_id", flat=True)
-            self.fields["invitee"].queryset = User.objects.exclude(id__in=list(already_invited) + [event.created_by.id])
+            self.fields["invitee"].queryset = invitable_users(event)
+            self.fields["invitee"].widget.attrs["data-search-url"] = reverse(
+                "guests:invitee_search", kwargs={"event_pk": event.pk}
+            )
+
+
+class InvitationBulkForm(forms.Form):
+    """Form for inviting many users at once by username or email"""
+
+    invitees = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 6, "placeholder": "One username or email per line"}),
+        help_text="Usernames or email addresses, separated by new lines, commas or spaces",
+    )
+    csv_file = forms.FileField(
+        required=False,
+        label="CSV file",
+        help_text="Optional CSV with a 'username' or 'email' column (or one identifier per row)",
+    )
+    notes = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={"rows": 3, "placeholder": "Optional message to the invitees"}),
+    )
+
+    def clean_csv_file(self):
+        csv_file = self.cleaned_data.get("csv_file")
+        if not csv_file:
+            return []
+        try:
+            text = io.TextIOWrapper(csv_file.file, encoding="utf-8-sig")
+            rows = list(csv.reader(text))
+        except (UnicodeDecodeError, csv.Error):
+            raise forms.ValidationError("Could not read the uploaded file as UTF-8 CSV.")
+
+        if not rows:
+            return []
+        header = [cell.strip().lower() for cell in rows[0]]
+        columns = [header.index(name) for name in ("username", "email") if name in header]
+        if columns:
+            rows = rows[1:]
+        else:
+            columns = [0]
+        return [row[i].strip() for row in rows for i in columns if i < len(row) and row[i].strip()]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        identifiers = re.split(r"[\s,;]+", cleaned_data.get("invitees", ""))
+        identifiers += cleaned_data.get("csv_file") or []
+        identifiers = list(dict.fromkeys(i for i in identifiers if i))
+        if not identifiers and not self.errors:
+            raise forms.ValidationError("Enter at least one username or email, or upload a CSV file.")
+
+        cleaned_data["users"], cleaned_data["not_found"] = self._resolve_users(identifiers)
+        return cleaned_data
+
+    def _resolve_users(self, identifiers):
+        """Look up users by email (identifiers containing '@') or username, in chunks"""
+        emails = [i for i in identifiers if "@" in i]
+        usernames = [i for i in identifiers if "@" not in i]
+
+        users = []
+        for start in range(0, max(len(emails), len(usernames)), LOOKUP_CHUNK_SIZE):
+            end = start + LOOKUP_CHUNK_SIZE
+            users.extend(User.objects.filter(Q(email__in=emails[start:end]) | Q(username__in=usernames[start:end])))
+
+        found = {u.username for u in users} | {u.email for u in users}
+        not_found = [i for i in identifiers if i not in found]
+        return users, not_found
 
 
 class RSVPForm(forms.ModelForm):
@@ -41,3 +141,65 @@ class RSVPForm(forms.ModelForm):
         widgets = {
             "notes": forms.Textarea(attrs={"rows": 3}),
         }
+
+
+RSVPFormSet = modelformset_factory(
+    RSVP,
+    form=RSVPForm,
+    extra=0,
+    widgets={
+        "status": forms.Select(attrs={"class": "form-select form-select-sm"}),
+        "number_of_guests": forms.NumberInput(attrs={"class": "form-control form-control-sm", "min": 0}),
+        "notes": forms.TextInput(attrs={"class": "form-control form-control-sm"}),
+    },
+)
+
+
+def bulk_update_rsvps(event, changes):
+    """Validate and apply many RSVP changes for one event in a single transaction.
+
+    changes maps RSVP ids to dicts with any of status, number_of_guests and notes. Every row is
+    validated with RSVPForm; if any row fails (or the event lacks capacity for the extra seats)
+    nothing is written. Returns (number of updated RSVPs, {rsvp id: {field: [messages]}}).
+    """
+    rsvps = {}
+    ids = [rsvp_id for rsvp_id in changes if str(rsvp_id).isdigit()]
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        chunk = RSVP.objects.filter(guest__event=event, pk__in=ids[start : start + LOOKUP_CHUNK_SIZE])
+        rsvps.update((str(rsvp.pk), rsvp) for rsvp in chunk)
+
+    errors, to_update, seat_delta = {}, [], 0
+    now = timezone.now()
+    for rsvp_id, change in changes.items():
+        rsvp = rsvps.get(str(rsvp_id))
+        if rsvp is None:
+            errors[str(rsvp_id)] = {"id": ["RSVP not found for this event."]}
+            continue
+        if not isinstance(change, dict):
+            errors[str(rsvp_id)] = {"__all__": ["Expected an object of field values."]}
+            continue
+
+        previous_status, previous_seats = rsvp.status, rsvp.seats
+        data = {field: rsvp.serializable_value(field) for field in RSVPForm.Meta.fields}
+        data.update((field, value) for field, value in change.items() if field in RSVPForm.Meta.fields)
+        form = RSVPForm(data=data, instance=rsvp)
+        if not form.is_valid():
+            errors[str(rsvp_id)] = {field: list(messages) for field, messages in form.errors.items()}
+            continue
+        if not form.has_changed():
+            continue
+
+        if rsvp.status != previous_status:
+            rsvp.response_date = now
+        seat_delta += rsvp.seats - previous_seats
+        to_update.append(rsvp)
+
+    if errors:
+        return 0, errors
+
+    with transaction.atomic():
+        if not event.adjust_seats(seat_delta):
+            return 0, {"__all__": {"number_of_guests": [f"{event.title} doesn't have enough capacity left."]}}
+        RSVP.objects.bulk_update(to_update, ["status", "number_of_guests", "notes", "response_date"], batch_size=500)
+        invalidate_event_caches(event.pk)
+    return len(to_update), {}
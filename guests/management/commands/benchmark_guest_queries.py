@@ -0,0 +1,147 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from events.models import Event
+from guests.models import RSVP, Guest, Invitation
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large invitation/guest dataset and compare the query plans of the hot guest queries with and "
+        "without the composite indexes. Runs in a transaction that is rolled back, so nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20000)
+        parser.add_argument("--events", type=int, default=200)
+        parser.add_argument("--invitations-per-event", type=int, default=250)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            event, invitee = self.seed(rng, options)
+            queries = self.queries(event, invitee)
+
+            after = {name: self.explain(queryset, "after") for name, queryset in queries.items()}
+            self.drop_indexes()
+            before = {name: self.explain(queryset, "before") for name, queryset in queries.items()}
+
+            for name in queries:
+                self.report(name, before[name], after[name])
+            transaction.set_rollback(True)
+
+    def seed(self, rng, options):
+        self.stdout.write("Seeding benchmark data...")
+        now = timezone.now()
+        suffix = rng.randrange(10**9)
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"bench{suffix}_{i}",
+                    first_name=f"First{rng.randrange(5000)}",
+                    last_name=f"Last{rng.randrange(5000)}",
+                    email=f"bench{suffix}_{i}@example.com",
+                )
+                for i in range(options["users"])
+            ],
+            batch_size=1000,
+        )
+        planner = users[0]
+        events = Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Benchmark event {i}",
+                    description="Benchmark",
+                    event_type="corporate",
+                    start_date=now + timezone.timedelta(days=i),
+                    end_date=now + timezone.timedelta(days=i, hours=4),
+                    venue="Benchmark Hall",
+                    location="Benchmark City",
+                    max_capacity=100000,
+                    created_by=planner,
+                )
+                for i in range(options["events"])
+            ]
+        )
+
+        statuses = ["pending", "accepted", "declined"]
+        invitations = []
+        for event in events:
+            for invitee in rng.sample(users[1:], min(options["invitations_per_event"], len(users) - 1)):
+                invitations.append(Invitation(event=event, invitee=invitee, status=rng.choice(statuses)))
+        invitations = Invitation.objects.bulk_create(invitations, batch_size=1000)
+
+        guests = Guest.objects.bulk_create(
+            [
+                Guest(event_id=invitation.event_id, user_id=invitation.invitee_id, invitation=invitation)
+                for invitation in invitations
+                if invitation.status == "accepted"
+            ],
+            batch_size=1000,
+        )
+        RSVP.objects.bulk_create([RSVP(guest=guest) for guest in guests], batch_size=1000)
+
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(f"Seeded {len(users)} users, {len(events)} events, {len(invitations)} invitations.\n")
+        return events[len(events) // 2], invitations[len(invitations) // 2].invitee
+
+    def queries(self, event, invitee):
+        """The querysets built by InvitationListView, MyInvitationsView, GuestListView and the navbar tag"""
+        return {
+            "InvitationListView": Invitation.objects.filter(event=event).select_related("invitee"),
+            "MyInvitationsView (pending)": Invitation.objects.live()
+            .filter(invitee=invitee, status="pending")
+            .select_related("event", "event__created_by"),
+            "MyInvitationsView (responded)": Invitation.objects.live()
+            .filter(invitee=invitee, status__in=["accepted", "declined"])
+            .select_related("event", "event__created_by"),
+            # Same WHERE clause as the COUNT(*) issued by the badge tag on a cache miss
+            "Pending invitation count": Invitation.objects.live()
+            .filter(invitee=invitee, status="pending")
+            .order_by()
+            .values("pk"),
+            "GuestListView (first page)": Guest.objects.filter(event=event)
+            .select_related("user", "rsvp")
+            .order_by("user__last_name", "user__first_name", "pk")[:50],
+        }
+
+    def drop_indexes(self):
+        indexes = [index.name for index in Invitation._meta.indexes]
+        with connection.cursor() as cursor:
+            for name in indexes:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    def explain(self, queryset, label):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # The label keeps SQLite from reusing a cached EXPLAIN statement planned before the indexes were dropped
+            prefix = "EXPLAIN QUERY PLAN" if connection.vendor == "sqlite" else "EXPLAIN"
+            cursor.execute(f"{prefix} /* {label} */ {sql}", params)
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+    def report(self, name, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        for label, plan in (("before", before), ("after", after)):
+            self.stdout.write(f"  {label}:")
+            for line in plan:
+                self.stdout.write(f"      {line}")
+
+        sorted_before, sorted_after = (any("TEMP B-TREE" in line for line in plan) for plan in (before, after))
+        if sorted_before and not sorted_after:
+            verdict = self.style.SUCCESS("sort removed, rows are read in index order")
+        elif sorted_after:
+            verdict = self.style.WARNING("still sorted in a temp b-tree")
+        elif before != after:
+            verdict = self.style.SUCCESS("narrower index search")
+        else:
+            verdict = "plan unchanged"
+        self.stdout.write(f"  => {verdict}\n")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from events.models import Event
+from guests.models import InvitationCounter
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-event invitation counters from the invitation table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Number of events recounted per transaction")
+        parser.add_argument("--event", type=int, action="append", dest="event_ids", help="Only rebuild these events")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        events = Event.objects.order_by("pk")
+        if options["event_ids"]:
+            events = events.filter(pk__in=options["event_ids"])
+
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            chunk = list(events.filter(pk__gt=last_pk).values_list("pk", flat=True)[:chunk_size])
+            if not chunk:
+                break
+            fixed += InvitationCounter.rebuild(chunk)
+            checked += len(chunk)
+            last_pk = chunk[-1]
+            self.stdout.write(f"Checked {checked} events...")
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} events, fixed {fixed} counters."))
@@ -0,0 +1,115 @@
+import datetime
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from guests.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = "Deliver queued invitation and RSVP emails in batches over a single mail connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Emails sent per connection")
+        parser.add_argument("--max-attempts", type=int, default=5, help="Attempts before an email is marked failed")
+        parser.add_argument("--backoff", type=int, default=60, help="Base retry delay in seconds, doubled per attempt")
+        parser.add_argument("--loop", action="store_true", help="Keep polling the queue instead of exiting")
+        parser.add_argument("--interval", type=int, default=10, help="Seconds to wait between polls with --loop")
+        parser.add_argument(
+            "--lease", type=int, default=600, help="Seconds a claimed batch is reserved for this worker"
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.send_batch(
+                options["batch_size"], options["max_attempts"], options["backoff"], options["lease"]
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed attempts."))
+
+    def claim_batch(self, batch_size, lease):
+        """Lease up to batch_size due emails to this worker by pushing their next_attempt_at forward.
+
+        The conditional UPDATE only matches rows that are still due, so concurrent workers never
+        send the same email; rows of a worker that dies are picked up again once the lease expires.
+        """
+        now = timezone.now()
+        due = OutgoingEmail.objects.filter(status="queued", next_attempt_at__lte=now)
+        ids = list(due.order_by("next_attempt_at", "pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return []
+        leased_until = now + datetime.timedelta(seconds=lease)
+        due.filter(pk__in=ids).update(next_attempt_at=leased_until)
+        return list(
+            OutgoingEmail.objects.filter(pk__in=ids, status="queued", next_attempt_at=leased_until)
+            .select_related("invitation__invitee", "invitation__event__created_by")
+            .order_by("pk")
+        )
+
+    def send_batch(self, batch_size, max_attempts, backoff, lease):
+        """Send one batch of due emails. Returns (sent, failed) counts."""
+        batch = self.claim_batch(batch_size, lease)
+        if not batch:
+            return 0, 0
+
+        sent = failed = 0
+        connection = get_connection(fail_silently=False)
+        try:
+            # Opened once here; send_messages() reuses an already open connection for every message below
+            connection.open()
+            for email in batch:
+                if not email.body and not self.render(email, max_attempts, backoff):
+                    failed += 1
+                    continue
+                message = EmailMessage(
+                    email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email], connection=connection
+                )
+                try:
+                    connection.send_messages([message])
+                except (smtplib.SMTPException, OSError) as exc:
+                    email.mark_failed(exc, max_attempts, backoff)
+                    failed += 1
+                else:
+                    email.mark_sent()
+                    sent += 1
+        except (smtplib.SMTPException, OSError) as exc:
+            for email in batch[sent + failed :]:
+                email.mark_failed(exc, max_attempts, backoff)
+                failed += 1
+        finally:
+            connection.close()
+            # Always record what was sent, so nothing goes out twice; rows not reached keep their lease
+            OutgoingEmail.objects.bulk_update(
+                batch,
+                ["subject", "body", "status", "attempts", "last_error", "next_attempt_at", "sent_at"],
+                batch_size=batch_size,
+            )
+        self.stdout.write(f"Batch done: {sent} sent, {failed} failed.")
+        return sent, failed
+
+    @staticmethod
+    def render(email, max_attempts, backoff):
+        """Render an email queued with render=False. Returns False (and marks it failed) if that fails."""
+        # The invitation is gone if it was deleted in the meantime
+        if email.invitation is None:
+            email.mark_failed("Invitation no longer exists", 0, backoff)
+            return False
+        try:
+            email.render()
+        except Exception as exc:
+            # A broken template or a relation gone since queueing fails this email, not the batch
+            email.mark_failed(exc, max_attempts, backoff)
+            return False
+        return True
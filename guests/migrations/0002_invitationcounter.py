@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0001_initial"),
+        ("guests", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InvitationCounter",
+            fields=[
+                (
+                    "event",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="invitation_counter",
+                        serialize=False,
+                        to="events.event",
+                    ),
+                ),
+                ("pending", models.IntegerField(default=0)),
+                ("accepted", models.IntegerField(default=0)),
+                ("declined", models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-18 19:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0002_event_confirmed_headcount"),
+        ("guests", "0003_outgoingemail"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(fields=["event", "-invited_at"], name="invitation_event_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(fields=["event", "status", "-invited_at"], name="invitation_event_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(fields=["invitee", "status", "-invited_at"], name="invitation_invitee_status_idx"),
+        ),
+    ]
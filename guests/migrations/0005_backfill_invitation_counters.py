@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count
+
+CHUNK_SIZE = 500
+STATUSES = ["pending", "accepted", "declined"]
+
+
+def backfill_invitation_counters(apps, schema_editor):
+    # Counters were only built lazily from the invitation list, so the dashboard, the event
+    # summary panel and the API read zeros for events that already had invitations
+    Event = apps.get_model("events", "Event")
+    Invitation = apps.get_model("guests", "Invitation")
+    InvitationCounter = apps.get_model("guests", "InvitationCounter")
+
+    event_ids = list(Event.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(event_ids), CHUNK_SIZE):
+        chunk = event_ids[start : start + CHUNK_SIZE]
+        counts = {event_id: dict.fromkeys(STATUSES, 0) for event_id in chunk}
+        rows = (
+            Invitation.objects.filter(event_id__in=chunk)
+            .values("event_id", "status")
+            .annotate(total=Count("pk"))
+            .order_by()
+        )
+        for row in rows:
+            counts[row["event_id"]][row["status"]] = row["total"]
+        InvitationCounter.objects.bulk_create(
+            [InvitationCounter(event_id=event_id, **values) for event_id, values in counts.items()],
+            update_conflicts=True,
+            unique_fields=["event"],
+            update_fields=STATUSES,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_event_deletion_requested_at"),
+        ("guests", "0004_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_invitation_counters, migrations.RunPython.noop),
+    ]
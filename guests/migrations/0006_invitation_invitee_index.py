@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0007_event_deletion_requested_at"),
+        ("guests", "0005_backfill_invitation_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(fields=["invitee", "-invited_at"], name="invitation_invitee_idx"),
+        ),
+    ]
@@ -1,7 +1,52 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
+from django.template.loader import render_to_string
+from django.utils import timezone
 
-from events.models import Event
+from events.cache import invalidate_event_caches
+from events.models import Event, EventFullError
+
+from .cache import invalidate_pending_invitation_count
+
+BULK_INVITE_ATTEMPTS = 3
+
+
+class InvitationQuerySet(models.QuerySet):
+    def live(self):
+        """Invitations to events that are not queued for deletion"""
+        return self.filter(event__deletion_requested_at__isnull=True)
+
+    def bulk_invite(self, event, invitees, notes="", batch_size=500):
+        """Invite many users to an event at once.
+
+        Users that already hold an invitation for the event are skipped; the organizer is left out.
+        Returns a tuple of (created invitations, skipped users).
+        """
+        invitees = list({invitee.pk: invitee for invitee in invitees if invitee.pk != event.created_by_id}.values())
+        for attempt in range(BULK_INVITE_ATTEMPTS):
+            try:
+                return self._bulk_invite(event, invitees, notes, batch_size)
+            except IntegrityError:
+                # One of them was invited concurrently; look the existing invitations up again
+                if attempt == BULK_INVITE_ATTEMPTS - 1:
+                    raise
+
+    def _bulk_invite(self, event, invitees, notes, batch_size):
+        with transaction.atomic(using=self.db):
+            already_invited = set(self.filter(event=event).values_list("invitee_id", flat=True))
+            skipped = [invitee for invitee in invitees if invitee.pk in already_invited]
+            to_create = [
+                self.model(event=event, invitee=invitee, notes=notes)
+                for invitee in invitees
+                if invitee.pk not in already_invited
+            ]
+            created = self.bulk_create(to_create, batch_size=batch_size)
+            if created:
+                InvitationCounter.adjust(event.pk, pending=len(created))
+                invalidate_pending_invitation_count(*(invitation.invitee_id for invitation in created))
+                invalidate_event_caches(event.pk)
+        return created, skipped
 
 
 class Invitation(models.Model):
@@ -20,13 +65,118 @@ class Invitation(models.Model):
     responded_at = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True, help_text="Message from the event organizer")
 
+    objects = InvitationQuerySet.as_manager()
+
     class Meta:
         ordering = ["-invited_at"]
         unique_together = ["event", "invitee"]
+        indexes = [
+            models.Index(fields=["event", "-invited_at"], name="invitation_event_idx"),
+            models.Index(fields=["event", "status", "-invited_at"], name="invitation_event_status_idx"),
+            models.Index(fields=["invitee", "status", "-invited_at"], name="invitation_invitee_status_idx"),
+            models.Index(fields=["invitee", "-invited_at"], name="invitation_invitee_idx"),
+        ]
 
     def __str__(self):
         return f"{self.invitee.get_full_name() or self.invitee.username} - {self.event.title} ({self.status})"
 
+    def respond(self, status):
+        """Accept or decline a pending invitation as one atomic operation.
+
+        The invitation is claimed with a conditional UPDATE before anything else is read, which
+        also takes SQLite's write lock up front. Accepting reserves a seat with a guarded UPDATE
+        on the event headcount and raises EventFullError (rolling everything back) when the event
+        is full. Returns False if the invitation was no longer pending.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            claimed = Invitation.objects.filter(pk=self.pk, status="pending").update(status=status, responded_at=now)
+            if not claimed:
+                return False
+
+            if status == "accepted":
+                guest, _ = Guest.objects.get_or_create(
+                    event_id=self.event_id, user_id=self.invitee_id, defaults={"invitation": self}
+                )
+                rsvp, created = RSVP.objects.get_or_create(guest=guest)
+                if created and not self.event.adjust_seats(rsvp.seats):
+                    raise EventFullError(f"{self.event.title} is full.")
+
+            # The UPDATE above bypasses the post_save signal, so apply its side effects here
+            InvitationCounter.adjust(self.event_id, pending=-1, **{status: 1})
+            invalidate_pending_invitation_count(self.invitee_id)
+            invalidate_event_caches(self.event_id)
+
+        self.status = self._loaded_status = status
+        self.responded_at = now
+        return True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so status changes can be applied to the counters
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+
+class InvitationCounter(models.Model):
+    """Denormalized invitation counts per event, kept in sync by the guests signals"""
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name="invitation_counter")
+    pending = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    declined = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.event} ({self.pending}/{self.accepted}/{self.declined})"
+
+    @classmethod
+    def for_event(cls, event):
+        """Return the counter for an event, building it on first access"""
+        counter = cls.objects.filter(event=event).first()
+        if counter is None:
+            cls.rebuild([event.pk])
+            counter = cls.objects.get(event=event)
+        return counter
+
+    @classmethod
+    def adjust(cls, event_id, **deltas):
+        """Apply status count deltas, e.g. adjust(event_id, pending=-1, accepted=1)"""
+        updated = cls.objects.filter(event_id=event_id).update(
+            **{status: F(status) + delta for status, delta in deltas.items()}
+        )
+        # A missing row is built from scratch, except when rows are going away (e.g. a cascade from the event)
+        if not updated and any(delta > 0 for delta in deltas.values()):
+            cls.rebuild([event_id])
+
+    @classmethod
+    def rebuild(cls, event_ids):
+        """Recount invitations for the given events with one grouped query. Returns the number of rows fixed."""
+        counts = {event_id: {"pending": 0, "accepted": 0, "declined": 0} for event_id in event_ids}
+        rows = (
+            Invitation.objects.filter(event_id__in=event_ids)
+            .values("event_id", "status")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            counts[row["event_id"]][row["status"]] = row["total"]
+
+        with transaction.atomic():
+            existing = {c.event_id: c for c in cls.objects.select_for_update().filter(event_id__in=event_ids)}
+            to_create, to_update = [], []
+            for event_id, values in counts.items():
+                counter = existing.get(event_id)
+                if counter is None:
+                    to_create.append(cls(event_id=event_id, **values))
+                elif any(getattr(counter, status) != total for status, total in values.items()):
+                    for status, total in values.items():
+                        setattr(counter, status, total)
+                    to_update.append(counter)
+            cls.objects.bulk_create(to_create)
+            cls.objects.bulk_update(to_update, ["pending", "accepted", "declined"])
+        return len(to_create) + len(to_update)
+
 
 class Guest(models.Model):
     """Model for confirmed event guests (users who accepted invitations)"""
@@ -61,3 +211,91 @@ class RSVP(models.Model):
 
     def __str__(self):
         return f"{self.guest} - {self.status}"
+
+    @property
+    def seats(self):
+        """Seats this RSVP holds against the event capacity"""
+        return 0 if self.status == "declined" else self.number_of_guests
+
+
+class OutgoingEmail(models.Model):
+    """Email queued for delivery by the send_queued_emails command"""
+
+    KIND_CHOICES = [
+        ("invitation", "Invitation"),
+        ("rsvp_confirmation", "RSVP confirmation"),
+    ]
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    invitation = models.ForeignKey(
+        Invitation, on_delete=models.SET_NULL, null=True, blank=True, related_name="outgoing_emails"
+    )
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="outgoing_email_queue_idx")]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} to {self.to_email} ({self.status})"
+
+    @classmethod
+    def build(cls, kind, invitation, render=True):
+        email = cls(kind=kind, invitation=invitation, to_email=invitation.invitee.email)
+        if render:
+            email.render()
+        return email
+
+    def render(self):
+        """Fill in subject and body from the templates of this email's kind"""
+        context = {"invitation": self.invitation, "event": self.invitation.event, "site_url": settings.SITE_URL}
+        self.subject = render_to_string(f"guests/emails/{self.kind}_subject.txt", context).strip()
+        self.body = render_to_string(f"guests/emails/{self.kind}.txt", context)
+
+    @classmethod
+    def queue_invitations(cls, invitations, batch_size=500, render=True):
+        """Queue invitation emails for invitees that have an email address.
+
+        With render=False the templates are rendered by send_queued_emails just before sending,
+        which keeps requests that invite thousands of users at once fast.
+        """
+        emails = [
+            cls.build("invitation", invitation, render=render) for invitation in invitations if invitation.invitee.email
+        ]
+        return cls.objects.bulk_create(emails, batch_size=batch_size)
+
+    @classmethod
+    def queue_rsvp_confirmation(cls, invitation):
+        if invitation.invitee.email:
+            return cls.objects.bulk_create([cls.build("rsvp_confirmation", invitation)])[0]
+
+    def mark_sent(self):
+        self.status = "sent"
+        self.attempts += 1
+        self.sent_at = timezone.now()
+        self.last_error = ""
+
+    def mark_failed(self, error, max_attempts, backoff_seconds):
+        """Record a failed attempt and schedule a retry with exponential backoff"""
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= max_attempts:
+            self.status = "failed"
+        else:
+            self.next_attempt_at = timezone.now() + timezone.timedelta(
+                seconds=backoff_seconds * 2 ** (self.attempts - 1)
+            )
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from events.models import Event
+
+from .cache import invalidate_pending_invitation_count
+from .models import RSVP, Invitation, InvitationCounter
+
+
+@receiver(post_save, sender=Invitation)
+def invitation_saved(sender, instance, created, raw=False, **kwargs):
+    """Keep the per-event invitation counter and the invitee's badge count in sync"""
+    if raw:
+        return
+
+    previous = getattr(instance, "_loaded_status", None)
+    if created:
+        InvitationCounter.adjust(instance.event_id, **{instance.status: 1})
+    elif previous is None:
+        InvitationCounter.rebuild([instance.event_id])
+    elif previous != instance.status:
+        InvitationCounter.adjust(instance.event_id, **{previous: -1, instance.status: 1})
+    instance._loaded_status = instance.status
+    invalidate_pending_invitation_count(instance.invitee_id)
+
+
+@receiver(post_delete, sender=Invitation)
+def invitation_deleted(sender, instance, **kwargs):
+    InvitationCounter.adjust(instance.event_id, **{instance.status: -1})
+    invalidate_pending_invitation_count(instance.invitee_id)
+
+
+@receiver(post_save, sender=Event)
+def event_deletion_requested(sender, instance, update_fields=None, **kwargs):
+    """An event queued for deletion disappears from its invitees' pending badge counts"""
+    if update_fields and "deletion_requested_at" in update_fields:
+        invitee_ids = Invitation.objects.filter(event=instance, status="pending").values_list("invitee_id", flat=True)
+        invalidate_pending_invitation_count(*invitee_ids)
+
+
+@receiver(post_delete, sender=RSVP)
+def rsvp_deleted(sender, instance, **kwargs):
+    """Give the seats of a removed RSVP back to the event"""
+    Event(pk=instance.guest.event_id).adjust_seats(-instance.seats)
@@ -1,6 +1,6 @@
 from django import template
 
-from guests.models import Invitation
+from guests.cache import get_pending_invitation_count as cached_pending_invitation_count
 
 register = template.Library()
 
@@ -9,5 +9,5 @@ register = template.Library()
 def get_pending_invitation_count(user):
     """Get the count of pending invitations for a user"""
     if user.is_authenticated:
-        return Invitation.objects.filter(invitee=user, status="pending").count()
+        return cached_pending_invitation_count(user.pk)
     return 0
@@ -1,11 +1,12 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils import timezone
 
 from events.models import Event
 
-from .models import RSVP, Guest, Invitation
+from .models import RSVP, Guest, Invitation, InvitationCounter, InvitationQuerySet, OutgoingEmail
 
 User = get_user_model()
 
@@ -383,6 +384,7 @@ class InvitationTemplateTagTestCase(TestCase):
 
     def setUp(self):
         """Set up test data"""
+        cache.clear()
         self.organizer = User.objects.create_user(
             username="organizer", email="organizer@example.com", password="testpass123"
         )
@@ -401,6 +403,30 @@ class InvitationTemplateTagTestCase(TestCase):
             created_by=self.organizer,
         )
 
+    def test_pending_invitation_count_is_cached(self):
+        """Test the badge count is served from the cache and refreshed on invitation changes"""
+        from guests.templatetags.invitation_tags import get_pending_invitation_count
+
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        self.assertEqual(get_pending_invitation_count(self.invitee), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_invitation_count(self.invitee), 1)
+
+        invitation.status = "accepted"
+        invitation.save()
+        self.assertEqual(get_pending_invitation_count(self.invitee), 0)
+
+        Invitation.objects.bulk_invite(self.event, [self.invitee])
+        other_event = Event.objects.get(pk=self.event.pk)
+        other_event.pk = None
+        other_event.save()
+        Invitation.objects.bulk_invite(other_event, [self.invitee])
+        self.assertEqual(get_pending_invitation_count(self.invitee), 1)
+
+        Invitation.objects.filter(event=other_event).delete()
+        self.assertEqual(get_pending_invitation_count(self.invitee), 0)
+
     def test_get_pending_invitation_count(self):
         """Test getting pending invitation count"""
         from guests.templatetags.invitation_tags import get_pending_invitation_count
@@ -415,3 +441,798 @@ class InvitationTemplateTagTestCase(TestCase):
 
         count = get_pending_invitation_count(self.invitee)
         self.assertEqual(count, 1)
+
+
+class InvitationBulkCreateTestCase(TestCase):
+    """Test cases for bulk invitation sending"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.users = [
+            User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="testpass123")
+            for i in range(5)
+        ]
+
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="corporate",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        self.url = reverse("guests:invitation_bulk_create", kwargs={"event_pk": self.event.pk})
+
+    def test_bulk_invite_requires_organizer(self):
+        """Test that only the event organizer can bulk invite"""
+        self.client.login(username="user0", password="testpass123")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_invite_skips_existing_and_unknown(self):
+        """Test bulk invite creates new invitations and reports skipped entries"""
+        Invitation.objects.create(event=self.event, invitee=self.users[0])
+        self.client.login(username="organizer", password="testpass123")
+
+        data = {"invitees": "user0, user1\nuser2@example.com organizer nobody", "notes": "Welcome!"}
+        response = self.client.post(self.url, data, follow=True)
+
+        self.assertRedirects(response, reverse("guests:invitation_list", kwargs={"event_pk": self.event.pk}))
+        invited = set(Invitation.objects.filter(event=self.event).values_list("invitee__username", flat=True))
+        self.assertEqual(invited, {"user0", "user1", "user2"})
+        self.assertEqual(Invitation.objects.get(event=self.event, invitee=self.users[1]).notes, "Welcome!")
+
+        message_text = " ".join(str(m) for m in response.context["messages"])
+        self.assertIn("Sent 2 invitation(s)", message_text)
+        self.assertIn("Skipped 1 already invited user(s): user0", message_text)
+        self.assertIn("You organize this event", message_text)
+        self.assertIn("nobody", message_text)
+
+    def test_bulk_invite_retries_after_concurrent_invite(self):
+        """Test a user invited while the batch is being written is skipped instead of failing the batch"""
+        from unittest import mock
+
+        Invitation.objects.create(event=self.event, invitee=self.users[1])
+        original = InvitationQuerySet.values_list
+        reads = []
+
+        def values_list(queryset, *fields, **kwargs):
+            # The first lookup misses the invitation, as if it were committed right after the read
+            reads.append(fields)
+            return [] if len(reads) == 1 else original(queryset, *fields, **kwargs)
+
+        with mock.patch.object(InvitationQuerySet, "values_list", values_list):
+            created, skipped = Invitation.objects.bulk_invite(self.event, self.users[:3])
+
+        self.assertEqual([invitation.invitee for invitation in created], [self.users[0], self.users[2]])
+        self.assertEqual(skipped, [self.users[1]])
+        self.assertEqual(InvitationCounter.for_event(self.event).pending, 3)
+
+    def test_bulk_invite_from_csv(self):
+        """Test bulk invite reads identifiers from an uploaded CSV file"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        csv_file = SimpleUploadedFile("guests.csv", b"name,email\nA,user3@example.com\nB,user4@example.com\n")
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.post(self.url, {"csv_file": csv_file})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Invitation.objects.filter(event=self.event).count(), 2)
+
+    def test_bulk_invite_requires_invitees(self):
+        """Test that an empty submission shows a form error"""
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.post(self.url, {"invitees": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Invitation.objects.exists())
+
+
+class InvitationCounterTestCase(TestCase):
+    """Test cases for the denormalized invitation counters"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.invitees = [
+            User.objects.create_user(username=f"invitee{i}", email=f"invitee{i}@example.com", password="testpass123")
+            for i in range(3)
+        ]
+
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+
+    def assertCounts(self, pending, accepted, declined):
+        counter = InvitationCounter.objects.get(event=self.event)
+        self.assertEqual((counter.pending, counter.accepted, counter.declined), (pending, accepted, declined))
+
+    def test_counter_tracks_create_status_change_and_delete(self):
+        """Test the counter follows invitation creates, status changes and deletes"""
+        first = Invitation.objects.create(event=self.event, invitee=self.invitees[0])
+        second = Invitation.objects.create(event=self.event, invitee=self.invitees[1])
+        self.assertCounts(2, 0, 0)
+
+        first = Invitation.objects.get(pk=first.pk)
+        first.status = "accepted"
+        first.save()
+        self.assertCounts(1, 1, 0)
+
+        second.status = "declined"
+        second.save()
+        self.assertCounts(0, 1, 1)
+
+        first.delete()
+        self.assertCounts(0, 0, 1)
+
+    def test_counter_tracks_bulk_invite(self):
+        """Test bulk invitations are added to the counter"""
+        Invitation.objects.bulk_invite(self.event, self.invitees)
+        self.assertCounts(3, 0, 0)
+
+    def test_counter_tracks_invitation_respond_view(self):
+        """Test accepting through the view moves the invitation to accepted"""
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitees[0])
+        self.client.login(username="invitee0", password="testpass123")
+        self.client.post(reverse("guests:invitation_respond", kwargs={"pk": invitation.pk, "action": "accept"}))
+        self.assertCounts(0, 1, 0)
+
+    def test_invitation_list_reads_counter(self):
+        """Test the invitation list shows counts from the counter"""
+        Invitation.objects.create(event=self.event, invitee=self.invitees[0], status="accepted")
+        Invitation.objects.create(event=self.event, invitee=self.invitees[1])
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("guests:invitation_list", kwargs={"event_pk": self.event.pk}))
+        self.assertEqual(response.context["pending_count"], 1)
+        self.assertEqual(response.context["accepted_count"], 1)
+        self.assertEqual(response.context["declined_count"], 0)
+
+    def test_reconcile_command_fixes_drift(self):
+        """Test the reconcile command rebuilds drifted counters"""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        Invitation.objects.create(event=self.event, invitee=self.invitees[0])
+        InvitationCounter.objects.filter(event=self.event).update(pending=42, declined=7)
+
+        out = StringIO()
+        call_command("reconcile_invitation_counters", "--chunk-size", "1", stdout=out)
+        self.assertCounts(1, 0, 0)
+        self.assertIn("fixed 1 counters", out.getvalue())
+
+    def test_migration_backfills_missing_counters(self):
+        """Test the backfill migration builds counters for events that already had invitations"""
+        import importlib
+
+        from django.db import connection
+        from django.db.migrations.loader import MigrationLoader
+
+        name = "0005_backfill_invitation_counters"
+        migration = importlib.import_module(f"guests.migrations.{name}")
+        historical_apps = MigrationLoader(connection).project_state(("guests", name)).apps
+        Invitation.objects.create(event=self.event, invitee=self.invitees[0])
+        InvitationCounter.objects.all().delete()
+
+        migration.backfill_invitation_counters(historical_apps, None)
+        self.assertCounts(1, 0, 0)
+
+
+class InviteeSearchTestCase(TestCase):
+    """Test cases for the invitee typeahead endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.john = User.objects.create_user(
+            username="jdoe", email="john@example.com", password="testpass123", first_name="John", last_name="Doe"
+        )
+        self.joan = User.objects.create_user(
+            username="jsmith", email="joan@example.com", password="testpass123", first_name="Joan", last_name="Smith"
+        )
+        self.other = User.objects.create_user(username="mark", email="mark@example.com", password="testpass123")
+
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        self.url = reverse("guests:invitee_search", kwargs={"event_pk": self.event.pk})
+        self.client.login(username="organizer", password="testpass123")
+
+    def test_search_matches_prefix_case_insensitively(self):
+        """Test search matches username, names and email by prefix"""
+        response = self.client.get(self.url, {"q": "JO"})
+        ids = {user["id"] for user in response.json()["results"]}
+        self.assertEqual(ids, {self.john.pk, self.joan.pk})
+
+        response = self.client.get(self.url, {"q": "smi"})
+        self.assertEqual([user["id"] for user in response.json()["results"]], [self.joan.pk])
+
+    def test_search_excludes_invited_users_and_organizer(self):
+        """Test already invited users and the organizer are not offered"""
+        Invitation.objects.create(event=self.event, invitee=self.john)
+        response = self.client.get(self.url, {"q": "j"})
+        self.assertEqual(response.json()["results"], [])
+
+        response = self.client.get(self.url, {"q": "jo"})
+        self.assertEqual([user["id"] for user in response.json()["results"]], [self.joan.pk])
+
+        response = self.client.get(self.url, {"q": "org"})
+        self.assertEqual(response.json()["results"], [])
+
+    def test_search_paginates(self):
+        """Test results are paginated with a has_more flag"""
+        for i in range(25):
+            User.objects.create(username=f"guest{i:02d}", email=f"guest{i:02d}@example.com")
+
+        first = self.client.get(self.url, {"q": "guest"}).json()
+        second = self.client.get(self.url, {"q": "guest", "page": 2}).json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(second["results"]), 5)
+        self.assertFalse(second["has_more"])
+
+    def test_search_requires_organizer(self):
+        """Test other users can't search an event they don't own"""
+        self.client.login(username="mark", password="testpass123")
+        response = self.client.get(self.url, {"q": "jo"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_invitation_form_renders_only_selected_option(self):
+        """Test the invitation form doesn't render every user as an option"""
+        url = reverse("guests:invitation_create", kwargs={"event_pk": self.event.pk})
+        response = self.client.get(url)
+        self.assertNotContains(response, "john@example.com")
+        self.assertContains(response, self.url)
+
+
+class OutgoingEmailTestCase(TestCase):
+    """Test cases for the invitation email outbox and worker"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.invitee = User.objects.create_user(username="invitee", email="invitee@example.com", password="testpass123")
+
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+
+    def send_queued_emails(self, *args):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        call_command("send_queued_emails", *args, stdout=StringIO())
+
+    def test_invitation_and_confirmation_are_queued_not_sent(self):
+        """Test views queue emails instead of sending them inline"""
+        from django.core import mail
+
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("guests:invitation_create", kwargs={"event_pk": self.event.pk})
+        self.client.post(url, {"invitee": self.invitee.pk, "notes": "Please come"})
+
+        self.client.login(username="invitee", password="testpass123")
+        invitation = Invitation.objects.get(event=self.event, invitee=self.invitee)
+        self.client.post(reverse("guests:invitation_respond", kwargs={"pk": invitation.pk, "action": "accept"}))
+
+        self.assertEqual(len(mail.outbox), 0)
+        kinds = list(OutgoingEmail.objects.values_list("kind", flat=True))
+        self.assertEqual(kinds, ["invitation", "rsvp_confirmation"])
+        self.assertIn("Please come", OutgoingEmail.objects.get(kind="invitation").body)
+
+    def test_bulk_invite_queues_unrendered_emails_atomically(self):
+        """Test the bulk invite view leaves rendering to the worker and keeps no invitations without emails"""
+        from unittest import mock
+
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("guests:invitation_bulk_create", kwargs={"event_pk": self.event.pk})
+        self.client.post(url, {"invitees": "invitee"})
+        self.assertEqual(OutgoingEmail.objects.get(kind="invitation").body, "")
+
+        Invitation.objects.all().delete()
+        OutgoingEmail.objects.all().delete()
+        with mock.patch.object(OutgoingEmail, "queue_invitations", side_effect=RuntimeError("outbox down")):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, {"invitees": "invitee"})
+        self.assertFalse(Invitation.objects.exists())
+
+    def test_worker_sends_queued_emails(self):
+        """Test the worker delivers queued emails and records their status"""
+        from django.core import mail
+
+        invitations = [Invitation.objects.create(event=self.event, invitee=self.invitee)]
+        OutgoingEmail.queue_invitations(invitations)
+        OutgoingEmail.queue_rsvp_confirmation(invitations[0])
+
+        self.send_queued_emails("--batch-size", "1")
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ["invitee@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "You're invited to Test Event")
+        self.assertFalse(OutgoingEmail.objects.exclude(status="sent").exists())
+
+    def test_worker_renders_deferred_emails(self):
+        """Test emails queued without rendering are rendered by the worker, or failed if orphaned"""
+        from django.core import mail
+
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        invitations = [
+            Invitation.objects.create(event=self.event, invitee=self.invitee),
+            Invitation.objects.create(event=self.event, invitee=other),
+        ]
+        emails = OutgoingEmail.queue_invitations(invitations, render=False)
+        self.assertEqual(emails[0].body, "")
+        invitations[1].delete()
+
+        self.send_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "You're invited to Test Event")
+        self.assertEqual(OutgoingEmail.objects.get(pk=emails[0].pk).subject, "You're invited to Test Event")
+        self.assertEqual(OutgoingEmail.objects.get(pk=emails[1].pk).status, "failed")
+
+    def test_worker_render_error_fails_only_that_email(self):
+        """Test an email that cannot be rendered is rescheduled while the rest of the batch is recorded as sent"""
+        from unittest import mock
+
+        from django.core import mail
+
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        invitations = [
+            Invitation.objects.create(event=self.event, invitee=self.invitee),
+            Invitation.objects.create(event=self.event, invitee=other),
+        ]
+        emails = OutgoingEmail.queue_invitations(invitations, render=False)
+        render = OutgoingEmail.render
+
+        def render_or_fail(email):
+            if email.pk == emails[0].pk:
+                raise ValueError("template is broken")
+            render(email)
+
+        with mock.patch.object(OutgoingEmail, "render", render_or_fail):
+            self.send_queued_emails()
+
+        self.assertEqual(len(mail.outbox), 1)
+        broken, sent = OutgoingEmail.objects.order_by("pk")
+        self.assertEqual((broken.status, broken.attempts, broken.last_error), ("queued", 1, "template is broken"))
+        self.assertEqual(sent.status, "sent")
+
+    def test_claimed_emails_are_not_sent_twice(self):
+        """Test a batch claimed by one worker is skipped by the next until its lease expires"""
+        from guests.management.commands.send_queued_emails import Command
+
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        email = OutgoingEmail.queue_invitations([invitation])[0]
+
+        self.assertEqual(Command().claim_batch(10, lease=60), [email])
+        self.assertEqual(Command().claim_batch(10, lease=60), [])
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(Command().claim_batch(10, lease=60), [email])
+
+    def test_single_invitation_and_email_are_written_together(self):
+        """Test a failure while queueing the email leaves no invitation behind"""
+        from unittest import mock
+
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("guests:invitation_create", kwargs={"event_pk": self.event.pk})
+        with mock.patch.object(OutgoingEmail, "queue_invitations", side_effect=RuntimeError("outbox down")):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, {"invitee": self.invitee.pk})
+        self.assertFalse(Invitation.objects.exists())
+
+    def test_worker_retries_with_backoff_then_fails(self):
+        """Test failed sends are rescheduled and eventually marked failed"""
+        import smtplib
+        from unittest import mock
+
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        email = OutgoingEmail.queue_invitations([invitation])[0]
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=smtplib.SMTPException("boom")
+        ):
+            self.send_queued_emails("--max-attempts", "2")
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts, email.last_error), ("queued", 1, "boom"))
+            self.assertGreater(email.next_attempt_at, timezone.now())
+
+            OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            self.send_queued_emails("--max-attempts", "2")
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ("failed", 2))
+
+
+class GuestExportTestCase(TestCase):
+    """Test cases for streaming guest and invitation exports"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.guest_user = User.objects.create_user(
+            username="guestuser",
+            email="guest@example.com",
+            password="testpass123",
+            first_name="Jane",
+            last_name="Smith",
+        )
+
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        invitation = Invitation.objects.create(event=self.event, invitee=self.guest_user, status="accepted")
+        self.guest = Guest.objects.create(event=self.event, user=self.guest_user, invitation=invitation)
+        RSVP.objects.create(guest=self.guest, status="accepted", number_of_guests=3)
+
+    def test_guest_export_csv(self):
+        """Test guests are streamed as CSV"""
+        self.client.login(username="organizer", password="testpass123")
+        response = self.client.get(reverse("guests:guest_export", kwargs={"event_pk": self.event.pk}))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="test-event-guests.csv"', response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:4], ["username", "first_name", "last_name", "email"])
+        self.assertTrue(lines[1].startswith("guestuser,Jane,Smith,guest@example.com,accepted,3"))
+
+    def test_invitation_export_ndjson(self):
+        """Test invitations are streamed as newline-delimited JSON"""
+        import json
+
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("guests:invitation_export", kwargs={"event_pk": self.event.pk})
+        response = self.client.get(url, {"format": "ndjson"})
+
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["email"], "guest@example.com")
+        self.assertEqual(rows[0]["status"], "accepted")
+
+    def test_export_rejects_unknown_format_and_other_users(self):
+        """Test unknown formats and non-organizers are rejected"""
+        url = reverse("guests:guest_export", kwargs={"event_pk": self.event.pk})
+        self.client.login(username="organizer", password="testpass123")
+        self.assertEqual(self.client.get(url, {"format": "xml"}).status_code, 400)
+
+        self.client.login(username="guestuser", password="testpass123")
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class GuestListPaginationTestCase(TestCase):
+    """Test cases for guest list aggregates and keyset pagination"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        statuses = ["accepted", "accepted", "declined", "pending", "accepted"]
+        for i, status in enumerate(statuses):
+            user = User.objects.create(username=f"guest{i}", first_name="Guest", last_name=f"Name{i}")
+            guest = Guest.objects.create(event=self.event, user=user)
+            RSVP.objects.create(guest=guest, status=status, number_of_guests=i + 1)
+        self.url = reverse("guests:guest_list", kwargs={"event_pk": self.event.pk})
+        self.client.login(username="organizer", password="testpass123")
+
+    def test_guest_stats_are_aggregated(self):
+        """Test RSVP counts and headcount come from one aggregate"""
+        response = self.client.get(self.url)
+        stats = response.context["guest_stats"]
+        self.assertEqual(stats, {"total": 5, "accepted": 3, "declined": 1, "pending": 1, "headcount": 1 + 2 + 4 + 5})
+
+    def test_guest_list_keyset_pagination(self):
+        """Test guests are paged by name with next/previous cursors"""
+        from unittest import mock
+
+        from guests.views import GuestListView
+
+        with mock.patch.object(GuestListView, "page_size", 2):
+            first = self.client.get(self.url)
+            self.assertEqual([g.user.username for g in first.context["guests"]], ["guest0", "guest1"])
+            self.assertFalse(first.context["page"].has_previous)
+
+            second = self.client.get(self.url, {"cursor": first.context["page"].next_cursor})
+            self.assertEqual([g.user.username for g in second.context["guests"]], ["guest2", "guest3"])
+
+            last = self.client.get(self.url, {"cursor": second.context["page"].next_cursor})
+            self.assertEqual([g.user.username for g in last.context["guests"]], ["guest4"])
+            self.assertFalse(last.context["page"].has_next)
+
+            back = self.client.get(self.url, {"cursor": last.context["page"].previous_cursor})
+            self.assertEqual([g.user.username for g in back.context["guests"]], ["guest2", "guest3"])
+
+
+class CapacityEnforcementTestCase(TestCase):
+    """Test cases for event capacity checks on invitation responses and RSVP edits"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.invitee = User.objects.create_user(username="invitee", email="invitee@example.com", password="testpass123")
+        self.event = Event.objects.create(
+            title="Small Event",
+            description="Test Description",
+            event_type="party",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=2,
+            created_by=self.organizer,
+        )
+
+    def test_accept_reserves_seat_and_rejects_when_full(self):
+        """Test accepting takes a seat and a full event rejects further accepts without side effects"""
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        self.assertTrue(invitation.respond("accepted"))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.confirmed_headcount, 1)
+        self.assertFalse(invitation.respond("accepted"))
+
+        self.event.adjust_seats(1)
+        late_user = User.objects.create_user(username="late", password="testpass123")
+        late = Invitation.objects.create(event=self.event, invitee=late_user)
+        self.client.login(username="late", password="testpass123")
+        response = self.client.post(
+            reverse("guests:invitation_respond", kwargs={"pk": late.pk, "action": "accept"}), follow=True
+        )
+
+        self.assertContains(response, "full capacity")
+        late.refresh_from_db()
+        self.assertEqual(late.status, "pending")
+        self.assertFalse(Guest.objects.filter(user=late_user).exists())
+        self.assertEqual(InvitationCounter.objects.get(event=self.event).pending, 1)
+
+    def test_rsvp_update_checks_capacity(self):
+        """Test raising an RSVP's party size is limited by the remaining capacity"""
+        invitation = Invitation.objects.create(event=self.event, invitee=self.invitee)
+        invitation.respond("accepted")
+        rsvp = RSVP.objects.get(guest__user=self.invitee)
+        url = reverse("guests:rsvp_edit", kwargs={"pk": rsvp.pk})
+        self.client.login(username="organizer", password="testpass123")
+
+        response = self.client.post(url, {"status": "accepted", "number_of_guests": 3, "notes": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("number_of_guests", response.context["form"].errors)
+
+        response = self.client.post(url, {"status": "accepted", "number_of_guests": 2, "notes": ""})
+        self.assertEqual(response.status_code, 302)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.confirmed_headcount, 2)
+
+        self.client.post(url, {"status": "declined", "number_of_guests": 2, "notes": ""})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.confirmed_headcount, 0)
+
+    def test_guest_removal_releases_seats(self):
+        """Test removing a guest gives their seats back"""
+        Invitation.objects.create(event=self.event, invitee=self.invitee).respond("accepted")
+        Guest.objects.get(user=self.invitee).delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.confirmed_headcount, 0)
+
+
+class ConcurrentAcceptTestCase(TransactionTestCase):
+    """Concurrent accepts against the WAL-mode SQLite test database must never overbook"""
+
+    def test_simultaneous_accepts_respect_capacity(self):
+        import threading
+
+        from django.db import connection
+
+        from events.models import EventFullError
+
+        organizer = User.objects.create(username="organizer")
+        event = Event.objects.create(
+            title="Popular Event",
+            description="Test Description",
+            event_type="party",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=3,
+            created_by=organizer,
+        )
+        invitations = [
+            Invitation.objects.create(event=event, invitee=User.objects.create(username=f"user{i}")) for i in range(10)
+        ]
+        barrier = threading.Barrier(len(invitations))
+        results = []
+
+        def accept(invitation_pk):
+            try:
+                invitation = Invitation.objects.select_related("event").get(pk=invitation_pk)
+                barrier.wait()
+                try:
+                    results.append(invitation.respond("accepted"))
+                except EventFullError:
+                    results.append("full")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=accept, args=(invitation.pk,)) for invitation in invitations]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        event.refresh_from_db()
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(results.count("full"), 7)
+        self.assertEqual(event.confirmed_headcount, 3)
+        self.assertEqual(Guest.objects.filter(event=event).count(), 3)
+        self.assertEqual(RSVP.objects.filter(guest__event=event).count(), 3)
+        self.assertEqual(Invitation.objects.filter(event=event, status="accepted").count(), 3)
+        counter = InvitationCounter.objects.get(event=event)
+        self.assertEqual((counter.pending, counter.accepted), (7, 3))
+
+
+class RSVPBulkUpdateTestCase(TestCase):
+    """Test cases for bulk RSVP editing"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=5,
+            created_by=self.organizer,
+        )
+        self.rsvps = []
+        for i in range(3):
+            user = User.objects.create(username=f"guest{i}", last_name=f"Name{i}")
+            invitation = Invitation.objects.create(event=self.event, invitee=user)
+            invitation.respond("accepted")
+            self.rsvps.append(RSVP.objects.get(guest__user=user))
+        self.url = reverse("guests:rsvp_bulk_edit", kwargs={"event_pk": self.event.pk})
+        self.client.login(username="organizer", password="testpass123")
+
+    def patch(self, rows):
+        import json
+
+        return self.client.patch(self.url, json.dumps({"rsvps": rows}), content_type="application/json")
+
+    def test_patch_updates_many_rsvps(self):
+        """Test a JSON PATCH applies all rows and adjusts the headcount"""
+        response = self.patch(
+            [
+                {"id": self.rsvps[0].pk, "number_of_guests": 2, "notes": "Plus one"},
+                {"id": self.rsvps[1].pk, "status": "declined"},
+            ]
+        )
+        self.assertEqual(response.json(), {"updated": 2, "errors": {}})
+        self.rsvps[0].refresh_from_db()
+        self.rsvps[1].refresh_from_db()
+        self.assertEqual((self.rsvps[0].number_of_guests, self.rsvps[0].notes), (2, "Plus one"))
+        self.assertEqual(self.rsvps[1].status, "declined")
+        self.assertIsNotNone(self.rsvps[1].response_date)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.confirmed_headcount, 3)
+
+    def test_patch_reports_row_errors_without_writing(self):
+        """Test invalid rows are reported per id and nothing is saved"""
+        response = self.patch(
+            [
+                {"id": self.rsvps[0].pk, "number_of_guests": 2},
+                {"id": self.rsvps[1].pk, "status": "maybe"},
+                {"id": 999999, "status": "accepted"},
+            ]
+        )
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertIn("status", errors[str(self.rsvps[1].pk)])
+        self.assertIn("999999", errors)
+        self.rsvps[0].refresh_from_db()
+        self.assertEqual(self.rsvps[0].number_of_guests, 1)
+
+    def test_patch_enforces_capacity(self):
+        """Test the combined seat increase must fit the event capacity"""
+        response = self.patch([{"id": rsvp.pk, "number_of_guests": 2} for rsvp in self.rsvps])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("__all__", response.json()["errors"])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.confirmed_headcount, 3)
+
+    def test_formset_page_saves_changes(self):
+        """Test the formset page renders all RSVPs and saves edits"""
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context["formset"].forms), 3)
+
+        data = {"form-TOTAL_FORMS": "3", "form-INITIAL_FORMS": "3"}
+        for i, rsvp in enumerate(self.rsvps):
+            data.update(
+                {
+                    f"form-{i}-id": rsvp.pk,
+                    f"form-{i}-status": "accepted",
+                    f"form-{i}-number_of_guests": 1,
+                    f"form-{i}-notes": "Confirmed by phone" if i == 2 else "",
+                }
+            )
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(RSVP.objects.filter(status="accepted").count(), 3)
+        self.assertEqual(RSVP.objects.get(pk=self.rsvps[2].pk).notes, "Confirmed by phone")
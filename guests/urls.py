@@ -2,12 +2,17 @@ from django.urls import path
 
 from .views import (
     GuestDeleteView,
+    GuestExportView,
     GuestListView,
+    InvitationBulkCreateView,
     InvitationCreateView,
     InvitationDeleteView,
+    InvitationExportView,
     InvitationListView,
     InvitationRespondView,
+    InviteeSearchView,
     MyInvitationsView,
+    RSVPBulkUpdateView,
     RSVPUpdateView,
 )
 
@@ -17,13 +22,18 @@ urlpatterns = [
     # Invitation management (for event organizers)
     path("event/<int:event_pk>/invitations/", InvitationListView.as_view(), name="invitation_list"),
     path("event/<int:event_pk>/invitations/send/", InvitationCreateView.as_view(), name="invitation_create"),
+    path("event/<int:event_pk>/invitations/search/", InviteeSearchView.as_view(), name="invitee_search"),
+    path("event/<int:event_pk>/invitations/bulk/", InvitationBulkCreateView.as_view(), name="invitation_bulk_create"),
+    path("event/<int:event_pk>/invitations/export/", InvitationExportView.as_view(), name="invitation_export"),
     path("invitations/<int:pk>/cancel/", InvitationDeleteView.as_view(), name="invitation_delete"),
     # My invitations (for invitees)
     path("my-invitations/", MyInvitationsView.as_view(), name="my_invitations"),
     path("invitations/<int:pk>/<str:action>/", InvitationRespondView.as_view(), name="invitation_respond"),
     # Guest management (confirmed guests)
     path("event/<int:event_pk>/guests/", GuestListView.as_view(), name="guest_list"),
+    path("event/<int:event_pk>/guests/export/", GuestExportView.as_view(), name="guest_export"),
     path("guests/<int:pk>/remove/", GuestDeleteView.as_view(), name="guest_delete"),
     # RSVP management
     path("rsvp/<int:pk>/edit/", RSVPUpdateView.as_view(), name="rsvp_edit"),
+    path("event/<int:event_pk>/rsvps/bulk/", RSVPBulkUpdateView.as_view(), name="rsvp_bulk_edit"),
 ]
@@ -1,14 +1,30 @@
+import json
+
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
-from django.utils import timezone
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView, View
+from django.utils.text import slugify
+from django.views.generic import CreateView, DeleteView, FormView, ListView, UpdateView, View
 
-from events.models import Event
+from core.export import EXPORT_FORMATS, streaming_export
+from core.pagination import KeysetPaginator
+from events.ical import feed_url
+from events.models import Event, EventFullError
 
-from .forms import InvitationForm, RSVPForm
-from .models import RSVP, Guest, Invitation
+from .forms import (
+    InvitationBulkForm,
+    InvitationForm,
+    RSVPForm,
+    RSVPFormSet,
+    bulk_update_rsvps,
+    invitable_users,
+)
+from .models import RSVP, Guest, Invitation, InvitationCounter, OutgoingEmail
 
 
 class InvitationListView(LoginRequiredMixin, ListView):
@@ -24,10 +40,11 @@ class InvitationListView(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        counter = InvitationCounter.for_event(self.event)
         context["event"] = self.event
-        context["pending_count"] = self.get_queryset().filter(status="pending").count()
-        context["accepted_count"] = self.get_queryset().filter(status="accepted").count()
-        context["declined_count"] = self.get_queryset().filter(status="declined").count()
+        context["pending_count"] = counter.pending
+        context["accepted_count"] = counter.accepted
+        context["declined_count"] = counter.declined
         return context
 
 
@@ -50,7 +67,10 @@ class InvitationCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.event = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
-        response = super().form_valid(form)
+        # Same as the bulk view: the invitation and its queued email are written together
+        with transaction.atomic():
+            response = super().form_valid(form)
+            OutgoingEmail.queue_invitations([self.object])
         messages.success(
             self.request, f"Invitation sent to {self.object.invitee.get_full_name() or self.object.invitee.username}!"
         )
@@ -60,6 +80,83 @@ class InvitationCreateView(LoginRequiredMixin, CreateView):
         return reverse_lazy("guests:invitation_list", kwargs={"event_pk": self.kwargs["event_pk"]})
 
 
+class InviteeSearchView(LoginRequiredMixin, View):
+    """JSON typeahead for the invitation form: users matching a name/email prefix who can still be invited"""
+
+    page_size = 20
+    min_query_length = 2
+
+    def get(self, request, event_pk):
+        event = get_object_or_404(Event, pk=event_pk, created_by=request.user)
+        query = request.GET.get("q", "").strip()
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+
+        if len(query) < self.min_query_length:
+            return JsonResponse({"results": [], "page": page, "has_more": False})
+
+        offset = (page - 1) * self.page_size
+        users = list(
+            invitable_users(event)
+            .search_prefix(query)
+            .order_by("username")
+            .only("username", "first_name", "last_name", "email")[offset : offset + self.page_size + 1]
+        )
+        results = [
+            {"id": user.pk, "username": user.username, "name": user.get_full_name(), "email": user.email}
+            for user in users[: self.page_size]
+        ]
+        return JsonResponse({"results": results, "page": page, "has_more": len(users) > self.page_size})
+
+
+class InvitationBulkCreateView(LoginRequiredMixin, FormView):
+    """View to invite many users at once from a pasted list or a CSV upload"""
+
+    form_class = InvitationBulkForm
+    template_name = "guests/invitation_bulk_form.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.event = get_object_or_404(Event, pk=kwargs["event_pk"], created_by=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["event"] = self.event
+        return context
+
+    def form_valid(self, form):
+        users = form.cleaned_data["users"]
+        # Emails are rendered by the worker, and are queued in the same transaction as the invitations
+        with transaction.atomic():
+            created, skipped = Invitation.objects.bulk_invite(self.event, users, notes=form.cleaned_data["notes"])
+            OutgoingEmail.queue_invitations(created, render=False)
+        messages.success(self.request, f"Sent {len(created)} invitation(s).")
+        if skipped:
+            names = [user.username for user in skipped]
+            messages.warning(self.request, f"Skipped {len(skipped)} already invited user(s): {self._summarize(names)}")
+        if any(user.pk == self.event.created_by_id for user in users):
+            messages.info(self.request, "You organize this event, so you were not invited to it.")
+        if form.cleaned_data["not_found"]:
+            not_found = form.cleaned_data["not_found"]
+            messages.warning(
+                self.request, f"No user found for {len(not_found)} entry(ies): {self._summarize(not_found)}"
+            )
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse_lazy("guests:invitation_list", kwargs={"event_pk": self.event.pk})
+
+    @staticmethod
+    def _summarize(names, limit=20):
+        summary = ", ".join(names[:limit])
+        if len(names) > limit:
+            summary += f" and {len(names) - limit} more"
+        return summary
+
+
 class InvitationDeleteView(LoginRequiredMixin, DeleteView):
     """View to cancel/delete an invitation"""
 
@@ -67,7 +164,7 @@ class InvitationDeleteView(LoginRequiredMixin, DeleteView):
     template_name = "guests/invitation_confirm_delete.html"
 
     def get_queryset(self):
-        return Invitation.objects.filter(event__created_by=self.request.user)
+        return Invitation.objects.live().filter(event__created_by=self.request.user)
 
     def get_success_url(self):
         messages.success(self.request, "Invitation cancelled successfully.")
@@ -82,12 +179,13 @@ class MyInvitationsView(LoginRequiredMixin, ListView):
     context_object_name = "invitations"
 
     def get_queryset(self):
-        return Invitation.objects.filter(invitee=self.request.user).select_related("event", "event__created_by")
+        return Invitation.objects.live().filter(invitee=self.request.user).select_related("event", "event__created_by")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["pending_invitations"] = self.get_queryset().filter(status="pending")
-        context["responded_invitations"] = self.get_queryset().exclude(status="pending")
+        context["responded_invitations"] = self.get_queryset().filter(status__in=["accepted", "declined"])
+        context["calendar_feed_url"] = feed_url(self.request.user.pk, "invitee")
         return context
 
 
@@ -95,28 +193,24 @@ class InvitationRespondView(LoginRequiredMixin, View):
     """View to accept or decline an invitation"""
 
     def post(self, request, pk, action):
-        invitation = get_object_or_404(Invitation, pk=pk, invitee=request.user, status="pending")
+        invitation = get_object_or_404(
+            Invitation.objects.live().select_related("event", "invitee"), pk=pk, invitee=request.user, status="pending"
+        )
 
         if action == "accept":
-            invitation.status = "accepted"
-            invitation.responded_at = timezone.now()
-            invitation.save()
-
-            # Create Guest record
-            guest, created = Guest.objects.get_or_create(
-                event=invitation.event, user=request.user, defaults={"invitation": invitation}
-            )
-
-            # Create RSVP record
-            RSVP.objects.get_or_create(guest=guest)
-
-            messages.success(request, f"You have accepted the invitation to {invitation.event.title}!")
+            try:
+                responded = invitation.respond("accepted")
+            except EventFullError:
+                messages.error(request, f"Sorry, {invitation.event.title} is already at full capacity.")
+                return redirect("guests:my_invitations")
+            if responded:
+                OutgoingEmail.queue_rsvp_confirmation(invitation)
+                messages.success(request, f"You have accepted the invitation to {invitation.event.title}!")
 
         elif action == "decline":
-            invitation.status = "declined"
-            invitation.responded_at = timezone.now()
-            invitation.save()
-            messages.info(request, f"You have declined the invitation to {invitation.event.title}.")
+            if invitation.respond("declined"):
+                OutgoingEmail.queue_rsvp_confirmation(invitation)
+                messages.info(request, f"You have declined the invitation to {invitation.event.title}.")
 
         return redirect("guests:my_invitations")
 
@@ -128,13 +222,25 @@ class GuestListView(LoginRequiredMixin, ListView):
     template_name = "guests/guest_list.html"
     context_object_name = "guests"
 
+    page_size = 50
+    ordering = ["user__last_name", "user__first_name", "pk"]
+
     def get_queryset(self):
         self.event = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
         return Guest.objects.filter(event=self.event).select_related("user", "rsvp")
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+        page = KeysetPaginator(self.object_list, self.ordering, self.page_size).page(self.request.GET.get("cursor"))
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
         context["event"] = self.event
+        context["page"] = page
+        context["guest_stats"] = Guest.objects.filter(event=self.event).aggregate(
+            total=Count("pk"),
+            accepted=Count("pk", filter=Q(rsvp__status="accepted")),
+            declined=Count("pk", filter=Q(rsvp__status="declined")),
+            pending=Count("pk", filter=Q(rsvp__status="pending")),
+            headcount=Coalesce(Sum("rsvp__number_of_guests", filter=~Q(rsvp__status="declined")), 0),
+        )
         return context
 
 
@@ -145,7 +251,7 @@ class GuestDeleteView(LoginRequiredMixin, DeleteView):
     template_name = "guests/guest_confirm_delete.html"
 
     def get_queryset(self):
-        return Guest.objects.filter(event__created_by=self.request.user)
+        return Guest.objects.filter(event__in=Event.objects.filter(created_by=self.request.user))
 
     def get_success_url(self):
         messages.success(self.request, "Guest removed from event.")
@@ -160,7 +266,146 @@ class RSVPUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "guests/rsvp_form.html"
 
     def get_queryset(self):
-        return RSVP.objects.filter(guest__event__created_by=self.request.user)
+        return RSVP.objects.filter(guest__event__in=Event.objects.filter(created_by=self.request.user)).select_related(
+            "guest__event"
+        )
+
+    def form_valid(self, form):
+        previous_seats = 0 if form.initial["status"] == "declined" else form.initial["number_of_guests"]
+        event = self.object.guest.event
+        with transaction.atomic():
+            if not event.adjust_seats(self.object.seats - previous_seats):
+                form.add_error("number_of_guests", f"{event.title} doesn't have enough capacity left for this RSVP.")
+                return self.form_invalid(form)
+            return super().form_valid(form)
 
     def get_success_url(self):
         return reverse_lazy("guests:guest_list", kwargs={"event_pk": self.object.guest.event.pk})
+
+
+class RSVPBulkUpdateView(LoginRequiredMixin, View):
+    """Edit many RSVPs of an event at once: a formset page (GET/POST) and a JSON PATCH endpoint"""
+
+    template_name = "guests/rsvp_bulk_form.html"
+    page_size = 100
+    ordering = ["guest__user__last_name", "guest__user__first_name", "pk"]
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.event = get_object_or_404(Event, pk=kwargs["event_pk"], created_by=request.user)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_page(self):
+        rsvps = RSVP.objects.filter(guest__event=self.event).select_related("guest__user")
+        return KeysetPaginator(rsvps, self.ordering, self.page_size).page(self.request.GET.get("cursor"))
+
+    def render_formset(self, formset, page):
+        context = {"event": self.event, "formset": formset, "page": page}
+        return render(self.request, self.template_name, context)
+
+    def get(self, request, event_pk):
+        page = self.get_page()
+        queryset = RSVP.objects.filter(pk__in=[rsvp.pk for rsvp in page]).select_related("guest__user")
+        return self.render_formset(RSVPFormSet(queryset=queryset.order_by(*self.ordering)), page)
+
+    def post(self, request, event_pk):
+        page = self.get_page()
+        queryset = RSVP.objects.filter(pk__in=[rsvp.pk for rsvp in page]).select_related("guest__user")
+        formset = RSVPFormSet(request.POST, queryset=queryset.order_by(*self.ordering))
+        if not formset.is_valid():
+            return self.render_formset(formset, page)
+
+        changes = {
+            form.instance.pk: {field: form.cleaned_data[field] for field in form.changed_data}
+            for form in formset.forms
+            if form.has_changed()
+        }
+        updated, errors = bulk_update_rsvps(self.event, changes)
+        if errors:
+            for row_errors in errors.values():
+                for field_messages in row_errors.values():
+                    for message in field_messages:
+                        messages.error(request, message)
+            return self.render_formset(formset, page)
+
+        messages.success(request, f"Updated {updated} RSVP(s).")
+        return redirect(request.get_full_path())
+
+    def patch(self, request, event_pk):
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Request body must be JSON."}, status=400)
+
+        rows = payload.get("rsvps") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not all(isinstance(row, dict) and "id" in row for row in rows):
+            return JsonResponse(
+                {"error": 'Expected a list of objects with an "id", e.g. {"rsvps": [...]}.'}, status=400
+            )
+
+        changes = {str(row["id"]): {key: value for key, value in row.items() if key != "id"} for row in rows}
+        updated, errors = bulk_update_rsvps(self.event, changes)
+        if errors:
+            return JsonResponse({"updated": 0, "errors": errors}, status=400)
+        return JsonResponse({"updated": updated, "errors": {}})
+
+
+class EventExportView(LoginRequiredMixin, View):
+    """Base view streaming rows for one of the organizer's events as CSV (default) or NDJSON"""
+
+    chunk_size = 2000
+    export_name = None
+    columns = {}
+
+    def get_rows(self, event):
+        raise NotImplementedError
+
+    def get(self, request, event_pk):
+        event = get_object_or_404(Event, pk=event_pk, created_by=request.user)
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(f"Unsupported export format: {export_format}")
+
+        fields = [column for column, lookup in self.columns.items() if column == lookup]
+        expressions = {column: F(lookup) for column, lookup in self.columns.items() if column != lookup}
+        rows = self.get_rows(event).values(*fields, **expressions).iterator(chunk_size=self.chunk_size)
+        filename = f"{slugify(event.title) or 'event'}-{self.export_name}"
+        return streaming_export(rows, list(self.columns), export_format, filename)
+
+
+class GuestExportView(EventExportView):
+    """Stream the confirmed guest list of an event"""
+
+    export_name = "guests"
+    columns = {
+        "username": "user__username",
+        "first_name": "user__first_name",
+        "last_name": "user__last_name",
+        "email": "user__email",
+        "rsvp_status": "rsvp__status",
+        "number_of_guests": "rsvp__number_of_guests",
+        "rsvp_notes": "rsvp__notes",
+        "added_at": "added_at",
+    }
+
+    def get_rows(self, event):
+        return Guest.objects.filter(event=event).order_by("user__last_name", "user__first_name", "pk")
+
+
+class InvitationExportView(EventExportView):
+    """Stream all invitations of an event"""
+
+    export_name = "invitations"
+    columns = {
+        "username": "invitee__username",
+        "first_name": "invitee__first_name",
+        "last_name": "invitee__last_name",
+        "email": "invitee__email",
+        "status": "status",
+        "invited_at": "invited_at",
+        "responded_at": "responded_at",
+        "notes": "notes",
+    }
+
+    def get_rows(self, event):
+        return Invitation.objects.filter(event=event).order_by("pk")
@@ -47,3 +47,13 @@ class EventVendorForm(forms.ModelForm):
                 raise forms.ValidationError(f"{vendor.name} is already assigned to this event.")
 
         return cleaned_data
+
+
+class ReconciliationForm(forms.Form):
+    overrun = forms.DecimalField(
+        required=False,
+        min_value=0,
+        decimal_places=2,
+        label="Only overruns above",
+        help_text="Leave empty to list every vendor; 0 lists every overrun",
+    )
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+
+def reconcile(assignments):
+    """Annotate EventVendor rows with the totals of their linked budget items, in one grouped join.
+
+    committed counts each linked item at its actual cost once known, else its estimate. variance
+    is committed minus the contract amount (positive means an overrun), and unpaid is what is
+    still owed on the larger of the two once paid items are taken off.
+    """
+    zero = Value(Decimal("0"), output_field=MONEY)
+    cost = Coalesce("budget_items__actual_cost", "budget_items__estimated_cost", output_field=MONEY)
+    return assignments.annotate(
+        item_count=Count("budget_items"),
+        linked_estimated=Coalesce(Sum("budget_items__estimated_cost"), zero),
+        linked_actual=Coalesce(Sum("budget_items__actual_cost"), zero),
+        committed=Coalesce(Sum(cost), zero),
+        paid=Coalesce(Sum(cost, filter=Q(budget_items__status="paid")), zero),
+    ).annotate(
+        variance=ExpressionWrapper(F("committed") - F("contract_amount"), output_field=MONEY),
+        unpaid=ExpressionWrapper(Greatest("committed", "contract_amount") - F("paid"), output_field=MONEY),
+    )
+
+
+def overruns(assignments, threshold=Decimal("0")):
+    """Reconciled assignments whose linked costs exceed the contract by more than threshold"""
+    return assignments.filter(variance__gt=threshold)
@@ -1,3 +1,110 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from budget.models import BudgetItem
+from events.models import Event
+
+from .models import EventVendor, Vendor
+from .reports import overruns, reconcile
+
+User = get_user_model()
+
+
+class VendorReconciliationTestCase(TestCase):
+    """Test cases for the vendor contract vs spend reconciliation report"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.organizer = User.objects.create_user(
+            username="organizer", email="organizer@example.com", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Test Event",
+            description="Test Description",
+            event_type="wedding",
+            status="planning",
+            start_date=timezone.now() + timezone.timedelta(days=30),
+            end_date=timezone.now() + timezone.timedelta(days=30, hours=5),
+            venue="Test Venue",
+            location="Test Location",
+            max_capacity=100,
+            created_by=self.organizer,
+        )
+        self.caterer = self.assign("Caterer", Decimal("1000"))
+        self.florist = self.assign("Florist", Decimal("300"))
+        self.band = self.assign("Band", Decimal("800"))
+        self.item(self.caterer, "Deposit", Decimal("500"), actual=Decimal("500"), status="paid")
+        self.item(self.caterer, "Dinner", Decimal("600"), actual=Decimal("750"))
+        self.item(self.caterer, "Cake", Decimal("100"))
+        self.item(self.florist, "Roses", Decimal("250"), actual=Decimal("250"), status="paid")
+
+    def assign(self, name, contract_amount):
+        vendor = Vendor.objects.create(
+            name=name, category="other", contact_person="Sam", email="sam@example.com", phone_number="1"
+        )
+        return EventVendor.objects.create(
+            event=self.event, vendor=vendor, service_description=name, contract_amount=contract_amount
+        )
+
+    def item(self, assignment, name, estimated, actual=None, status="planned"):
+        return BudgetItem.objects.create(
+            event=self.event,
+            vendor=assignment,
+            category="other",
+            name=name,
+            estimated_cost=estimated,
+            actual_cost=actual,
+            status=status,
+        )
+
+    def test_reconcile_totals_variance_and_unpaid(self):
+        """Test linked totals, variance and unpaid balance per assignment"""
+        rows = {row.vendor.name: row for row in reconcile(EventVendor.objects.select_related("vendor"))}
+        caterer = rows["Caterer"]
+        self.assertEqual(caterer.item_count, 3)
+        self.assertEqual(caterer.linked_estimated, Decimal("1200"))
+        self.assertEqual(caterer.linked_actual, Decimal("1250"))
+        self.assertEqual(caterer.variance, Decimal("350"))
+        self.assertEqual(caterer.unpaid, Decimal("850"))
+        self.assertEqual((rows["Florist"].variance, rows["Florist"].unpaid), (Decimal("-50"), Decimal("50")))
+        self.assertEqual((rows["Band"].item_count, rows["Band"].unpaid), (0, Decimal("800")))
+
+        names = [row.vendor.name for row in overruns(reconcile(EventVendor.objects.select_related("vendor")))]
+        self.assertEqual(names, ["Caterer"])
+        self.assertFalse(overruns(reconcile(EventVendor.objects.all()), Decimal("400")).exists())
+
+    def test_report_pages(self):
+        """Test the cross-event and per-event pages use one report query and respect the threshold"""
+        self.client.login(username="organizer", password="testpass123")
+        url = reverse("vendors:reconciliation")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        # session, user, reconciled assignments
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(len(response.context["assignments"]), 3)
+
+        response = self.client.get(reverse("vendors:event_reconciliation", args=[self.event.pk]), {"overrun": "100"})
+        self.assertEqual([row.vendor.name for row in response.context["assignments"]], ["Caterer"])
+        self.assertContains(response, "$350.00")
+
+        User.objects.create_user(username="other", password="testpass123")
+        self.client.login(username="other", password="testpass123")
+        self.assertEqual(len(self.client.get(url).context["assignments"]), 0)
+        response = self.client.get(reverse("vendors:event_reconciliation", args=[self.event.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_events_queued_for_deletion_are_hidden(self):
+        """Test assignments of an event queued for deletion leave the report right away"""
+        self.event.request_deletion()
+        self.client.login(username="organizer", password="testpass123")
+        self.assertEqual(len(self.client.get(reverse("vendors:reconciliation")).context["assignments"]), 0)
+        response = self.client.get(reverse("vendors:event_reconciliation", args=[self.event.pk]))
+        self.assertEqual(response.status_code, 404)
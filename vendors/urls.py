@@ -8,6 +8,7 @@ from .views import (
     VendorCreateView,
     VendorDeleteView,
     VendorListView,
+    VendorReconciliationView,
     VendorUpdateView,
 )
 
@@ -15,6 +16,7 @@ app_name = "vendors"
 
 urlpatterns = [
     path("vendors/", VendorListView.as_view(), name="vendor_list"),
+    path("vendors/reconciliation/", VendorReconciliationView.as_view(), name="reconciliation"),
     path("vendors/create/", VendorCreateView.as_view(), name="vendor_create"),
     path("vendors/<int:pk>/edit/", VendorUpdateView.as_view(), name="vendor_edit"),
     path("vendors/<int:pk>/delete/", VendorDeleteView.as_view(), name="vendor_delete"),
@@ -28,6 +30,11 @@ urlpatterns = [
         EventVendorCreateView.as_view(),
         name="eventvendor_create",
     ),
+    path(
+        "event/<int:event_pk>/vendors/reconciliation/",
+        VendorReconciliationView.as_view(),
+        name="event_reconciliation",
+    ),
     path(
         "eventvendors/<int:pk>/edit/",
         EventVendorUpdateView.as_view(),
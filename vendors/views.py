@@ -3,10 +3,12 @@ from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
+from core.pagination import KeysetPaginator
 from events.models import Event
 
-from .forms import EventVendorForm, VendorForm
+from .forms import EventVendorForm, ReconciliationForm, VendorForm
 from .models import EventVendor, Vendor
+from .reports import overruns, reconcile
 
 
 class VendorListView(LoginRequiredMixin, ListView):
@@ -57,16 +59,16 @@ class EventVendorCreateView(LoginRequiredMixin, CreateView):
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs["event"] = get_object_or_404(Event, pk=self.kwargs["event_pk"])
+        kwargs["event"] = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
         return kwargs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["event"] = get_object_or_404(Event, pk=self.kwargs["event_pk"])
+        context["event"] = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
         return context
 
     def form_valid(self, form):
-        form.instance.event = get_object_or_404(Event, pk=self.kwargs["event_pk"])
+        form.instance.event = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -78,6 +80,14 @@ class EventVendorUpdateView(LoginRequiredMixin, UpdateView):
     form_class = EventVendorForm
     template_name = "vendors/eventvendor_form.html"
 
+    def get_queryset(self):
+        return EventVendor.objects.filter(event__in=Event.objects.filter(created_by=self.request.user))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["event"] = self.object.event
+        return context
+
     def get_success_url(self):
         return reverse_lazy("vendors:eventvendor_list", kwargs={"event_pk": self.object.event.pk})
 
@@ -86,5 +96,44 @@ class EventVendorDeleteView(LoginRequiredMixin, DeleteView):
     model = EventVendor
     template_name = "vendors/eventvendor_confirm_delete.html"
 
+    def get_queryset(self):
+        return EventVendor.objects.filter(event__in=Event.objects.filter(created_by=self.request.user))
+
     def get_success_url(self):
         return reverse_lazy("vendors:eventvendor_list", kwargs={"event_pk": self.object.event.pk})
+
+
+class VendorReconciliationView(LoginRequiredMixin, ListView):
+    """Contract amounts of the planner's vendor assignments against their linked budget items.
+
+    Lists every event by default, or one event under event/<event_pk>/, newest events first.
+    """
+
+    template_name = "vendors/reconciliation.html"
+    context_object_name = "assignments"
+
+    page_size = 25
+    ordering = ["-event__start_date", "-pk"]
+
+    def get_queryset(self):
+        self.event = None
+        assignments = EventVendor.objects.filter(
+            event__created_by=self.request.user, event__deletion_requested_at__isnull=True
+        )
+        if "event_pk" in self.kwargs:
+            self.event = get_object_or_404(Event, pk=self.kwargs["event_pk"], created_by=self.request.user)
+            assignments = assignments.filter(event=self.event)
+        assignments = reconcile(assignments.select_related("event", "vendor"))
+
+        self.form = ReconciliationForm(self.request.GET or None)
+        if self.form.is_valid() and self.form.cleaned_data["overrun"] is not None:
+            assignments = overruns(assignments, self.form.cleaned_data["overrun"])
+        return assignments
+
+    def get_context_data(self, **kwargs):
+        page = KeysetPaginator(self.object_list, self.ordering, self.page_size).page(self.request.GET.get("cursor"))
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context["page"] = page
+        context["event"] = self.event
+        context["form"] = self.form
+        return context